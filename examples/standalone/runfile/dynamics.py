@@ -22,11 +22,13 @@ import ndsl.util as util
 from ndsl.comm.null_comm import NullComm
 from ndsl.dsl import StencilFactory
 from ndsl.dsl.dace.orchestration import DaceConfig
-from ndsl.grid import DampingCoefficients, GridData, MetricTerms
+from ndsl.grid import MetricTerms
 from ndsl.stencils.testing import dataset_to_dict
 from ndsl.stencils.testing.grid import Grid
 from pyFV3 import DycoreState, DynamicalCore, DynamicalCoreConfig, TranslateFVDynamics
+from pyFV3.grid_cache import GridCache, load_or_compute_grid
 from pyFV3.initialization.test_cases import init_baroclinic_state
+from pyFV3.thread_comm import run_subtiles
 
 
 def parse_args() -> Namespace:
@@ -71,6 +73,28 @@ def parse_args() -> Namespace:
         action="store_true",
         help="enable performance profiling using cProfile",
     )
+    parser.add_argument(
+        "--detailed_timing",
+        action="store_true",
+        help="time each dycore sub-component and write a flame graph file",
+    )
+    parser.add_argument(
+        "--halo_statistics",
+        action="store_true",
+        help="record the bytes and wait times of the acoustic halo exchanges",
+    )
+    parser.add_argument(
+        "--subtiles_per_rank",
+        type=int,
+        default=1,
+        help="number of subtiles of the namelist layout run by each rank",
+    )
+    parser.add_argument(
+        "--grid_cache_dir",
+        type=str,
+        default=None,
+        help="directory where the grid of each rank is cached between runs",
+    )
 
     return parser.parse_args()
 
@@ -205,7 +229,12 @@ def collect_data_and_write_to_file(
 
 
 def setup_dycore(
-    dycore_config, mpi_comm, backend, is_baroclinic_test_case, data_dir
+    dycore_config,
+    mpi_comm,
+    backend,
+    is_baroclinic_test_case,
+    data_dir,
+    grid_cache_dir=None,
 ) -> Tuple[DynamicalCore, DycoreState, StencilFactory]:
     # set up grid-dependent helper structures
     partitioner = util.CubedSpherePartitioner(
@@ -230,16 +259,31 @@ def setup_dycore(
         config=stencil_config,
         grid_indexing=grid.grid_indexing,
     )
-    metric_terms = MetricTerms.from_tile_sizing(
-        npx=dycore_config.npx,
-        npy=dycore_config.npy,
-        npz=dycore_config.npz,
-        communicator=communicator,
-        backend=backend,
-    )
+
+    def make_metric_terms():
+        return MetricTerms.from_tile_sizing(
+            npx=dycore_config.npx,
+            npy=dycore_config.npy,
+            npz=dycore_config.npz,
+            communicator=communicator,
+            backend=backend,
+        )
+
+    grid_cache = None
+    if grid_cache_dir is not None:
+        grid_cache = GridCache(
+            grid_cache_dir,
+            npx=dycore_config.npx,
+            npy=dycore_config.npy,
+            npz=dycore_config.npz,
+            layout=dycore_config.layout,
+            rank=communicator.rank,
+            backend=backend,
+        )
     if is_baroclinic_test_case:
         # create an initial state from the Jablonowski & Williamson Baroclinic
         # test case perturbation. JRMS2006
+        metric_terms = make_metric_terms()
         state = init_baroclinic_state(
             metric_terms,
             adiabatic=dycore_config.adiabatic,
@@ -247,15 +291,21 @@ def setup_dycore(
             moist_phys=dycore_config.moist_phys,
             comm=communicator,
         )
+        grid_data, damping_coefficients = load_or_compute_grid(
+            grid_cache, lambda: metric_terms, communicator
+        )
     else:
         state = read_serialized_initial_state(
             mpi_comm.rank, grid, dycore_config, stencil_factory, data_dir
         )
+        grid_data, damping_coefficients = load_or_compute_grid(
+            grid_cache, make_metric_terms, communicator
+        )
     dycore = DynamicalCore(
         comm=communicator,
-        grid_data=GridData.new_from_metric_terms(metric_terms),
+        grid_data=grid_data,
         stencil_factory=stencil_factory,
-        damping_coefficients=DampingCoefficients.new_from_metric_terms(metric_terms),
+        damping_coefficients=damping_coefficients,
         config=dycore_config,
         phis=state.phis,
         state=state,
@@ -264,13 +314,15 @@ def setup_dycore(
     return dycore, state, stencil_factory
 
 
-if __name__ == "__main__":
+def run(args: Namespace, dycore_config: DynamicalCoreConfig, mpi_comm) -> None:
+    """
+    Run the dycore with the given communicator, which is also used to gather
+    the timings
+    """
     timer = util.Timer()
     timer.start("total")
     with timer.clock("initialization"):
-        args = parse_args()
-        comm = MPI.COMM_WORLD
-        rank = comm.Get_rank()
+        rank = mpi_comm.Get_rank()
 
         profiler = None
         if args.profile:
@@ -279,19 +331,18 @@ if __name__ == "__main__":
             profiler = cProfile.Profile()
             profiler.disable()
 
-        namelist = f90nml.read(args.data_dir + "/input.nml")
-        dycore_config = DynamicalCoreConfig.from_f90nml(namelist)
         experiment_name, is_baroclinic_test_case = get_experiment_info(args.data_dir)
         if args.disable_halo_exchange:
-            mpi_comm = NullComm(MPI.COMM_WORLD.Get_rank(), MPI.COMM_WORLD.Get_size())
+            dycore_comm = NullComm(rank, mpi_comm.Get_size())
         else:
-            mpi_comm = MPI.COMM_WORLD
+            dycore_comm = mpi_comm
         dycore, state, stencil_factory = setup_dycore(
             dycore_config,
-            mpi_comm,
+            dycore_comm,
             args.backend,
             is_baroclinic_test_case,
             args.data_dir,
+            grid_cache_dir=args.grid_cache_dir,
         )
 
         # warm-up timestep.
@@ -300,6 +351,9 @@ if __name__ == "__main__":
         if rank == 0:
             print("timestep 1")
         dycore.step_dynamics(state, timer)
+        dycore.detailed_timer.reset()
+        for statistics in dycore.halo_statistics.values():
+            statistics.reset()
 
     if profiler is not None:
         profiler.enable()
@@ -309,12 +363,26 @@ if __name__ == "__main__":
     # we set up a specific timer for each timestep
     # that is cleared after so we get individual statistics
     timestep_timer = util.Timer()
+    # the detailed timer accumulates over all steps for the flame graph
+    previous_detailed_times: Dict[str, float] = {}
     for i in range(args.time_step - 1):
         with timestep_timer.clock("mainloop"):
             if rank == 0:
                 print(f"timestep {i+2}")
             dycore.step_dynamics(state, timer=timestep_timer)
-        times_per_step.append(timestep_timer.times)
+        step_times = timestep_timer.times
+        detailed_times = dycore.detailed_timer.times
+        for name, time in detailed_times.items():
+            step_times[f"mainloop/{name}"] = time - previous_detailed_times.get(
+                name, 0.0
+            )
+        previous_detailed_times = detailed_times
+        for name, statistics in dycore.halo_statistics.items():
+            step_times[f"halo/{name}/in_flight"] = statistics.in_flight_time
+            step_times[f"halo/{name}/wait"] = statistics.wait_time
+            step_times[f"halo/{name}/bytes"] = float(statistics.bytes_sent)
+            statistics.reset()
+        times_per_step.append(step_times)
         hits_per_step.append(timestep_timer.hits)
         timestep_timer.reset()
 
@@ -328,13 +396,17 @@ if __name__ == "__main__":
     # output profiling data
     if profiler is not None:
         profiler.dump_stats(f"fv3core_{experiment_name}_{args.backend}_{rank}.prof")
+    if args.detailed_timing:
+        dycore.detailed_timer.write_collapsed_stacks(
+            f"fv3core_{experiment_name}_{args.backend}_{rank}.folded"
+        )
 
     # Timings
     if not args.disable_json_dump:
         # Collect times and output statistics in json
-        MPI.COMM_WORLD.Barrier()
+        mpi_comm.Barrier()
         collect_data_and_write_to_file(
-            args, MPI.COMM_WORLD, hits_per_step, times_per_step, experiment_name
+            args, mpi_comm, hits_per_step, times_per_step, experiment_name
         )
     else:
         # Print a brief summary of timings
@@ -344,3 +416,21 @@ if __name__ == "__main__":
 
     if rank == 0:
         print("SUCCESS")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    namelist = f90nml.read(args.data_dir + "/input.nml")
+    dycore_config = DynamicalCoreConfig.from_f90nml(namelist)
+    dycore_config.detailed_timing = args.detailed_timing
+    dycore_config.halo_statistics = args.halo_statistics
+    if args.subtiles_per_rank > 1:
+        # the layout of the namelist is the layout of the subtiles, each
+        # rank runs subtiles_per_rank consecutive ones on as many threads
+        run_subtiles(
+            lambda subtile_comm: run(args, dycore_config, subtile_comm),
+            MPI.COMM_WORLD,
+            args.subtiles_per_rank,
+        )
+    else:
+        run(args, dycore_config, MPI.COMM_WORLD)
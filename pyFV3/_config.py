@@ -49,12 +49,35 @@ class RemappingConfig:
     kord_mt: int
     do_sat_adj: bool
     sat_adjust: SatAdjustConfig
+    drift_tolerance: float = 0.0
+    """
+    maximum relative deviation of the Lagrangian interface pressures from
+    their Eulerian targets for which remapping is skipped, remapping always
+    happens on the last k_split step and on every step if 0
+    """
 
     @property
     def hydrostatic(self) -> bool:
         return self.sat_adjust.hydrostatic
 
 
+@dataclasses.dataclass(frozen=True)
+class TracerAdvectionConfig:
+    q_split: int
+    """
+    number of tracer substeps per remapping step, if 0 it is
+    computed at every call from the global maximum Courant number
+    """
+    n_substep_bands: int
+    """
+    number of contiguous bands of levels substepped independently when
+    q_split is 0, each band only runs the substeps its own maximum
+    Courant number requires
+    """
+    reduced_precision_halo: bool = False
+    """send the tracer halos as float32"""
+
+
 @dataclasses.dataclass(frozen=True)
 class RiemannConfig:
     p_fac: float
@@ -111,6 +134,18 @@ class AcousticDynamicsConfig:
     """
     riemann: RiemannConfig
     d_grid_shallow_water: DGridShallowWaterLagrangianDynamicsConfig
+    coalesce_halo_exchanges: bool = False
+    """
+    merge the halo exchanges started at the same point of the acoustic step
+    into a single exchange, sending fewer and larger messages
+    """
+    reduced_precision_halos: Tuple[str, ...] = ()
+    """names of the acoustic halo exchanges sent as float32"""
+    persistent_halo_exchanges: bool = False
+    """
+    plan the scalar acoustic halo exchanges once, with preallocated buffers
+    and persistent MPI requests
+    """
 
     @property
     def nord(self) -> int:
@@ -179,6 +214,16 @@ class DynamicalCoreConfig:
     kord_tr: int = DEFAULT_INT
     kord_wz: int = DEFAULT_INT
     n_split: int = DEFAULT_INT
+    q_split: int = DEFAULT_INT
+    tracer_substep_bands: int = 1
+    remap_drift_tolerance: float = 0.0
+    scratch_arena: bool = False
+    detailed_timing: bool = False
+    halo_statistics: bool = False
+    coalesce_halo_exchanges: bool = False
+    reduced_precision_halos: Tuple[str, ...] = ()
+    persistent_halo_exchanges: bool = False
+    overlap_tracer_halo_exchange: bool = False
     nord: int = DEFAULT_INT
     npx: int = DEFAULT_INT
     npy: int = DEFAULT_INT
@@ -289,7 +334,15 @@ class DynamicalCoreConfig:
     @classmethod
     def from_f90nml(cls, f90_namelist: f90nml.Namelist) -> "DynamicalCoreConfig":
         namelist = Namelist.from_f90nml(f90_namelist)
-        return cls.from_namelist(namelist)
+        config = cls.from_namelist(namelist)
+        # options of this port, unknown to the Fortran namelist
+        fv_core_nml = f90_namelist.get("fv_core_nml", {})
+        return dataclasses.replace(
+            config,
+            tracer_substep_bands=fv_core_nml.get(
+                "tracer_substep_bands", config.tracer_substep_bands
+            ),
+        )
 
     @classmethod
     def from_namelist(cls, namelist: Namelist) -> "DynamicalCoreConfig":
@@ -322,6 +375,7 @@ class DynamicalCoreConfig:
             kord_tr=namelist.kord_tr,
             kord_wz=namelist.kord_wz,
             n_split=namelist.n_split,
+            q_split=namelist.q_split,
             nord=namelist.nord,
             npx=namelist.npx,
             npy=namelist.npy,
@@ -435,6 +489,17 @@ class DynamicalCoreConfig:
             use_old_omega=self.use_old_omega,
             riemann=self.riemann,
             d_grid_shallow_water=self.d_grid_shallow_water,
+            coalesce_halo_exchanges=self.coalesce_halo_exchanges,
+            reduced_precision_halos=self.reduced_precision_halos,
+            persistent_halo_exchanges=self.persistent_halo_exchanges,
+        )
+
+    @property
+    def tracer_advection(self) -> TracerAdvectionConfig:
+        return TracerAdvectionConfig(
+            q_split=self.q_split,
+            n_substep_bands=self.tracer_substep_bands,
+            reduced_precision_halo="tracers" in self.reduced_precision_halos,
         )
 
     @property
@@ -476,4 +541,5 @@ class DynamicalCoreConfig:
             kord_mt=self.kord_mt,
             do_sat_adj=self.do_sat_adj,
             sat_adjust=self.sat_adjust,
+            drift_tolerance=self.remap_drift_tolerance,
         )
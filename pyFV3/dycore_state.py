@@ -1,6 +1,7 @@
 from dataclasses import asdict, dataclass, field, fields
-from typing import Any, Dict, Mapping, Union
+from typing import Any, Dict, Mapping, Optional, Union
 
+import numpy as np
 import xarray as xr
 
 import ndsl.dsl.gt4py_utils as gt_utils
@@ -16,6 +17,7 @@ from ndsl.constants import (
 from ndsl.dsl.typing import Float
 from ndsl.initialization.allocator import QuantityFactory
 from ndsl.initialization.sizer import GridSizer
+from ndsl.optional_imports import cupy as cp
 from ndsl.quantity import Quantity
 from ndsl.restart._legacy_restart import open_restart
 
@@ -312,18 +314,70 @@ class DycoreState:
                         )
 
     @classmethod
-    def init_zeros(cls, quantity_factory: QuantityFactory):
+    def init_zeros(
+        cls,
+        quantity_factory: QuantityFactory,
+        contiguous_tracers: bool = False,
+        storages: Optional[Mapping[str, Any]] = None,
+    ):
+        """
+        Args:
+            quantity_factory: creates quantities
+            contiguous_tracers: if True, the tracers in TRACER_NAMES are views
+                into a single buffer, available as tracer_block
+            storages: caller-owned buffers used as the storage of the fields
+                of the same name instead of zeroed allocations, the tracer
+                buffer being given as "tracer_block" (with contiguous_tracers).
+                They must have the shape, strides and dtype of the storages
+                quantity_factory allocates, and keep their values.
+        """
+        if storages is None:
+            storages = {}
+        field_names = [_field.name for _field in fields(cls)]
+        for name in storages.keys():
+            if name not in field_names and name != "tracer_block":
+                raise KeyError(name + " is provided, but not part of the dycore state")
+        if "tracer_block" in storages and not contiguous_tracers:
+            raise ValueError("a tracer_block storage requires contiguous_tracers")
         initial_storages = {}
         for _field in fields(cls):
             if "dims" in _field.metadata.keys():
-                initial_storages[_field.name] = quantity_factory.zeros(
+                if contiguous_tracers and _field.name in TRACER_NAMES:
+                    continue
+                storage = quantity_factory.zeros(
                     _field.metadata["dims"],
                     _field.metadata["units"],
                     dtype=Float,
                 ).data
-        return cls.init_from_storages(
+                if _field.name in storages:
+                    _check_storage_layout(_field.name, storages[_field.name], storage)
+                    storage = storages[_field.name]
+                initial_storages[_field.name] = storage
+        if contiguous_tracers:
+            tracer_block = _allocate_tracer_block(
+                quantity_factory.sizer, like=initial_storages["pt"]
+            )
+            if "tracer_block" in storages:
+                _check_storage_layout(
+                    "tracer_block", storages["tracer_block"], tracer_block
+                )
+                tracer_block = storages["tracer_block"]
+            for i_tracer, name in enumerate(TRACER_NAMES):
+                initial_storages[name] = tracer_block[..., i_tracer]
+        state = cls.init_from_storages(
             storages=initial_storages, sizer=quantity_factory.sizer
         )
+        if contiguous_tracers:
+            state._tracer_block = tracer_block
+        return state
+
+    @property
+    def tracer_block(self):
+        """
+        Buffer of dimensions [x, y, z, tracer] backing the tracers in
+        TRACER_NAMES order, or None if the tracers are allocated separately.
+        """
+        return getattr(self, "_tracer_block", None)
 
     @classmethod
     def init_from_numpy_arrays(
@@ -469,6 +523,56 @@ class DycoreState:
             return {k: v for k, v in asdict(self).items()}
 
 
+TRACER_NAMES = (
+    # same order as the GEOS 4D tracer array for the first 7 tracers
+    "qvapor",
+    "qliquid",
+    "qice",
+    "qrain",
+    "qsnow",
+    "qgraupel",
+    "qcld",
+    "qo3mr",
+    "qsgs_tke",
+)
+"""Order of the tracers in DycoreState.tracer_block"""
+
+
+def _check_storage_layout(name: str, storage: Any, expected: Any):
+    """Raise a ValueError if storage cannot be used in place of expected"""
+    for attribute in ("shape", "strides", "dtype"):
+        actual_value = getattr(storage, attribute, None)
+        expected_value = getattr(expected, attribute)
+        if actual_value != expected_value:
+            raise ValueError(
+                f"storage of {name} has {attribute} {actual_value}, "
+                f"the dycore requires {expected_value}"
+            )
+    if type(storage) is not type(expected):
+        raise ValueError(
+            f"storage of {name} is a {type(storage).__name__}, "
+            f"the dycore requires a {type(expected).__name__}"
+        )
+
+
+def _allocate_tracer_block(sizer: GridSizer, like: Any):
+    """
+    Allocate a zeroed [x, y, z, tracer] buffer in which each tracer is a
+    contiguous slab with the memory order of like, a 3D storage of the state.
+    """
+    shape = tuple(sizer.get_shape([X_DIM, Y_DIM, Z_DIM]))
+    if cp is not None and isinstance(like, cp.ndarray):
+        xp = cp
+    else:
+        xp = np
+    # axes from the slowest to the fastest varying, after the tracer axis
+    axes = sorted(range(3), key=lambda axis: like.strides[axis], reverse=True)
+    block = xp.zeros(
+        (len(TRACER_NAMES),) + tuple(shape[axis] for axis in axes), dtype=Float
+    )
+    return block.transpose(*(1 + axes.index(axis) for axis in range(3)), 0)
+
+
 TRACER_PROPERTIES = {
     "specific_humidity": {
         "dims": [Z_DIM, Y_DIM, X_DIM],
@@ -0,0 +1,224 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import ndsl.dsl.gt4py_utils as gt_utils
+from ndsl.comm.communicator import Communicator
+from ndsl.dsl.typing import Float
+from ndsl.grid.generation import MetricTerms
+from ndsl.grid.helper import (
+    AngleGridData,
+    ContravariantGridData,
+    DampingCoefficients,
+    GridData,
+    HorizontalGridData,
+    VerticalGridData,
+)
+from ndsl.logging import ndsl_log
+from ndsl.quantity import Quantity
+from pyFV3.utils.reductions import global_max
+
+
+_FORMAT_VERSION = 1
+
+_GRID_DATA_COMPONENTS = {
+    "horizontal_data": HorizontalGridData,
+    "vertical_data": VerticalGridData,
+    "contravariant_data": ContravariantGridData,
+    "angle_data": AngleGridData,
+}
+
+
+class GridCache:
+    """
+    Per-rank on-disk cache of the GridData and DampingCoefficients computed
+    from MetricTerms.
+
+    Each field is stored as a .npy file, memory-mapped when loading, in a
+    directory named after a hash of everything the grid depends on. The key
+    is also stored next to the fields and checked on load, so a cache
+    written for another configuration is never used.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        npx: int,
+        npy: int,
+        npz: int,
+        layout: Sequence[int],
+        rank: int,
+        backend: str,
+        eta_file: Optional[str] = None,
+    ):
+        """
+        Args:
+            directory: directory holding the caches of all ranks
+            npx: number of cell corners along x on a tile
+            npy: number of cell corners along y on a tile
+            npz: number of vertical levels
+            layout: ranks along x and y on a tile
+            rank: rank of the process
+            backend: backend of the quantities to load
+            eta_file: file defining the vertical coordinate, if any
+        """
+        self._backend = backend
+        eta_file_stat: Optional[Tuple[int, int]] = None
+        if eta_file is not None and os.path.exists(eta_file):
+            stat = os.stat(eta_file)
+            eta_file_stat = (stat.st_size, stat.st_mtime_ns)
+        self.key: Dict[str, Any] = json.loads(
+            json.dumps(
+                {
+                    "version": _FORMAT_VERSION,
+                    "npx": npx,
+                    "npy": npy,
+                    "npz": npz,
+                    "layout": list(layout),
+                    "rank": rank,
+                    "eta_file": eta_file,
+                    "eta_file_stat": eta_file_stat,
+                    "float": np.dtype(Float).name,
+                }
+            )
+        )
+        encoded_key = json.dumps(self.key, sort_keys=True).encode()
+        digest = hashlib.sha1(encoded_key).hexdigest()[:16]
+        self.path = os.path.join(directory, f"grid_{digest}", f"rank_{rank}")
+
+    def load(self) -> Optional[Tuple[GridData, DampingCoefficients]]:
+        """The cached grid, or None if there is no valid cache"""
+        try:
+            with open(os.path.join(self.path, "index.json")) as f:
+                index = json.load(f)
+            if index["key"] != self.key:
+                ndsl_log.info(f"grid cache {self.path} does not match, ignoring it")
+                return None
+            grid_data = GridData(
+                **{
+                    name: self._load_dataclass(cls, index["fields"][name])
+                    for name, cls in _GRID_DATA_COMPONENTS.items()
+                }
+            )
+            damping_coefficients = self._load_dataclass(
+                DampingCoefficients, index["fields"]["damping_coefficients"]
+            )
+        except (OSError, KeyError, TypeError, ValueError) as error:
+            if not isinstance(error, FileNotFoundError):
+                ndsl_log.warning(f"could not read grid cache {self.path}: {error}")
+            return None
+        return grid_data, damping_coefficients
+
+    def _load_dataclass(self, cls, fields: Dict[str, Any]):
+        values = {}
+        for name, entry in fields.items():
+            if entry["kind"] == "quantity":
+                values[name] = Quantity(
+                    np.load(os.path.join(self.path, entry["file"]), mmap_mode="c"),
+                    entry["dims"],
+                    entry["units"],
+                    origin=tuple(entry["origin"]),
+                    extent=tuple(entry["extent"]),
+                    gt4py_backend=self._backend,
+                )
+            else:
+                values[name] = entry["value"]
+        return cls(**values)
+
+    def save(self, grid_data: GridData, damping_coefficients: DampingCoefficients):
+        """
+        Write the cache, replacing any previous one. Failures are logged and
+        otherwise ignored, the cache being only an optimization.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=os.path.dirname(self.path))
+        try:
+            index_fields = {
+                name: _save_dataclass(
+                    getattr(grid_data, f"_{name}"), temporary_path, name
+                )
+                for name in _GRID_DATA_COMPONENTS
+            }
+            index_fields["damping_coefficients"] = _save_dataclass(
+                damping_coefficients, temporary_path, "damping_coefficients"
+            )
+            with open(os.path.join(temporary_path, "index.json"), "w") as f:
+                json.dump({"key": self.key, "fields": index_fields}, f, indent=2)
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+            os.replace(temporary_path, self.path)
+        except (OSError, TypeError) as error:
+            ndsl_log.warning(f"could not write grid cache {self.path}: {error}")
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+
+def _save_dataclass(instance, path: str, prefix: str) -> Dict[str, Any]:
+    """Save the fields of instance under path, returning their index entries"""
+    entries: Dict[str, Any] = {}
+    for _field in dataclasses.fields(instance):
+        if not _field.init:
+            continue
+        value = getattr(instance, _field.name)
+        if isinstance(value, Quantity):
+            filename = f"{prefix}.{_field.name}.npy"
+            np.save(os.path.join(path, filename), gt_utils.asarray(value.data))
+            entries[_field.name] = {
+                "kind": "quantity",
+                "file": filename,
+                "dims": list(value.dims),
+                "units": value.units,
+                "origin": list(value.origin),
+                "extent": list(value.extent),
+            }
+        elif value is None or isinstance(value, (bool, int, float, np.number)):
+            if isinstance(value, np.number):
+                value = value.item()
+            entries[_field.name] = {"kind": "scalar", "value": value}
+        else:
+            raise TypeError(
+                f"{type(instance).__name__}.{_field.name} of type "
+                f"{type(value).__name__} cannot be cached"
+            )
+    return entries
+
+
+def load_or_compute_grid(
+    cache: Optional[GridCache],
+    metric_terms: Callable[[], MetricTerms],
+    communicator: Communicator,
+) -> Tuple[GridData, DampingCoefficients]:
+    """
+    Grid data and damping coefficients read from cache if the cache of every
+    rank holds them, otherwise computed from the metric terms on every rank
+    and written to the caches which did not hold them.
+
+    Args:
+        cache: cache of this rank, or None to always compute, which must be
+            None on every rank or on none
+        metric_terms: creates the metric terms, only called on a cache miss
+        communicator: communicator of the ranks computing the grid together,
+            whose halo exchanges while computing the metric terms must be
+            done by all ranks or none
+    """
+    cached = None
+    if cache is not None:
+        cached = cache.load()
+        any_missed = global_max(communicator.comm, np.array([int(cached is None)]))[0]
+        if not any_missed:
+            ndsl_log.debug(f"grid read from cache {cache.path}")
+            return cached
+        if cached is not None:
+            ndsl_log.info("grid cache missing on some ranks, computing the grid")
+    terms = metric_terms()
+    grid_data = GridData.new_from_metric_terms(terms)
+    damping_coefficients = DampingCoefficients.new_from_metric_terms(terms)
+    if cache is not None and cached is None:
+        cache.save(grid_data, damping_coefficients)
+    return grid_data, damping_coefficients
@@ -0,0 +1,351 @@
+import dataclasses
+import weakref
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ndsl.comm.communicator import Communicator
+from ndsl.comm.mpi import MPI
+from ndsl.constants import (
+    X_DIM,
+    X_INTERFACE_DIM,
+    Y_DIM,
+    Y_INTERFACE_DIM,
+    Z_DIM,
+    Z_INTERFACE_DIM,
+)
+from ndsl.dsl.dace.orchestration import dace_inhibitor
+from ndsl.dsl.dace.wrapped_halo_exchange import WrappedHaloUpdater
+from ndsl.dsl.typing import Float
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.quantity import Quantity, QuantityHaloSpec
+
+
+REDUCED_PRECISION_HALOS = ("divgd", "heat_source", "omga", "tracers")
+"""halo exchanges which can be sent as float32"""
+
+_forced_reduced_precision_halos: Optional[FrozenSet[str]] = None
+
+
+def vertical_halo_spec(
+    spec: QuantityHaloSpec, k_start: int, nk: int
+) -> QuantityHaloSpec:
+    """
+    Halo specification exchanging only the levels k_start to k_start + nk - 1
+    of quantities matching spec.
+
+    Args:
+        spec: specification of the full quantities
+        k_start: first level to exchange, relative to the compute domain
+        nk: number of levels to exchange
+    """
+    origin = list(spec.origin)
+    extent = list(spec.extent)
+    for i_dim, dim in enumerate(spec.dims):
+        if dim in (Z_DIM, Z_INTERFACE_DIM):
+            if k_start < 0 or nk < 1 or k_start + nk > extent[i_dim]:
+                raise ValueError(
+                    f"levels {k_start} to {k_start + nk - 1} are outside of "
+                    f"the {extent[i_dim]} levels of dimension {dim}"
+                )
+            origin[i_dim] += k_start
+            extent[i_dim] = nk
+            return dataclasses.replace(spec, origin=tuple(origin), extent=tuple(extent))
+    raise ValueError(f"spec with dims {spec.dims} has no vertical dimension")
+
+
+def set_forced_reduced_precision_halos(names: Optional[Sequence[str]]):
+    """
+    Send the given halo exchanges as float32 whatever the configuration,
+    or follow the configuration again if names is None.
+    """
+    global _forced_reduced_precision_halos
+    if names is None:
+        _forced_reduced_precision_halos = None
+    else:
+        check_reduced_precision_halos(names)
+        _forced_reduced_precision_halos = frozenset(names)
+
+
+def check_reduced_precision_halos(names: Sequence[str]):
+    unknown = set(names).difference(REDUCED_PRECISION_HALOS)
+    if len(unknown) > 0:
+        raise ValueError(
+            f"halo exchanges {sorted(unknown)} cannot be sent as float32, "
+            f"valid names are {REDUCED_PRECISION_HALOS}"
+        )
+
+
+def uses_reduced_precision_halo(name: str, configured: bool) -> bool:
+    """
+    True if the halo exchange of the given name is sent as float32.
+
+    Args:
+        name: one of REDUCED_PRECISION_HALOS
+        configured: if the configuration requests float32 for this exchange
+    """
+    if np.dtype(Float).itemsize <= np.dtype(np.float32).itemsize:
+        return False
+    if _forced_reduced_precision_halos is not None:
+        return name in _forced_reduced_precision_halos
+    return configured
+
+
+class ReducedPrecisionHaloUpdater:
+    """
+    Halo updater sending the halos of Float quantities as float32, halving
+    the bytes exchanged at the price of rounding the halo values.
+
+    The points sent across each boundary are copied into float32 buffers
+    which are exchanged, then the points received across each boundary are
+    copied back. Other points of the quantities are left untouched.
+    """
+
+    def __init__(
+        self,
+        comm: Communicator,
+        quantity_factory: QuantityFactory,
+        quantities: Dict[str, Quantity],
+        n_halo: int,
+        vertical_range: Optional[Tuple[int, int]] = None,
+    ):
+        """
+        Args:
+            comm: communicator of the exchanges
+            quantity_factory: factory of the float32 buffers
+            quantities: quantities to exchange, by name
+            n_halo: number of halo points to exchange
+            vertical_range: (k_start, nk), to exchange only the levels
+                k_start to k_start + nk - 1 (see vertical_halo_spec)
+        """
+        self._quantities = list(quantities.values())
+        self._buffers = {
+            name: quantity_factory.zeros(
+                quantity.dims,
+                units=quantity.units,
+                dtype=np.float32,
+                allow_mismatch_float_precision=True,
+            )
+            for name, quantity in quantities.items()
+        }
+        self.halo_specs = [
+            quantity_factory.get_quantity_halo_spec(
+                dims=quantity.dims, n_halo=n_halo, dtype=np.float32
+            )
+            for quantity in self._quantities
+        ]
+        if vertical_range is not None:
+            self.halo_specs = [
+                vertical_halo_spec(spec, *vertical_range) for spec in self.halo_specs
+            ]
+        self._updater = WrappedHaloUpdater(
+            comm.get_scalar_halo_updater(self.halo_specs),
+            self._buffers,
+            list(quantities.keys()),
+        )
+        # only the points sent across a boundary need to be rounded, and
+        # only the points received from one are updated
+        self._pack_slices = [
+            [boundary.send_slice(spec) for boundary in comm.boundaries.values()]
+            for spec in self.halo_specs
+        ]
+        self._unpack_slices = [
+            [boundary.recv_slice(spec) for boundary in comm.boundaries.values()]
+            for spec in self.halo_specs
+        ]
+
+    @dace_inhibitor
+    def _pack(self):
+        for quantity, buffer, pack_slices in zip(
+            self._quantities, self._buffers.values(), self._pack_slices
+        ):
+            for pack_slice in pack_slices:
+                buffer.data[pack_slice] = quantity.data[pack_slice]
+
+    @dace_inhibitor
+    def _unpack(self):
+        for quantity, buffer, unpack_slices in zip(
+            self._quantities, self._buffers.values(), self._unpack_slices
+        ):
+            for unpack_slice in unpack_slices:
+                quantity.data[unpack_slice] = buffer.data[unpack_slice]
+
+    @dace_inhibitor
+    def start(self):
+        self._pack()
+        self._updater.start()
+
+    @dace_inhibitor
+    def wait(self):
+        self._updater.wait()
+        self._unpack()
+
+    @dace_inhibitor
+    def update(self):
+        self.start()
+        self.wait()
+
+
+def _rotate_scalar_data(data, dims: Sequence[str], n_clockwise_rotations: int):
+    """View of data rotated clockwise in the horizontal plane"""
+    n_clockwise_rotations = n_clockwise_rotations % 4
+    if n_clockwise_rotations == 0:
+        return data
+    x_axis = [i for i, dim in enumerate(dims) if dim in (X_DIM, X_INTERFACE_DIM)][0]
+    y_axis = [i for i, dim in enumerate(dims) if dim in (Y_DIM, Y_INTERFACE_DIM)][0]
+    if n_clockwise_rotations == 1:
+        return np.rot90(data, axes=(y_axis, x_axis))
+    elif n_clockwise_rotations == 2:
+        return np.rot90(data, k=2, axes=(x_axis, y_axis))
+    else:
+        return np.rot90(data, axes=(x_axis, y_axis))
+
+
+@dataclasses.dataclass(frozen=True)
+class _PlannedCopy:
+    """Copy between a slice of a quantity and a range of a message buffer"""
+
+    data: np.ndarray
+    data_slice: Tuple[slice, ...]
+    dims: Tuple[str, ...]
+    start: int
+    stop: int
+
+
+def _free_mpi_objects(mpi_objects: Sequence[Any]):
+    # objects cannot be freed, nor need to be, once MPI is finalized
+    if not MPI.Is_finalized():
+        for mpi_object in mpi_objects:
+            mpi_object.Free()
+
+
+def free_when_collected(owner: Any, *mpi_objects: Any) -> weakref.finalize:
+    """
+    Free the given MPI objects, e.g. communicators or persistent requests,
+    once owner is garbage collected or the returned finalizer is called.
+    """
+    return weakref.finalize(owner, _free_mpi_objects, list(mpi_objects))
+
+
+def supports_persistent_halo_exchange(
+    comm: Communicator, quantities: Sequence[Quantity]
+) -> bool:
+    """True if PersistentHaloUpdater can exchange the quantities over comm"""
+    return (
+        MPI is not None
+        and hasattr(comm.comm, "Send_init")
+        and all(isinstance(quantity.data, np.ndarray) for quantity in quantities)
+    )
+
+
+class PersistentHaloUpdater:
+    """
+    Halo updater of scalar quantities whose exchange is planned once.
+
+    The send and receive slices of each boundary, one contiguous send and
+    receive buffer per boundary and persistent MPI requests are created on
+    construction, so that an exchange only packs the buffers, starts all
+    requests, waits for them and unpacks the buffers.
+
+    Check supports_persistent_halo_exchange before creating it.
+    """
+
+    def __init__(
+        self,
+        comm: Communicator,
+        mpi_comm,
+        tag: int,
+        quantities: Sequence[Tuple[Quantity, QuantityHaloSpec]],
+    ):
+        """
+        Args:
+            comm: communicator giving the boundaries of this rank
+            mpi_comm: mpi4py communicator the exchanges are sent on, which
+                should not be used for other messages with the same tag
+            tag: tag of the messages of this updater
+            quantities: quantities to exchange, with their halo specification
+        """
+        dtypes = set(np.dtype(quantity.data.dtype) for quantity, _ in quantities)
+        if len(dtypes) != 1:
+            raise ValueError(
+                "PersistentHaloUpdater: quantities must share a dtype, "
+                f"got {sorted(str(dtype) for dtype in dtypes)}"
+            )
+        dtype = dtypes.pop()
+        self._packs: List[Tuple[np.ndarray, List[_PlannedCopy], int]] = []
+        self._unpacks: List[Tuple[np.ndarray, List[_PlannedCopy]]] = []
+        receive_requests = []
+        send_requests = []
+        for boundary in comm.boundaries.values():
+            send_copies: List[_PlannedCopy] = []
+            receive_copies: List[_PlannedCopy] = []
+            send_size = 0
+            receive_size = 0
+            for quantity, spec in quantities:
+                send_slice = boundary.send_slice(spec)
+                n_send = quantity.data[send_slice].size
+                send_copies.append(
+                    _PlannedCopy(
+                        quantity.data,
+                        send_slice,
+                        tuple(quantity.dims),
+                        send_size,
+                        send_size + n_send,
+                    )
+                )
+                send_size += n_send
+                receive_slice = boundary.recv_slice(spec)
+                n_receive = quantity.data[receive_slice].size
+                receive_copies.append(
+                    _PlannedCopy(
+                        quantity.data,
+                        receive_slice,
+                        tuple(quantity.dims),
+                        receive_size,
+                        receive_size + n_receive,
+                    )
+                )
+                receive_size += n_receive
+            send_buffer = np.empty(send_size, dtype=dtype)
+            receive_buffer = np.empty(receive_size, dtype=dtype)
+            # data is rotated counterclockwise before sending so that it has
+            # the orientation of the receiving rank once across the boundary
+            self._packs.append(
+                (send_buffer, send_copies, -boundary.n_clockwise_rotations)
+            )
+            self._unpacks.append((receive_buffer, receive_copies))
+            send_requests.append(
+                mpi_comm.Send_init(send_buffer, dest=boundary.to_rank, tag=tag)
+            )
+            receive_requests.append(
+                mpi_comm.Recv_init(receive_buffer, source=boundary.to_rank, tag=tag)
+            )
+        self._requests = receive_requests + send_requests
+        self._free_requests = free_when_collected(self, *self._requests)
+
+    @dace_inhibitor
+    def start(self):
+        for buffer, copies, n_clockwise_rotations in self._packs:
+            for copy in copies:
+                data = _rotate_scalar_data(
+                    copy.data[copy.data_slice], copy.dims, n_clockwise_rotations
+                )
+                buffer[copy.start : copy.stop].reshape(data.shape)[...] = data
+        MPI.Prequest.Startall(self._requests)
+
+    @dace_inhibitor
+    def wait(self):
+        MPI.Request.Waitall(self._requests)
+        for buffer, copies in self._unpacks:
+            for copy in copies:
+                target = copy.data[copy.data_slice]
+                target[...] = buffer[copy.start : copy.stop].reshape(target.shape)
+
+    @dace_inhibitor
+    def update(self):
+        self.start()
+        self.wait()
+
+    def free(self):
+        """Free the persistent requests, the updater cannot be used after"""
+        self._free_requests()
@@ -0,0 +1,197 @@
+import contextlib
+import dataclasses
+import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ndsl.dsl.typing import Float
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.quantity import Quantity
+
+
+@dataclasses.dataclass(frozen=True)
+class AllocationRecord:
+    component: Tuple[str, ...]
+    """component scopes open at the time of the allocation, outermost first"""
+    dims: Tuple[str, ...]
+    dtype: str
+    nbytes: int
+
+
+class RecordingQuantityFactory:
+    """
+    QuantityFactory which records every quantity it allocates, attributed to
+    the component scopes open at the time of the allocation.
+
+    Give it to DynamicalCore (or any other component) in place of its
+    QuantityFactory, then use `by_component`, `table` or `to_json` to get the
+    breakdown of allocated memory. Components are constructed within
+    `component_scope`, e.g. DynamicalCore scopes each of its sub-components.
+    """
+
+    def __init__(self, quantity_factory: QuantityFactory):
+        self._quantity_factory = quantity_factory
+        self.records: List[AllocationRecord] = []
+        self._components: List[str] = []
+
+    @contextlib.contextmanager
+    def component(self, name: str) -> Iterator[None]:
+        """Attribute the allocations made within the context to component name"""
+        self._components.append(name)
+        try:
+            yield
+        finally:
+            self._components.pop()
+
+    def _record(self, quantity: Quantity, dims: Sequence[str]) -> Quantity:
+        self.records.append(
+            AllocationRecord(
+                component=tuple(self._components),
+                dims=tuple(dims),
+                dtype=np.dtype(quantity.data.dtype).name,
+                nbytes=quantity.data.nbytes,
+            )
+        )
+        return quantity
+
+    def zeros(
+        self,
+        dims: Sequence[str],
+        units: str,
+        dtype: type = Float,
+        allow_mismatch_float_precision: bool = False,
+    ) -> Quantity:
+        return self._record(
+            self._quantity_factory.zeros(
+                dims,
+                units,
+                dtype=dtype,
+                allow_mismatch_float_precision=allow_mismatch_float_precision,
+            ),
+            dims,
+        )
+
+    def ones(
+        self,
+        dims: Sequence[str],
+        units: str,
+        dtype: type = Float,
+        allow_mismatch_float_precision: bool = False,
+    ) -> Quantity:
+        return self._record(
+            self._quantity_factory.ones(
+                dims,
+                units,
+                dtype=dtype,
+                allow_mismatch_float_precision=allow_mismatch_float_precision,
+            ),
+            dims,
+        )
+
+    def empty(
+        self,
+        dims: Sequence[str],
+        units: str,
+        dtype: type = Float,
+        allow_mismatch_float_precision: bool = False,
+    ) -> Quantity:
+        return self._record(
+            self._quantity_factory.empty(
+                dims,
+                units,
+                dtype=dtype,
+                allow_mismatch_float_precision=allow_mismatch_float_precision,
+            ),
+            dims,
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._quantity_factory, name)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(record.nbytes for record in self.records)
+
+    def by_component(self, depth: Optional[int] = None) -> Dict[str, int]:
+        """
+        Bytes allocated by each component, including its children.
+
+        Args:
+            depth: number of levels of the component hierarchy to keep,
+                all levels if None
+        """
+        totals: Dict[str, int] = {}
+        for record in self.records:
+            component = record.component if depth is None else record.component[:depth]
+            key = "/".join(component) or "<unattributed>"
+            totals[key] = totals.get(key, 0) + record.nbytes
+        return totals
+
+    def breakdown(self) -> List[dict]:
+        """
+        Count and bytes of the allocations of each component, grouped by
+        dimensions and dtype, largest first.
+        """
+        groups: Dict[Tuple[str, Tuple[str, ...], str], List[int]] = {}
+        for record in self.records:
+            key = (
+                "/".join(record.component) or "<unattributed>",
+                record.dims,
+                record.dtype,
+            )
+            count_and_bytes = groups.setdefault(key, [0, 0])
+            count_and_bytes[0] += 1
+            count_and_bytes[1] += record.nbytes
+        rows = [
+            {
+                "component": component,
+                "dims": list(dims),
+                "dtype": dtype,
+                "count": count,
+                "nbytes": nbytes,
+            }
+            for (component, dims, dtype), (count, nbytes) in groups.items()
+        ]
+        return sorted(rows, key=lambda row: row["nbytes"], reverse=True)
+
+    def table(self) -> str:
+        """Human-readable version of `breakdown`"""
+        lines = [f"{'MiB':>10} {'count':>6}  component  dims  dtype"]
+        for row in self.breakdown():
+            lines.append(
+                f"{row['nbytes'] / 2**20:10.2f} {row['count']:6d}  "
+                f"{row['component']}  [{', '.join(row['dims'])}]  {row['dtype']}"
+            )
+        lines.append(f"{self.total_bytes / 2**20:10.2f} {len(self.records):6d}  total")
+        return "\n".join(lines)
+
+    def to_json(self, filename: str):
+        with open(filename, "w") as f:
+            json.dump(
+                {
+                    "total_bytes": self.total_bytes,
+                    "by_component": self.by_component(),
+                    "breakdown": self.breakdown(),
+                },
+                f,
+                indent=2,
+            )
+
+
+@contextlib.contextmanager
+def component_scope(quantity_factory, name: str) -> Iterator[None]:
+    """
+    Attribute the allocations of quantity_factory made within the context to
+    component name, if quantity_factory records them.
+
+    Args:
+        quantity_factory: factory given to the component, only a
+            RecordingQuantityFactory records allocations
+        name: name of the component, nested within the enclosing scopes
+    """
+    if isinstance(quantity_factory, RecordingQuantityFactory):
+        with quantity_factory.component(name):
+            yield
+    else:
+        yield
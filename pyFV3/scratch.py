@@ -0,0 +1,125 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from ndsl.dsl.typing import Float
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.quantity import Quantity
+
+
+_BufferKey = Tuple[Tuple[str, ...], str]
+
+
+class ScratchFactory:
+    """
+    Creates the scratch quantities of one phase of a ScratchArena.
+
+    Components take it as their scratch_factory and only create through it
+    the quantities they fully write before reading them in each call, every
+    other quantity is created by their quantity_factory.
+    """
+
+    def __init__(self, arena: "ScratchArena", phase: str):
+        self._arena = arena
+        self.phase = phase
+        self._n_requested: Dict[_BufferKey, int] = {}
+        self.requested_bytes = 0
+
+    def empty(
+        self,
+        dims: Sequence[str],
+        units: str,
+        dtype: type = Float,
+        allow_mismatch_float_precision: bool = False,
+    ) -> Quantity:
+        """
+        Quantity backed by an arena buffer, holding the values left by
+        whichever phase last wrote the buffer.
+        """
+        key = (tuple(dims), np.dtype(dtype).str)
+        index = self._n_requested.get(key, 0)
+        self._n_requested[key] = index + 1
+        buffer = self._arena._get_buffer(
+            key, index, dtype, allow_mismatch_float_precision
+        )
+        self.requested_bytes += buffer.data.nbytes
+        # without a gt4py backend, the quantity wraps the buffer without copy
+        quantity = Quantity(
+            buffer.data,
+            dims=list(dims),
+            units=units,
+            origin=buffer.origin,
+            extent=buffer.extent,
+        )
+        if quantity.data is not buffer.data:
+            raise RuntimeError(
+                f"scratch quantity of phase {self.phase} does not share "
+                "the memory of its arena buffer"
+            )
+        return quantity
+
+
+class ScratchArena:
+    """
+    Scratch memory shared by components which never run at the same time.
+
+    Each phase creates its scratch quantities through its own ScratchFactory.
+    The n-th quantity of given dims and dtype requested by a phase shares its
+    buffer with the n-th quantity of the same dims and dtype of every other
+    phase, so the arena only holds as many buffers as the most demanding
+    phase needs. Scratch values are not preserved from one phase to another,
+    nor from one call of a component to the next.
+    """
+
+    def __init__(self, quantity_factory: QuantityFactory):
+        self.quantity_factory = quantity_factory
+        self._buffers: Dict[_BufferKey, List[Quantity]] = {}
+        self._phases: Dict[str, ScratchFactory] = {}
+
+    def phase(self, name: str) -> ScratchFactory:
+        """Factory for the scratch quantities of the given phase"""
+        if name not in self._phases:
+            self._phases[name] = ScratchFactory(self, name)
+        return self._phases[name]
+
+    def _get_buffer(
+        self,
+        key: _BufferKey,
+        index: int,
+        dtype: type,
+        allow_mismatch_float_precision: bool,
+    ) -> Quantity:
+        buffers = self._buffers.setdefault(key, [])
+        while len(buffers) <= index:
+            buffers.append(
+                self.quantity_factory.zeros(
+                    list(key[0]),
+                    units="",
+                    dtype=dtype,
+                    allow_mismatch_float_precision=allow_mismatch_float_precision,
+                )
+            )
+        return buffers[index]
+
+    @property
+    def peak_bytes(self) -> int:
+        """Bytes allocated by the arena"""
+        return sum(
+            buffer.data.nbytes
+            for buffers in self._buffers.values()
+            for buffer in buffers
+        )
+
+    @property
+    def summed_bytes(self) -> int:
+        """Bytes the phases would need if they did not share buffers"""
+        return sum(phase.requested_bytes for phase in self._phases.values())
+
+    def report(self) -> str:
+        lines = [
+            f"scratch arena: {self.peak_bytes / 2**20:.1f} MiB allocated, "
+            f"{self.summed_bytes / 2**20:.1f} MiB requested"
+        ]
+        for name, phase in self._phases.items():
+            lines.append(f"  {name}: {phase.requested_bytes / 2**20:.1f} MiB")
+        return "\n".join(lines)
@@ -1,4 +1,4 @@
-from typing import Dict, Mapping
+from typing import Dict, Mapping, Optional
 
 import gt4py.cartesian.gtscript as gtscript
 from gt4py.cartesian.gtscript import (
@@ -592,6 +592,11 @@ def accumulate_heat_source_and_dissipation_estimate(
         diss_est_total += diss_est
 
 
+def accumulate(increment: FloatField, total: FloatField):
+    with computation(PARALLEL), interval(...):
+        total += increment
+
+
 # TODO(eddied): Had to split this into a separate stencil to get this to validate
 #               with GTC, suspect a merging issue...
 def update_u_and_v(
@@ -797,12 +802,24 @@ class DGridShallowWaterLagrangianDynamics:
         nested: bool,
         stretched_grid: bool,
         config: DGridShallowWaterLagrangianDynamicsConfig,
+        heat_source_levels: Optional[int] = None,
     ):
+        """
+        Args:
+            heat_source_levels: number of levels, from the top, on which the
+                heat source is accumulated, all levels if None. The heat source
+                of the other levels is left untouched.
+        """
         orchestrate(obj=self, config=stencil_factory.config.dace_config)
         self.grid_data = grid_data
         self._f0 = self.grid_data.fC_agrid
         self._d_con = config.d_con
         self._do_stochastic_ke_backscatter = config.do_skeb
+        npz = stencil_factory.grid_indexing.domain[2]
+        if heat_source_levels is None:
+            heat_source_levels = npz
+        self._accumulate_all_levels = heat_source_levels == npz
+        self._accumulate_heat_source = heat_source_levels > 0
 
         self.grid_indexing = stencil_factory.grid_indexing
         self._grid_type = config.grid_type
@@ -1009,12 +1026,32 @@ class DGridShallowWaterLagrangianDynamics:
         )
 
         if (self._d_con > 1.0e-5) or (self._do_stochastic_ke_backscatter):
-            self._accumulate_heat_source_and_dissipation_estimate_stencil = (
-                stencil_factory.from_dims_halo(
-                    func=accumulate_heat_source_and_dissipation_estimate,
-                    compute_dims=[X_DIM, Y_DIM, Z_DIM],
+            if self._accumulate_all_levels:
+                self._accumulate_heat_source_and_dissipation_estimate_stencil = (
+                    stencil_factory.from_dims_halo(
+                        func=accumulate_heat_source_and_dissipation_estimate,
+                        compute_dims=[X_DIM, Y_DIM, Z_DIM],
+                    )
                 )
-            )
+            else:
+                # the heat source is only accumulated on the levels where it
+                # is used, the dissipation estimate is needed on all levels
+                self._accumulate_dissipation_estimate_stencil = (
+                    stencil_factory.from_dims_halo(
+                        func=accumulate,
+                        compute_dims=[X_DIM, Y_DIM, Z_DIM],
+                    )
+                )
+                if self._accumulate_heat_source:
+                    heat_source_stencil_factory = stencil_factory.restrict_vertical(
+                        nk=heat_source_levels
+                    )
+                    self._accumulate_heat_source_stencil = (
+                        heat_source_stencil_factory.from_dims_halo(
+                            func=accumulate,
+                            compute_dims=[X_DIM, Y_DIM, Z_DIM],
+                        )
+                    )
 
         self._compute_vorticity_stencil = stencil_factory.from_dims_halo(
             compute_vorticity,
@@ -1331,9 +1368,16 @@ class DGridShallowWaterLagrangianDynamics:
         )
 
         if (self._d_con > 1.0e-5) or (self._do_stochastic_ke_backscatter):
-            self._accumulate_heat_source_and_dissipation_estimate_stencil(
-                self._tmp_heat_s, heat_source, self._tmp_diss_e, diss_est
-            )
+            if self._accumulate_all_levels:
+                self._accumulate_heat_source_and_dissipation_estimate_stencil(
+                    self._tmp_heat_s, heat_source, self._tmp_diss_e, diss_est
+                )
+            else:
+                self._accumulate_dissipation_estimate_stencil(
+                    self._tmp_diss_e, diss_est
+                )
+                if self._accumulate_heat_source:
+                    self._accumulate_heat_source_stencil(self._tmp_heat_s, heat_source)
 
         self._update_u_and_v_stencil(
             self._tmp_ut,
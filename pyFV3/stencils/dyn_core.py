@@ -1,4 +1,4 @@
-from typing import Dict, Mapping, Optional
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 from dace.frontend.python.interface import nounroll as dace_nounroll
 from gt4py.cartesian.gtscript import (
@@ -37,14 +37,29 @@ from ndsl.dsl.stencil import GridIndexing, StencilFactory
 from ndsl.dsl.typing import Float, FloatField, FloatFieldIJ
 from ndsl.grid import DampingCoefficients, GridData
 from ndsl.initialization.allocator import QuantityFactory
-from ndsl.quantity import Quantity
+from ndsl.performance.timer import NullTimer, Timer
+from ndsl.quantity import Quantity, QuantityHaloSpec
 from pyFV3._config import AcousticDynamicsConfig
 from pyFV3.dycore_state import DycoreState
+from pyFV3.halo import (
+    PersistentHaloUpdater,
+    ReducedPrecisionHaloUpdater,
+    free_when_collected,
+    supports_persistent_halo_exchange,
+    uses_reduced_precision_halo,
+    vertical_halo_spec,
+)
 from pyFV3.stencils.c_sw import CGridShallowWaterDynamics
 from pyFV3.stencils.del2cubed import HyperdiffusionDamping
 from pyFV3.stencils.pk3_halo import PK3Halo
 from pyFV3.stencils.riem_solver3 import NonhydrostaticVerticalSolver
 from pyFV3.stencils.riem_solver_c import NonhydrostaticVerticalSolverCGrid
+from pyFV3.timing import (
+    HaloExchangeStatistics,
+    HierarchicalTimer,
+    TimedHaloUpdater,
+    halo_exchange_bytes,
+)
 
 
 HUGE_R = 1.0e40
@@ -193,7 +208,15 @@ def get_nk_heat_dissipation(
 
 def dyncore_temporaries(
     quantity_factory: QuantityFactory,
+    scratch_factory: Optional[QuantityFactory] = None,
 ) -> Mapping[str, Quantity]:
+    """
+    Quantities of AcousticDynamics, those written before being read in each
+    acoustic substep being created by scratch_factory, which defaults to
+    quantity_factory.
+    """
+    if scratch_factory is None:
+        scratch_factory = quantity_factory
     temporaries: Dict[str, Quantity] = {}
     for name in ["ut", "vt", "gz", "zh", "pem", "pkc", "pk3", "heat_source", "cappa"]:
         # TODO: the dimensions of ut and vt may not be correct,
@@ -214,19 +237,21 @@ def dyncore_temporaries(
         units="unknown",
         dtype=Float,
     )
-    temporaries["ws3"] = quantity_factory.zeros(
+    # surface wind of the C-grid vertical solver, from updatedzc
+    temporaries["ws3"] = scratch_factory.empty(
         dims=[X_DIM, Y_DIM],
         units="unknown",
         dtype=Float,
     )
+    # Courant numbers and area fluxes of each substep, from d_sw
     for name in ["crx", "xfx"]:
-        temporaries[name] = quantity_factory.zeros(
+        temporaries[name] = scratch_factory.empty(
             dims=[X_INTERFACE_DIM, Y_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
         )
     for name in ["cry", "yfx"]:
-        temporaries[name] = quantity_factory.zeros(
+        temporaries[name] = scratch_factory.empty(
             dims=[X_DIM, Y_INTERFACE_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
@@ -234,6 +259,24 @@ def dyncore_temporaries(
     return temporaries
 
 
+class _CoalescedHaloUpdater:
+    """
+    Stands in for a halo updater whose exchange is carried by the updater of
+    another group, started and waited at the same program point.
+    """
+
+    def __init__(self, carrier: str):
+        self.carrier = carrier
+
+    @dace_inhibitor
+    def start(self):
+        pass
+
+    @dace_inhibitor
+    def wait(self):
+        pass
+
+
 class AcousticDynamics:
     """
     Fortran name is dyn_core
@@ -255,6 +298,10 @@ class AcousticDynamics:
             divgd: Quantity,
             heat_source: Quantity,
             pkc: Quantity,
+            coalesce: bool = False,
+            reduced_precision: Sequence[str] = (),
+            persistent: bool = False,
+            heat_source_levels: Optional[int] = None,
         ):
             # Define the memory specification required
             # Those can be re-used as they are read-only descriptors
@@ -334,11 +381,26 @@ class AcousticDynamics:
                 {"divgd": divgd},
                 ["divgd"],
             )
-            self.heat_source = WrappedHaloUpdater(
-                comm.get_scalar_halo_updater([full_size_xyz_halo_spec]),
-                {"heat_source": heat_source},
-                ["heat_source"],
-            )
+            # heat_source is only read on the top heat_source_levels levels,
+            # where diffusive heating is applied, and its hyperdiffusion does
+            # not mix levels, so the other levels need no halo values.
+            # With no heated levels it is not exchanged at all.
+            exchange_heat_source = heat_source_levels != 0
+            heat_source_vertical_range: Optional[Tuple[int, int]] = None
+            heat_source_halo_spec = full_size_xyz_halo_spec
+            if heat_source_levels is not None and (
+                0 < heat_source_levels < grid_indexing.domain[2]
+            ):
+                heat_source_vertical_range = (0, heat_source_levels)
+                heat_source_halo_spec = vertical_halo_spec(
+                    full_size_xyz_halo_spec, *heat_source_vertical_range
+                )
+            if exchange_heat_source:
+                self.heat_source = WrappedHaloUpdater(
+                    comm.get_scalar_halo_updater([heat_source_halo_spec]),
+                    {"heat_source": heat_source},
+                    ["heat_source"],
+                )
             if grid_indexing.domain[0] == grid_indexing.domain[1]:
                 full_3Dfield_2pts_halo_spec = quantity_factory.get_quantity_halo_spec(
                     dims=[X_DIM, Y_DIM, Z_INTERFACE_DIM],
@@ -350,8 +412,10 @@ class AcousticDynamics:
                     {"pkc": pkc},
                     ["pkc"],
                 )
+                pkc_halo_spec = full_3Dfield_2pts_halo_spec
             else:
                 self.pkc = comm.get_scalar_halo_updater([full_size_xyzi_halo_spec])
+                pkc_halo_spec = full_size_xyzi_halo_spec
             self.uc__vc = WrappedHaloUpdater(
                 comm.get_vector_halo_updater(
                     [full_size_xiyz_halo_spec], [full_size_xyiz_halo_spec]
@@ -364,6 +428,158 @@ class AcousticDynamics:
                 None, state, ["u"], ["v"], comm=comm
             )
 
+            # estimated bytes sent by one exchange of each updater
+            exchange_bytes = {
+                "q_con__cappa": halo_exchange_bytes([full_size_xyz_halo_spec] * 2),
+                "delp__pt": halo_exchange_bytes([full_size_xyz_halo_spec] * 2),
+                "u__v": halo_exchange_bytes(
+                    [full_size_xyiz_halo_spec, full_size_xiyz_halo_spec]
+                ),
+                "w": halo_exchange_bytes([full_size_xyz_halo_spec]),
+                "gz": halo_exchange_bytes([full_size_xyzi_halo_spec]),
+                "delp__pt__q_con": halo_exchange_bytes([full_size_xyz_halo_spec] * 3),
+                "zh": halo_exchange_bytes([full_size_xyzi_halo_spec]),
+                "divgd": halo_exchange_bytes([full_size_xiyiz_halo_spec]),
+                "pkc": halo_exchange_bytes([pkc_halo_spec]),
+                "uc__vc": halo_exchange_bytes(
+                    [full_size_xiyz_halo_spec, full_size_xyiz_halo_spec]
+                ),
+            }
+            reduced_precision_candidates = [("divgd", divgd, None)]
+            if exchange_heat_source:
+                exchange_bytes["heat_source"] = halo_exchange_bytes(
+                    [heat_source_halo_spec]
+                )
+                reduced_precision_candidates.append(
+                    ("heat_source", heat_source, heat_source_vertical_range)
+                )
+
+            for name, quantity, vertical_range in reduced_precision_candidates:
+                if uses_reduced_precision_halo(name, name in reduced_precision):
+                    updater = ReducedPrecisionHaloUpdater(
+                        comm,
+                        quantity_factory,
+                        {name: quantity},
+                        grid_indexing.n_halo,
+                        vertical_range=vertical_range,
+                    )
+                    setattr(self, name, updater)
+                    exchange_bytes[name] = halo_exchange_bytes(updater.halo_specs)
+
+            # Groups started one after the other, with nothing in between
+            # modifying their fields, are merged into the exchange of the first
+            # group, sending one message per neighbor instead of one per group.
+            # Halo values are copied unchanged, so results are bitwise identical
+            # to exchanging the groups separately.
+            self._coalesced: Dict[str, str] = {}
+            if coalesce:
+                self.q_con__cappa = WrappedHaloUpdater(
+                    comm.get_scalar_halo_updater([full_size_xyz_halo_spec] * 4),
+                    dict(q_con=state.q_con, cappa=cappa, delp=state.delp, pt=state.pt),
+                    ["q_con", "cappa", "delp", "pt"],
+                )
+                self._coalesced["delp__pt"] = "q_con__cappa"
+                if isinstance(self.pkc, WrappedHaloUpdater):
+                    self.zh = WrappedHaloUpdater(
+                        comm.get_scalar_halo_updater(
+                            [full_size_xyzi_halo_spec, pkc_halo_spec]
+                        ),
+                        {"zh": zh, "pkc": pkc},
+                        ["zh", "pkc"],
+                    )
+                    self._coalesced["pkc"] = "zh"
+            for name, carrier in self._coalesced.items():
+                setattr(self, name, _CoalescedHaloUpdater(carrier))
+                exchange_bytes[carrier] += exchange_bytes.pop(name)
+            self._exchange_bytes = exchange_bytes
+
+            if persistent:
+                scalar_groups = {
+                    "q_con__cappa": [
+                        (state.q_con, full_size_xyz_halo_spec),
+                        (cappa, full_size_xyz_halo_spec),
+                    ],
+                    "delp__pt": [
+                        (state.delp, full_size_xyz_halo_spec),
+                        (state.pt, full_size_xyz_halo_spec),
+                    ],
+                    "w": [(state.w, full_size_xyz_halo_spec)],
+                    "gz": [(gz, full_size_xyzi_halo_spec)],
+                    "delp__pt__q_con": [
+                        (state.delp, full_size_xyz_halo_spec),
+                        (state.pt, full_size_xyz_halo_spec),
+                        (state.q_con, full_size_xyz_halo_spec),
+                    ],
+                    "zh": [(zh, full_size_xyzi_halo_spec)],
+                    "divgd": [(divgd, full_size_xiyiz_halo_spec)],
+                    "pkc": [(pkc, pkc_halo_spec)],
+                }
+                if exchange_heat_source:
+                    scalar_groups["heat_source"] = [
+                        (heat_source, heat_source_halo_spec)
+                    ]
+                self._plan_scalar_exchanges(comm, scalar_groups)
+
+        def _plan_scalar_exchanges(
+            self,
+            comm: Communicator,
+            scalar_groups: Dict[str, List[Tuple[Quantity, QuantityHaloSpec]]],
+        ):
+            """
+            Replace the updaters of the given scalar groups by persistent ones,
+            if the communicator and the quantities support it.
+            """
+            for name, carrier in self._coalesced.items():
+                scalar_groups[carrier].extend(scalar_groups.pop(name))
+            quantities = [
+                quantity for group in scalar_groups.values() for quantity, _ in group
+            ]
+            if not supports_persistent_halo_exchange(comm, quantities):
+                return
+            # persistent requests are matched by tag on their own communicator
+            self._persistent_mpi_comm = comm.comm.Dup()
+            free_when_collected(self, self._persistent_mpi_comm)
+            for tag, (name, group) in enumerate(scalar_groups.items()):
+                if isinstance(getattr(self, name), WrappedHaloUpdater):
+                    setattr(
+                        self,
+                        name,
+                        PersistentHaloUpdater(
+                            comm, self._persistent_mpi_comm, tag, group
+                        ),
+                    )
+
+        @property
+        def coalesced(self) -> Dict[str, str]:
+            """Name of the updater carrying the exchange of each merged group"""
+            return dict(self._coalesced)
+
+        def instrument(self, timer: Timer) -> Dict[str, HaloExchangeStatistics]:
+            """
+            Clock every start, wait and update of the halo updaters and count
+            their exchanges.
+
+            Returns:
+                the statistics of each updater, updated as exchanges happen
+            """
+            statistics: Dict[str, HaloExchangeStatistics] = {}
+            for name, updater in list(vars(self).items()):
+                if name.startswith("_") or isinstance(updater, _CoalescedHaloUpdater):
+                    continue
+                statistics[name] = HaloExchangeStatistics()
+                setattr(
+                    self,
+                    name,
+                    TimedHaloUpdater(
+                        updater,
+                        name,
+                        timer,
+                        statistics[name],
+                        self._exchange_bytes.get(name, 0),
+                    ),
+                )
+            return statistics
+
     def __init__(
         self,
         comm: Communicator,
@@ -379,6 +595,9 @@ class AcousticDynamics:
         wsd: FloatFieldIJ,
         state,  # [DaCe] hack to get around quantity as parameters for halo updates
         checkpointer: Optional[Checkpointer] = None,
+        timer: Timer = NullTimer(),
+        halo_statistics: bool = False,
+        scratch_factory: Optional[QuantityFactory] = None,
     ):
         """
         Args:
@@ -396,6 +615,11 @@ class AcousticDynamics:
             checkpointer: if given, used to perform operations on model data
                 at specific points in model execution, such as testing against
                 reference data
+            timer: keeps time of the sub-components of each acoustic substep
+            halo_statistics: if True, count the bytes and time of the halo
+                exchanges in halo_statistics
+            scratch_factory: creates the quantities written before being read
+                in each acoustic substep, defaults to quantity_factory
         """
         orchestrate(
             obj=self,
@@ -446,6 +670,11 @@ class AcousticDynamics:
             config.d_grid_shallow_water,
             npz=grid_indexing.domain[2],
         )
+        self._do_del2cubed = self._nk_heat_dissipation != 0 and config.d_con > 1.0e-5
+        # the heat source is only used by the diffusive heating of the top
+        # _nk_heat_dissipation levels, it is neither accumulated nor exchanged
+        # on the other levels
+        heat_source_levels = self._nk_heat_dissipation if self._do_del2cubed else 0
         self.nonhydrostatic_pressure_gradient = (
             nh_p_grad.NonHydrostaticPressureGradient(
                 stencil_factory,
@@ -456,7 +685,7 @@ class AcousticDynamics:
         )
         self._akap = Float(constants.KAPPA)
 
-        temporaries = dyncore_temporaries(quantity_factory)
+        temporaries = dyncore_temporaries(quantity_factory, scratch_factory)
         self._heat_source = temporaries["heat_source"]
         self._divgd = temporaries["divgd"]
         self._gz = temporaries["gz"]
@@ -527,6 +756,7 @@ class AcousticDynamics:
                 nested=nested,
                 stretched_grid=stretched_grid,
                 config=config.d_grid_shallow_water,
+                heat_source_levels=heat_source_levels,
             )
         )
 
@@ -587,12 +817,11 @@ class AcousticDynamics:
         )
         """The stencil object responsible for updating the interface pressure"""
 
-        self._do_del2cubed = self._nk_heat_dissipation != 0 and config.d_con > 1.0e-5
-
         if self._do_del2cubed:
             nf_ke = min(3, config.nord + 1)
+            # levels are diffused independently, so only the heated ones are
             self._hyperdiffusion = HyperdiffusionDamping(
-                stencil_factory,
+                stencil_factory.restrict_vertical(nk=self._nk_heat_dissipation),
                 quantity_factory=quantity_factory,
                 damping_coefficients=damping_coefficients,
                 rarea=grid_data.rarea,
@@ -605,13 +834,14 @@ class AcousticDynamics:
                 tau=config.tau,
                 hydrostatic=config.hydrostatic,
             )
-        self._apply_diffusive_heating = stencil_factory.from_origin_domain(
-            temperature_adjust.apply_diffusive_heating,
-            origin=grid_indexing.origin_compute(),
-            domain=grid_indexing.restrict_vertical(
-                nk=self._nk_heat_dissipation
-            ).domain_compute(),
-        )
+        if self._do_del2cubed:
+            self._apply_diffusive_heating = stencil_factory.from_origin_domain(
+                temperature_adjust.apply_diffusive_heating,
+                origin=grid_indexing.origin_compute(),
+                domain=grid_indexing.restrict_vertical(
+                    nk=self._nk_heat_dissipation
+                ).domain_compute(),
+            )
         self._pk3_halo = PK3Halo(stencil_factory, quantity_factory)
         self._copy_stencil = stencil_factory.from_origin_domain(
             basic.copy_defn,
@@ -631,7 +861,22 @@ class AcousticDynamics:
             divgd=self._divgd,
             heat_source=self._heat_source,
             pkc=self._pkc,
+            coalesce=config.coalesce_halo_exchanges,
+            reduced_precision=config.reduced_precision_halos,
+            persistent=config.persistent_halo_exchanges,
+            heat_source_levels=heat_source_levels,
         )
+        # delp__pt is exchanged once per call, pkc once per nonhydrostatic substep
+        self.saved_halo_exchanges_per_call = 0
+        for name in self._halo_updaters.coalesced:
+            if name == "delp__pt":
+                self.saved_halo_exchanges_per_call += 1
+            elif not config.hydrostatic:
+                self.saved_halo_exchanges_per_call += config.n_split
+        self._timer = timer
+        self.halo_statistics: Dict[str, HaloExchangeStatistics] = {}
+        if halo_statistics or isinstance(timer, HierarchicalTimer):
+            self.halo_statistics = self._halo_updaters.instrument(timer)
 
     # See divergence_damping.py, _get_da_min for explanation of this function
     @dace_inhibitor
@@ -756,236 +1001,250 @@ class AcousticDynamics:
             #
             # The pressure gradient force and elastic terms are then evaluated
             # backwards-in-time, to improve stability.
-            remap_step = False
-            if self.config.breed_vortex_inline or (it == n_split - 1):
-                remap_step = True
-            if not self.config.hydrostatic:
-                self._halo_updaters.w.start()
+            with self._timer.clock("acoustic_substep"):
+                remap_step = False
+                if self.config.breed_vortex_inline or (it == n_split - 1):
+                    remap_step = True
+                if not self.config.hydrostatic:
+                    self._halo_updaters.w.start()
+                    if it == 0:
+                        self._gz_from_surface_height_and_thickness(
+                            self._zs,
+                            state.delz,
+                            self._gz,
+                        )
+                        self._halo_updaters.gz.start()
                 if it == 0:
-                    self._gz_from_surface_height_and_thickness(
-                        self._zs,
-                        state.delz,
-                        self._gz,
-                    )
-                    self._halo_updaters.gz.start()
-            if it == 0:
-                self._halo_updaters.delp__pt.wait()
-
-            if it == n_split - 1 and end_step:
-                if self.config.use_old_omega:
-                    self._interface_pressure_from_toa_pressure_and_thickness(
+                    self._halo_updaters.delp__pt.wait()
+
+                if it == n_split - 1 and end_step:
+                    if self.config.use_old_omega:
+                        self._interface_pressure_from_toa_pressure_and_thickness(
+                            state.delp,
+                            self._pem,
+                            self._ptop,
+                        )
+
+                self._halo_updaters.u__v.wait()
+                if not self.config.hydrostatic:
+                    self._halo_updaters.w.wait()
+
+                # compute the c-grid winds at t + 1/2 timestep
+                self._checkpoint_csw(state, tag="In")
+                with self._timer.clock("c_sw"):
+                    self.cgrid_shallow_water_lagrangian_dynamics(
                         state.delp,
-                        self._pem,
-                        self._ptop,
+                        state.pt,
+                        state.u,
+                        state.v,
+                        state.w,
+                        state.uc,
+                        state.vc,
+                        state.ua,
+                        state.va,
+                        self._ut,
+                        self._vt,
+                        self._divgd,
+                        state.omga,
+                        dt2,
                     )
-
-            self._halo_updaters.u__v.wait()
-            if not self.config.hydrostatic:
-                self._halo_updaters.w.wait()
-
-            # compute the c-grid winds at t + 1/2 timestep
-            self._checkpoint_csw(state, tag="In")
-            self.cgrid_shallow_water_lagrangian_dynamics(
-                state.delp,
-                state.pt,
-                state.u,
-                state.v,
-                state.w,
-                state.uc,
-                state.vc,
-                state.ua,
-                state.va,
-                self._ut,
-                self._vt,
-                self._divgd,
-                state.omga,
-                dt2,
-            )
-            self._checkpoint_csw(state, tag="Out")
-
-            # TODO: Computing the pressure gradient outside of C_SW was originally done
-            # so that we could transpose into a vertical-first memory ordering for the
-            # gz computation, now that we have gt4py we should pull this into C_SW.
-            if self.config.nord > 0:
-                self._halo_updaters.divgd.start()
-            if not self.config.hydrostatic:
-                # TODO: is there some way we can avoid aliasing gz and zh, so that
-                # gz is always a geopotential and zh is always a height?
-                if it == 0:
-                    self._halo_updaters.gz.wait()
-                    self._copy_stencil(
+                self._checkpoint_csw(state, tag="Out")
+
+                # TODO: Computing the pressure gradient outside of C_SW was
+                # originally done so that we could transpose into a vertical-first
+                # memory ordering for the gz computation, now that we have gt4py
+                # we should pull this into C_SW.
+                if self.config.nord > 0:
+                    self._halo_updaters.divgd.start()
+                if not self.config.hydrostatic:
+                    # TODO: is there some way we can avoid aliasing gz and zh, so that
+                    # gz is always a geopotential and zh is always a height?
+                    if it == 0:
+                        self._halo_updaters.gz.wait()
+                        self._copy_stencil(
+                            self._gz,
+                            self._zh,
+                        )
+                    else:
+                        self._copy_stencil(
+                            self._zh,
+                            self._gz,
+                        )
+                if not self.config.hydrostatic:
+                    with self._timer.clock("updatedzc"):
+                        self.update_geopotential_height_on_c_grid(
+                            self._zs, self._ut, self._vt, self._gz, self._ws3, dt2
+                        )
+                    # TODO (floriand): Due to DaCe VRAM pooling creating a memory
+                    # leak with the usage pattern of those two fields
+                    # We use the C_SW internal to workaround it e.g.:
+                    #  - self.cgrid_shallow_water_lagrangian_dynamics.delpc
+                    #  - self.cgrid_shallow_water_lagrangian_dynamics.ptc
+                    # DaCe has already a fix on their side and it awaits release
+                    # issue
+                    with self._timer.clock("riem_solver_c"):
+                        self.vertical_solver_cgrid(
+                            dt2,
+                            self.cappa,
+                            self._ptop,
+                            state.phis,
+                            self._ws3,
+                            self.cgrid_shallow_water_lagrangian_dynamics.ptc,
+                            state.q_con,
+                            self.cgrid_shallow_water_lagrangian_dynamics.delpc,
+                            self._gz,
+                            self._pkc,
+                            state.omga,
+                        )
+
+                with self._timer.clock("p_grad_c"):
+                    self._p_grad_c(
+                        self.grid_data.rdxc,
+                        self.grid_data.rdyc,
+                        state.uc,
+                        state.vc,
+                        self.cgrid_shallow_water_lagrangian_dynamics.delpc,
+                        self._pkc,
                         self._gz,
+                        dt2,
+                    )
+                self._halo_updaters.uc__vc.start()
+                if self.config.nord > 0:
+                    self._halo_updaters.divgd.wait()
+                self._halo_updaters.uc__vc.wait()
+                # use the computed c-grid winds to evolve the d-grid winds forward
+                # by 1 timestep
+                self._checkpoint_dsw_in(state)
+                with self._timer.clock("d_sw"):
+                    self.dgrid_shallow_water_lagrangian_dynamics(
+                        self._vt,
+                        state.delp,
+                        state.pt,
+                        state.u,
+                        state.v,
+                        state.w,
+                        state.uc,
+                        state.vc,
+                        state.ua,
+                        state.va,
+                        self._divgd,
+                        state.mfxd,
+                        state.mfyd,
+                        state.cxd,
+                        state.cyd,
+                        self._crx,
+                        self._cry,
+                        self._xfx,
+                        self._yfx,
+                        state.q_con,
                         self._zh,
+                        self._heat_source,
+                        state.diss_estd,
+                        dt_acoustic_substep,
                     )
-                else:
-                    self._copy_stencil(
+                self._checkpoint_dsw_out(state)
+                # note that uc and vc are not needed at all past this point.
+                # they will be re-computed from scratch on the next acoustic timestep.
+
+                self._halo_updaters.delp__pt__q_con.update()
+
+                # Not used unless we implement other betas and alternatives to nh_p_grad
+                # if self.namelist.d_ext > 0:
+                #    raise 'Unimplemented namelist option d_ext > 0'
+
+                # TODO: should the dycore have hydrostatic and non-hydrostatic modes,
+                # or would we make a new class for the non-hydrostatic mode?
+                if not self.config.hydrostatic:
+                    # without explicit arg names, numpy does not run
+                    with self._timer.clock("updatedzd"):
+                        self.update_height_on_d_grid(
+                            surface_height=self._zs,
+                            height=self._zh,
+                            courant_number_x=self._crx,
+                            courant_number_y=self._cry,
+                            x_area_flux=self._xfx,
+                            y_area_flux=self._yfx,
+                            ws=self._wsd,
+                            dt=dt_acoustic_substep,
+                        )
+                    with self._timer.clock("riem_solver3"):
+                        self.vertical_solver(
+                            remap_step,
+                            dt_acoustic_substep,
+                            self.cappa,
+                            self._ptop,
+                            self._zs,
+                            self._wsd,
+                            state.delz,
+                            state.q_con,
+                            state.delp,
+                            state.pt,
+                            self._zh,
+                            state.pe,
+                            self._pkc,
+                            self._pk3,
+                            state.pk,
+                            state.peln,
+                            state.w,
+                        )
+
+                    self._halo_updaters.zh.start()
+                    self._halo_updaters.pkc.start()
+                    if remap_step:
+                        # TODO: can this be moved to the start of the remapping routine?
+                        self._edge_pe_stencil(state.pe, state.delp, self._ptop)
+                    if self.config.use_logp:
+                        raise NotImplementedError(
+                            "unimplemented namelist option use_logp=True"
+                        )
+                    else:
+                        with self._timer.clock("pk3_halo"):
+                            self._pk3_halo(
+                                self._pk3, state.delp, self._ptop, self._akap
+                            )
+                if not self.config.hydrostatic:
+                    self._halo_updaters.zh.wait()
+                    self._compute_geopotential_stencil(
                         self._zh,
                         self._gz,
                     )
-            if not self.config.hydrostatic:
-                self.update_geopotential_height_on_c_grid(
-                    self._zs, self._ut, self._vt, self._gz, self._ws3, dt2
-                )
-                # TODO (floriand): Due to DaCe VRAM pooling creating a memory
-                # leak with the usage pattern of those two fields
-                # We use the C_SW internal to workaround it e.g.:
-                #  - self.cgrid_shallow_water_lagrangian_dynamics.delpc
-                #  - self.cgrid_shallow_water_lagrangian_dynamics.ptc
-                # DaCe has already a fix on their side and it awaits release
-                # issue
-                self.vertical_solver_cgrid(
-                    dt2,
-                    self.cappa,
-                    self._ptop,
-                    state.phis,
-                    self._ws3,
-                    self.cgrid_shallow_water_lagrangian_dynamics.ptc,
-                    state.q_con,
-                    self.cgrid_shallow_water_lagrangian_dynamics.delpc,
-                    self._gz,
-                    self._pkc,
-                    state.omga,
-                )
-
-            self._p_grad_c(
-                self.grid_data.rdxc,
-                self.grid_data.rdyc,
-                state.uc,
-                state.vc,
-                self.cgrid_shallow_water_lagrangian_dynamics.delpc,
-                self._pkc,
-                self._gz,
-                dt2,
-            )
-            self._halo_updaters.uc__vc.start()
-            if self.config.nord > 0:
-                self._halo_updaters.divgd.wait()
-            self._halo_updaters.uc__vc.wait()
-            # use the computed c-grid winds to evolve the d-grid winds forward
-            # by 1 timestep
-            self._checkpoint_dsw_in(state)
-            self.dgrid_shallow_water_lagrangian_dynamics(
-                self._vt,
-                state.delp,
-                state.pt,
-                state.u,
-                state.v,
-                state.w,
-                state.uc,
-                state.vc,
-                state.ua,
-                state.va,
-                self._divgd,
-                state.mfxd,
-                state.mfyd,
-                state.cxd,
-                state.cyd,
-                self._crx,
-                self._cry,
-                self._xfx,
-                self._yfx,
-                state.q_con,
-                self._zh,
-                self._heat_source,
-                state.diss_estd,
-                dt_acoustic_substep,
-            )
-            self._checkpoint_dsw_out(state)
-            # note that uc and vc are not needed at all past this point.
-            # they will be re-computed from scratch on the next acoustic timestep.
-
-            self._halo_updaters.delp__pt__q_con.update()
-
-            # Not used unless we implement other betas and alternatives to nh_p_grad
-            # if self.namelist.d_ext > 0:
-            #    raise 'Unimplemented namelist option d_ext > 0'
-
-            # TODO: should the dycore have hydrostatic and non-hydrostatic modes,
-            # or would we make a new class for the non-hydrostatic mode?
-            if not self.config.hydrostatic:
-                # without explicit arg names, numpy does not run
-                self.update_height_on_d_grid(
-                    surface_height=self._zs,
-                    height=self._zh,
-                    courant_number_x=self._crx,
-                    courant_number_y=self._cry,
-                    x_area_flux=self._xfx,
-                    y_area_flux=self._yfx,
-                    ws=self._wsd,
-                    dt=dt_acoustic_substep,
-                )
-                self.vertical_solver(
-                    remap_step,
-                    dt_acoustic_substep,
-                    self.cappa,
-                    self._ptop,
-                    self._zs,
-                    self._wsd,
-                    state.delz,
-                    state.q_con,
-                    state.delp,
-                    state.pt,
-                    self._zh,
-                    state.pe,
-                    self._pkc,
-                    self._pk3,
-                    state.pk,
-                    state.peln,
-                    state.w,
-                )
-
-                self._halo_updaters.zh.start()
-                self._halo_updaters.pkc.start()
-                if remap_step:
-                    # TODO: can this be moved to the start of the remapping routine?
-                    self._edge_pe_stencil(state.pe, state.delp, self._ptop)
-                if self.config.use_logp:
-                    raise NotImplementedError(
-                        "unimplemented namelist option use_logp=True"
-                    )
+                    self._halo_updaters.pkc.wait()
+
+                    with self._timer.clock("nh_p_grad"):
+                        self.nonhydrostatic_pressure_gradient(
+                            state.u,
+                            state.v,
+                            self._pkc,
+                            self._gz,
+                            self._pk3,
+                            state.delp,
+                            dt_acoustic_substep,
+                            self._ptop,
+                            self._akap,
+                        )
+
+                if self.config.rf_fast:
+                    # TODO: Pass through ks, or remove, inconsistent representation vs
+                    # Fortran.
+                    with self._timer.clock("ray_fast"):
+                        self._rayleigh_damping(
+                            u=state.u,
+                            v=state.v,
+                            w=state.w,
+                            dp=self._dp_ref,
+                            pfull=self._pfull,
+                            dt=dt_acoustic_substep,
+                            ptop=self._ptop,
+                        )
+
+                if it != n_split - 1:
+                    # [DaCe] this should be a reuse of
+                    #        self._halo_updaters.u__v but it creates parameter
+                    #        generation issues, and therefore has been duplicated
+                    self._halo_updaters.u__v.start()
                 else:
-                    self._pk3_halo(self._pk3, state.delp, self._ptop, self._akap)
-            if not self.config.hydrostatic:
-                self._halo_updaters.zh.wait()
-                self._compute_geopotential_stencil(
-                    self._zh,
-                    self._gz,
-                )
-                self._halo_updaters.pkc.wait()
-
-                self.nonhydrostatic_pressure_gradient(
-                    state.u,
-                    state.v,
-                    self._pkc,
-                    self._gz,
-                    self._pk3,
-                    state.delp,
-                    dt_acoustic_substep,
-                    self._ptop,
-                    self._akap,
-                )
-
-            if self.config.rf_fast:
-                # TODO: Pass through ks, or remove, inconsistent representation vs
-                # Fortran.
-                self._rayleigh_damping(
-                    u=state.u,
-                    v=state.v,
-                    w=state.w,
-                    dp=self._dp_ref,
-                    pfull=self._pfull,
-                    dt=dt_acoustic_substep,
-                    ptop=self._ptop,
-                )
-
-            if it != n_split - 1:
-                # [DaCe] this should be a reuse of
-                #        self._halo_updaters.u__v but it creates
-                #        parameter generation issues, and therefore has been duplicated
-                self._halo_updaters.u__v.start()
-            else:
-                if self.config.grid_type < 4:
-                    self._halo_updaters.interface_uc__vc.interface()
+                    if self.config.grid_type < 4:
+                        self._halo_updaters.interface_uc__vc.interface()
 
         # we are here
 
@@ -997,17 +1256,19 @@ class AcousticDynamics:
             # we want to diffuse the heat source from damping before we apply it,
             # so that we don't reinforce the same grid-scale patterns we're trying
             # to damp
-            self._hyperdiffusion(self._heat_source, cd)
+            with self._timer.clock("del2cubed"):
+                self._hyperdiffusion(self._heat_source, cd)
             if not self.config.hydrostatic:
                 delt_time_factor = abs(dt_acoustic_substep * self.config.delt_max)
                 # TODO: it looks like state.pkz is being used as a temporary here,
                 # and overwritten at the start of remapping. See if we can make it
                 # an internal temporary of this stencil.
-                self._apply_diffusive_heating(
-                    state.delp,
-                    state.delz,
-                    self.cappa,
-                    self._heat_source,
-                    state.pt,
-                    delt_time_factor,
-                )
+                with self._timer.clock("diffusive_heating"):
+                    self._apply_diffusive_heating(
+                        state.delp,
+                        state.delz,
+                        self.cappa,
+                        self._heat_source,
+                        state.pt,
+                        delt_time_factor,
+                    )
@@ -1,6 +1,7 @@
 from datetime import timedelta
-from typing import Mapping, Optional
+from typing import Dict, Mapping, Optional
 
+import numpy as np
 from dace.frontend.python.interface import nounroll as dace_no_unroll
 from gt4py.cartesian.gtscript import PARALLEL, computation, interval
 
@@ -22,12 +23,21 @@ from ndsl.quantity import Quantity
 from ndsl.stencils.c2l_ord import CubedToLatLon
 from pyFV3._config import DynamicalCoreConfig
 from pyFV3.dycore_state import DycoreState
+from pyFV3.halo import (
+    ReducedPrecisionHaloUpdater,
+    check_reduced_precision_halos,
+    uses_reduced_precision_halo,
+)
+from pyFV3.memory import component_scope
+from pyFV3.scratch import ScratchArena, ScratchFactory
 from pyFV3.stencils import fvtp2d, tracer_2d_1l
 from pyFV3.stencils.basic_operations import copy_defn
 from pyFV3.stencils.del2cubed import HyperdiffusionDamping
 from pyFV3.stencils.dyn_core import AcousticDynamics
 from pyFV3.stencils.neg_adj3 import AdjustNegativeTracerMixingRatio
-from pyFV3.stencils.remapping import LagrangianToEulerian
+from pyFV3.stencils.remapping import LagrangianToEulerian, lagrangian_surface_drift
+from pyFV3.timing import HaloExchangeStatistics, HierarchicalTimer
+from pyFV3.utils.reductions import global_max
 
 
 def pt_to_potential_density_pt(
@@ -60,7 +70,14 @@ def omega_from_w(delp: FloatField, delz: FloatField, w: FloatField, omega: Float
 
 def fvdyn_temporaries(
     quantity_factory: QuantityFactory,
+    scratch_factory: Optional[QuantityFactory] = None,
 ) -> Mapping[str, Quantity]:
+    """
+    Quantities of DynamicalCore, cvm, only written by fv_setup, being created
+    by scratch_factory, which defaults to quantity_factory.
+    """
+    if scratch_factory is None:
+        scratch_factory = quantity_factory
     tmps = {}
     for name in ["te_2d", "te0_2d", "wsd"]:
         quantity = quantity_factory.zeros(
@@ -69,13 +86,16 @@ def fvdyn_temporaries(
             dtype=Float,
         )
         tmps[name] = quantity
-    for name in ["dp1", "cvm"]:
-        quantity = quantity_factory.zeros(
-            dims=[X_DIM, Y_DIM, Z_DIM],
-            units="unknown",
-            dtype=Float,
-        )
-        tmps[name] = quantity
+    tmps["dp1"] = quantity_factory.zeros(
+        dims=[X_DIM, Y_DIM, Z_DIM],
+        units="unknown",
+        dtype=Float,
+    )
+    tmps["cvm"] = scratch_factory.empty(
+        dims=[X_DIM, Y_DIM, Z_DIM],
+        units="unknown",
+        dtype=Float,
+    )
     return tmps
 
 
@@ -201,26 +221,56 @@ class DynamicalCore:
                 f" nwat=={config.nwat} is not implemented."
                 " Only nwat=6 has been implemented."
             )
+        check_reduced_precision_halos(config.reduced_precision_halos)
         self.comm_rank = comm.rank
+        # sub-component timings, opt-in as they add a clock around each of them
+        self.detailed_timer: Timer = (
+            HierarchicalTimer() if config.detailed_timing else NullTimer()
+        )
         self.grid_data = grid_data
         self.grid_indexing = grid_indexing
         self._da_min = damping_coefficients.da_min
         self.config = config
 
-        tracer_transport = fvtp2d.FiniteVolumeTransport(
-            stencil_factory=stencil_factory,
-            quantity_factory=quantity_factory,
-            grid_data=grid_data,
-            damping_coefficients=damping_coefficients,
-            grid_type=config.grid_type,
-            hord=config.hord_tr,
-        )
+        # the setup, acoustic dynamics, tracer advection and remapping never
+        # run at the same time, their scratch quantities can share memory
+        self._scratch_arena: Optional[ScratchArena] = None
+        scratch: Dict[str, ScratchFactory] = {}
+        if config.scratch_arena:
+            self._scratch_arena = ScratchArena(quantity_factory)
+            for phase in (
+                "fv_setup",
+                "acoustic_dynamics",
+                "tracer_advection",
+                "remapping",
+            ):
+                scratch[phase] = self._scratch_arena.phase(phase)
+
+        # one transport per band of independently substepped tracer levels
+        with component_scope(quantity_factory, "TracerAdvection"):
+            tracer_transport = [
+                fvtp2d.FiniteVolumeTransport(
+                    stencil_factory=stencil_factory.restrict_vertical(
+                        k_start=k_start, nk=nk
+                    ),
+                    quantity_factory=quantity_factory,
+                    grid_data=grid_data,
+                    damping_coefficients=damping_coefficients,
+                    grid_type=config.grid_type,
+                    hord=config.hord_tr,
+                    shared_area_flux=True,
+                    split_interior=config.overlap_tracer_halo_exchange,
+                )
+                for k_start, nk in tracer_2d_1l.get_substep_bands(
+                    grid_indexing.domain[2], config.tracer_substep_bands
+                )
+            ]
 
         self.tracers = {}
         for name in utils.tracer_variables[0:NQ]:
             self.tracers[name] = state.__dict__[name]
 
-        temporaries = fvdyn_temporaries(quantity_factory)
+        temporaries = fvdyn_temporaries(quantity_factory, scratch.get("fv_setup"))
         self._te_2d = temporaries["te_2d"]
         self._te0_2d = temporaries["te0_2d"]
         self._wsd = temporaries["wsd"]
@@ -228,14 +278,17 @@ class DynamicalCore:
         self._cvm = temporaries["cvm"]
 
         # Build advection stencils
-        self.tracer_advection = tracer_2d_1l.TracerAdvection(
-            stencil_factory,
-            quantity_factory,
-            tracer_transport,
-            self.grid_data,
-            comm,
-            self.tracers,
-        )
+        with component_scope(quantity_factory, "TracerAdvection"):
+            self.tracer_advection = tracer_2d_1l.TracerAdvection(
+                stencil_factory,
+                quantity_factory,
+                tracer_transport,
+                self.grid_data,
+                comm,
+                self.tracers,
+                config=self.config.tracer_advection,
+                scratch_factory=scratch.get("tracer_advection"),
+            )
         self._ak = grid_data.ak
         self._bk = grid_data.bk
         self._phis = phis
@@ -265,37 +318,43 @@ class DynamicalCore:
             origin=grid_indexing.origin_full(),
             domain=grid_indexing.domain_full(),
         )
-        self.acoustic_dynamics = AcousticDynamics(
-            comm=comm,
-            stencil_factory=stencil_factory,
-            quantity_factory=quantity_factory,
-            grid_data=grid_data,
-            damping_coefficients=damping_coefficients,
-            grid_type=config.grid_type,
-            nested=nested,
-            stretched_grid=stretched_grid,
-            config=self.config.acoustic_dynamics,
-            phis=self._phis,
-            wsd=self._wsd,
-            state=state,
-            checkpointer=checkpointer,
-        )
-        self._hyperdiffusion = HyperdiffusionDamping(
-            stencil_factory,
-            quantity_factory,
-            damping_coefficients,
-            grid_data.rarea,
-            self.config.nf_omega,
-        )
-        self._cubed_to_latlon = CubedToLatLon(
-            state,
-            stencil_factory,
-            quantity_factory,
-            grid_data,
-            self.config.grid_type,
-            config.c2l_ord,
-            comm,
-        )
+        with component_scope(quantity_factory, "AcousticDynamics"):
+            self.acoustic_dynamics = AcousticDynamics(
+                comm=comm,
+                stencil_factory=stencil_factory,
+                quantity_factory=quantity_factory,
+                grid_data=grid_data,
+                damping_coefficients=damping_coefficients,
+                grid_type=config.grid_type,
+                nested=nested,
+                stretched_grid=stretched_grid,
+                config=self.config.acoustic_dynamics,
+                phis=self._phis,
+                wsd=self._wsd,
+                state=state,
+                checkpointer=checkpointer,
+                timer=self.detailed_timer,
+                halo_statistics=config.halo_statistics,
+                scratch_factory=scratch.get("acoustic_dynamics"),
+            )
+        with component_scope(quantity_factory, "HyperdiffusionDamping"):
+            self._hyperdiffusion = HyperdiffusionDamping(
+                stencil_factory,
+                quantity_factory,
+                damping_coefficients,
+                grid_data.rarea,
+                self.config.nf_omega,
+            )
+        with component_scope(quantity_factory, "CubedToLatLon"):
+            self._cubed_to_latlon = CubedToLatLon(
+                state,
+                stencil_factory,
+                quantity_factory,
+                grid_data,
+                self.config.grid_type,
+                config.c2l_ord,
+                comm,
+            )
         self._cappa = self.acoustic_dynamics.cappa
 
         if not (not self.config.inline_q and NQ != 0):
@@ -303,32 +362,68 @@ class DynamicalCore:
                 "Dynamical core (fv_dynamics):"
                 "tracer_2d not implemented. z_tracer available"
             )
-        self._adjust_tracer_mixing_ratio = AdjustNegativeTracerMixingRatio(
-            stencil_factory,
-            quantity_factory=quantity_factory,
-            check_negative=self.config.check_negative,
-            hydrostatic=self.config.hydrostatic,
-        )
+        with component_scope(quantity_factory, "AdjustNegativeTracerMixingRatio"):
+            self._adjust_tracer_mixing_ratio = AdjustNegativeTracerMixingRatio(
+                stencil_factory,
+                quantity_factory=quantity_factory,
+                check_negative=self.config.check_negative,
+                hydrostatic=self.config.hydrostatic,
+            )
 
-        self._lagrangian_to_eulerian_obj = LagrangianToEulerian(
-            stencil_factory=stencil_factory,
-            quantity_factory=quantity_factory,
-            config=config.remapping,
-            area_64=grid_data.area_64,
-            nq=NQ,
-            pfull=self._pfull,
-            tracers=self.tracers,
-            checkpointer=checkpointer,
-        )
+        with component_scope(quantity_factory, "LagrangianToEulerian"):
+            self._lagrangian_to_eulerian_obj = LagrangianToEulerian(
+                stencil_factory=stencil_factory,
+                quantity_factory=quantity_factory,
+                config=config.remapping,
+                area_64=grid_data.area_64,
+                nq=NQ,
+                pfull=self._pfull,
+                tracers=self.tracers,
+                checkpointer=checkpointer,
+                timer=self.detailed_timer,
+                scratch_factory=scratch.get("remapping"),
+            )
+        if self._scratch_arena is not None and self.comm_rank == 0:
+            ndsl_log.info(self._scratch_arena.report())
+        if config.coalesce_halo_exchanges and self.comm_rank == 0:
+            ndsl_log.info(
+                "coalesced halo exchanges: "
+                f"{self.saved_halo_exchanges_per_step} fewer exchanges per step, "
+                "each sending one message per neighbor"
+            )
+        self._comm = comm
+        self._remap_drift_tolerance = config.remapping.drift_tolerance
+        if self._remap_drift_tolerance > 0:
+            self._remap_drift = quantity_factory.zeros(
+                [X_DIM, Y_DIM],
+                units="",
+                dtype=Float,
+            )
+            self._compute_remap_drift = stencil_factory.from_origin_domain(
+                lagrangian_surface_drift,
+                origin=grid_indexing.origin_compute(),
+                domain=grid_indexing.domain_compute(add=(0, 0, 1)),
+            )
 
         full_xyz_spec = quantity_factory.get_quantity_halo_spec(
             dims=[X_DIM, Y_DIM, Z_DIM],
             n_halo=grid_indexing.n_halo,
             dtype=Float,
         )
-        self._omega_halo_updater = WrappedHaloUpdater(
-            comm.get_scalar_halo_updater([full_xyz_spec]), state, ["omga"], comm=comm
+        reduced_precision_omega = uses_reduced_precision_halo(
+            "omga", "omga" in config.reduced_precision_halos
         )
+        if reduced_precision_omega:
+            self._omega_halo_updater = ReducedPrecisionHaloUpdater(
+                comm, quantity_factory, {"omga": state.omga}, grid_indexing.n_halo
+            )
+        else:
+            self._omega_halo_updater = WrappedHaloUpdater(
+                comm.get_scalar_halo_updater([full_xyz_spec]),
+                state,
+                ["omga"],
+                comm=comm,
+            )
         self._n_split = config.n_split
         self._k_split = config.k_split
         self._conserve_total_energy = config.consv_te
@@ -339,6 +434,33 @@ class DynamicalCore:
     def _get_da_min(self) -> float:
         return self._da_min
 
+    @dace_inhibitor
+    def _remap_drift_exceeds_tolerance(self) -> bool:
+        """
+        Whether the Lagrangian surfaces have drifted from the Eulerian
+        reference by more than the tolerance anywhere on the globe.
+        """
+        local_drift = np.array(
+            [np.max(utils.asarray(self._remap_drift.view[:], to_type=np.ndarray))]
+        )
+        drift = global_max(self._comm.comm, local_drift)
+        return bool(drift[0] > self._remap_drift_tolerance)
+
+    @property
+    def halo_statistics(self) -> Dict[str, HaloExchangeStatistics]:
+        """
+        Statistics of the acoustic halo exchanges since they were last reset,
+        empty unless halo_statistics or detailed_timing is set
+        """
+        return self.acoustic_dynamics.halo_statistics
+
+    @property
+    def saved_halo_exchanges_per_step(self) -> int:
+        """Acoustic halo exchanges avoided each step by coalesce_halo_exchanges"""
+        return (
+            self.acoustic_dynamics.saved_halo_exchanges_per_call * self.config.k_split
+        )
+
     def _checkpoint_fvdynamics(self, state: DycoreState, tag: str):
         if self.call_checkpointer:
             self.checkpointer(
@@ -518,126 +640,143 @@ class DynamicalCore:
         )
 
         for k_split in dace_no_unroll(range(self._k_split)):
-            n_map = k_split + 1
-            last_step = k_split == self._k_split - 1
-            # TODO: why are we copying delp to dp1? what is dp1?
-            self._copy_stencil(
-                state.delp,
-                self._dp_initial,
-            )
-            if __debug__:
-                log_on_rank_0("DynCore")
-            with timer.clock("DynCore"):
-                self.acoustic_dynamics(
-                    state,
-                    timestep=self._timestep / self._k_split,
-                    n_map=n_map,
+            with self.detailed_timer.clock("k_split"):
+                n_map = k_split + 1
+                last_step = k_split == self._k_split - 1
+                # TODO: why are we copying delp to dp1? what is dp1?
+                self._copy_stencil(
+                    state.delp,
+                    self._dp_initial,
                 )
-            if self.config.z_tracer:
-                if __debug__:
-                    log_on_rank_0("TracerAdvection")
-                with timer.clock("TracerAdvection"):
-                    self._checkpoint_tracer_advection_in(state)
-                    self.tracer_advection(
-                        self.tracers,
-                        self._dp_initial,
-                        state.mfxd,
-                        state.mfyd,
-                        state.cxd,
-                        state.cyd,
-                    )
-                    self._checkpoint_tracer_advection_out(state)
-            else:
-                raise NotImplementedError("z_tracer=False is not implemented")
-
-            # 1 is shallow water model, don't need vertical remapping
-            # 2 and 3 are also simple baroclinic models that don't need
-            # vertical remapping. > 4 implies this is a full physics model
-            if self.grid_indexing.domain[2] > 4:
-                # nq is actually given by ncnst - pnats,
-                # where those are given in atmosphere.F90 by:
-                # ncnst = Atm(mytile)%ncnst
-                # pnats = Atm(mytile)%flagstruct%pnats
-                # here we hard-coded it because 8 is the only supported value,
-                # refactor this later!
-
-                # do_omega = self.namelist.hydrostatic and last_step
-                # TODO: Determine a better way to do this, polymorphic fields perhaps?
-                # issue is that set_val in map_single expects a 3D field for the
-                # "surface" array
                 if __debug__:
-                    log_on_rank_0("Remapping")
-                with timer.clock("Remapping"):
-                    self._checkpoint_remapping_in(state)
-
-                    # TODO: When NQ=9, we shouldn't need to pass qcld explicitly
-                    #       since it's in self.tracers. It should not be an issue since
-                    #       we don't have self.tracers & qcld computation at the same
-                    #       time
-                    #       When NQ=8, we do need qcld passed explicitely
-                    self._lagrangian_to_eulerian_obj(
-                        self.tracers,
-                        state.pt,
-                        state.delp,
-                        state.delz,
-                        state.peln,
-                        state.u,
-                        state.v,
-                        state.w,
-                        self._cappa,
-                        state.q_con,
-                        state.qcld,
-                        state.pkz,
-                        state.pk,
+                    log_on_rank_0("DynCore")
+                with timer.clock("DynCore"):
+                    with self.detailed_timer.clock("DynCore"):
+                        self.acoustic_dynamics(
+                            state,
+                            timestep=self._timestep / self._k_split,
+                            n_map=n_map,
+                        )
+                if self.config.z_tracer:
+                    if __debug__:
+                        log_on_rank_0("TracerAdvection")
+                    with timer.clock("TracerAdvection"):
+                        with self.detailed_timer.clock("TracerAdvection"):
+                            self._checkpoint_tracer_advection_in(state)
+                            self.tracer_advection(
+                                self.tracers,
+                                self._dp_initial,
+                                state.mfxd,
+                                state.mfyd,
+                                state.cxd,
+                                state.cyd,
+                            )
+                            self._checkpoint_tracer_advection_out(state)
+                else:
+                    raise NotImplementedError("z_tracer=False is not implemented")
+
+                # 1 is shallow water model, don't need vertical remapping
+                # 2 and 3 are also simple baroclinic models that don't need
+                # vertical remapping. > 4 implies this is a full physics model
+                do_remap = self.grid_indexing.domain[2] > 4
+                if do_remap and self._remap_drift_tolerance > 0 and not last_step:
+                    self._compute_remap_drift(
                         state.pe,
-                        state.phis,
-                        state.ps,
-                        self._wsd,
                         self._ak,
                         self._bk,
-                        self._dp_initial,
-                        self._ptop,
-                        KAPPA,
-                        ZVIR,
-                        last_step,
-                        self._conserve_total_energy,
-                        self._timestep / self._k_split,
+                        self._remap_drift,
                     )
-                    self._checkpoint_remapping_out(state)
-                # TODO: can we pull this block out of the loop intead of
-                # using an if-statement?
-                if last_step:
-                    da_min: Float = self._get_da_min()
-                    if not self.config.hydrostatic:
-                        if __debug__:
-                            log_on_rank_0("Omega")
-                        # TODO: GFDL should implement the "vulcan omega" update,
-                        # use hydrostatic omega instead of this conversion
-                        self._omega_from_w(
-                            state.delp,
-                            state.delz,
-                            state.w,
-                            state.omga,
-                        )
-                    if self.config.nf_omega > 0:
-                        if __debug__:
-                            log_on_rank_0("Del2Cubed")
-                        self._omega_halo_updater.update()
-                        self._hyperdiffusion(state.omga, 0.18 * da_min)
+                    do_remap = self._remap_drift_exceeds_tolerance()
+                    if __debug__:
+                        if not do_remap:
+                            log_on_rank_0("Remapping skipped, drift below tolerance")
+                if do_remap:
+                    # nq is actually given by ncnst - pnats,
+                    # where those are given in atmosphere.F90 by:
+                    # ncnst = Atm(mytile)%ncnst
+                    # pnats = Atm(mytile)%flagstruct%pnats
+                    # here we hard-coded it because 8 is the only supported value,
+                    # refactor this later!
+
+                    # do_omega = self.namelist.hydrostatic and last_step
+                    # TODO: Determine a better way to do this, polymorphic fields
+                    # perhaps? issue is that set_val in map_single expects a 3D
+                    # field for the "surface" array
+                    if __debug__:
+                        log_on_rank_0("Remapping")
+                    with timer.clock("Remapping"):
+                        with self.detailed_timer.clock("Remapping"):
+                            self._checkpoint_remapping_in(state)
+
+                            # TODO: When NQ=9, we shouldn't need to pass qcld
+                            #       explicitly since it's in self.tracers. It should
+                            #       not be an issue since we don't have self.tracers
+                            #       & qcld computation at the same time
+                            #       When NQ=8, we do need qcld passed explicitely
+                            self._lagrangian_to_eulerian_obj(
+                                self.tracers,
+                                state.pt,
+                                state.delp,
+                                state.delz,
+                                state.peln,
+                                state.u,
+                                state.v,
+                                state.w,
+                                self._cappa,
+                                state.q_con,
+                                state.qcld,
+                                state.pkz,
+                                state.pk,
+                                state.pe,
+                                state.phis,
+                                state.ps,
+                                self._wsd,
+                                self._ak,
+                                self._bk,
+                                self._dp_initial,
+                                self._ptop,
+                                KAPPA,
+                                ZVIR,
+                                last_step,
+                                self._conserve_total_energy,
+                                self._timestep / self._k_split,
+                            )
+                            self._checkpoint_remapping_out(state)
+                    # TODO: can we pull this block out of the loop intead of
+                    # using an if-statement?
+                    if last_step:
+                        da_min: Float = self._get_da_min()
+                        if not self.config.hydrostatic:
+                            if __debug__:
+                                log_on_rank_0("Omega")
+                            # TODO: GFDL should implement the "vulcan omega" update,
+                            # use hydrostatic omega instead of this conversion
+                            self._omega_from_w(
+                                state.delp,
+                                state.delz,
+                                state.w,
+                                state.omga,
+                            )
+                        if self.config.nf_omega > 0:
+                            if __debug__:
+                                log_on_rank_0("Del2Cubed")
+                            self._omega_halo_updater.update()
+                            self._hyperdiffusion(state.omga, 0.18 * da_min)
 
         if __debug__:
             log_on_rank_0("Neg Adj 3")
-        self._adjust_tracer_mixing_ratio(
-            state.qvapor,
-            state.qliquid,
-            state.qrain,
-            state.qsnow,
-            state.qice,
-            state.qgraupel,
-            state.qcld,
-            state.pt,
-            state.delp,
-        )
+        with self.detailed_timer.clock("neg_adj3"):
+            self._adjust_tracer_mixing_ratio(
+                state.qvapor,
+                state.qliquid,
+                state.qrain,
+                state.qsnow,
+                state.qice,
+                state.qgraupel,
+                state.qcld,
+                state.pt,
+                state.delp,
+            )
 
         if __debug__:
             log_on_rank_0("CubedToLatLon")
@@ -647,9 +786,10 @@ class DynamicalCore:
         # usage of ua and va, and rename state.ua and state.va
         # to reflect that they are cell center
         # zonal and meridional wind
-        self._cubed_to_latlon(
-            state.u,
-            state.v,
-            state.ua,
-            state.va,
-        )
+        with self.detailed_timer.clock("c2l"):
+            self._cubed_to_latlon(
+                state.u,
+                state.v,
+                state.ua,
+                state.va,
+            )
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import gt4py.cartesian.gtscript as gtscript
 from gt4py.cartesian.gtscript import PARALLEL, computation, horizontal, interval, region
@@ -77,6 +77,79 @@ def q_j_stencil(
         q_j = (q * area + fx1 - fx1[1, 0, 0]) / area_with_x_flux
 
 
+def area_flux_divergence(
+    area: FloatFieldIJ,
+    x_area_flux: FloatField,
+    y_area_flux: FloatField,
+    area_with_x_flux: FloatField,
+    area_with_y_flux: FloatField,
+):
+    """
+    Cell area after applying the area fluxes, the denominators of q_i and q_j.
+
+    They only depend on the area fluxes, so when the same fluxes are used to
+    transport several scalars they can be computed once and shared.
+
+    Args:
+        area (in):
+        x_area_flux (in):
+        y_area_flux (in):
+        area_with_x_flux (out):
+        area_with_y_flux (out):
+    """
+    with computation(PARALLEL), interval(...):
+        area_with_x_flux = apply_x_flux_divergence(area, x_area_flux)
+        area_with_y_flux = apply_y_flux_divergence(area, y_area_flux)
+
+
+def q_i_from_area_divergence(
+    q: FloatField,
+    area: FloatFieldIJ,
+    y_area_flux: FloatField,
+    area_with_y_flux: FloatField,
+    q_advected_along_y: FloatField,
+    q_i: FloatField,
+):
+    """
+    Same as q_i_stencil, with the area divergence precomputed.
+
+    Args:
+        q (in):
+        area (in):
+        y_area_flux (in):
+        area_with_y_flux (in):
+        q_advected_along_y (in):
+        q_i (out):
+    """
+    with computation(PARALLEL), interval(...):
+        fyy = y_area_flux * q_advected_along_y
+        q_i = (q * area + fyy - fyy[0, 1, 0]) / area_with_y_flux
+
+
+def q_j_from_area_divergence(
+    q: FloatField,
+    area: FloatFieldIJ,
+    x_area_flux: FloatField,
+    area_with_x_flux: FloatField,
+    fx2: FloatField,
+    q_j: FloatField,
+):
+    """
+    Same as q_j_stencil, with the area divergence precomputed.
+
+    Args:
+        q (in):
+        area (in):
+        x_area_flux (in):
+        area_with_x_flux (in):
+        fx2 (in):
+        q_j (out):
+    """
+    with computation(PARALLEL), interval(...):
+        fx1 = x_area_flux * fx2
+        q_j = (q * area + fx1 - fx1[1, 0, 0]) / area_with_x_flux
+
+
 def final_fluxes(
     q_advected_y_x_advected_mean: FloatField,
     q_x_advected_mean: FloatField,
@@ -119,6 +192,107 @@ def final_fluxes(
             )
 
 
+class _RectangleStencils:
+    """
+    Stencils of FiniteVolumeTransport.advect_with_shared_area_flux restricted
+    to the interfaces of a rectangle of cells of the compute domain, they read
+    the scalar at most n_halo cells away from the rectangle.
+    """
+
+    def __init__(
+        self,
+        stencil_factory: StencilFactory,
+        grid_data: GridData,
+        grid_type: int,
+        ord_inner: int,
+        ord_outer: int,
+        origin: Tuple[int, int, int],
+        shape: Tuple[int, int, int],
+    ):
+        n_halo = stencil_factory.grid_indexing.n_halo
+        i_start, j_start, k_start = origin
+        ni, nj, nk = shape
+        self.y_piecewise_parabolic_inner = YPiecewiseParabolic(
+            stencil_factory=stencil_factory,
+            dya=grid_data.dya,
+            grid_type=grid_type,
+            jord=ord_inner,
+            origin=(i_start - n_halo, j_start, k_start),
+            domain=(ni + 2 * n_halo, nj + 1, nk),
+        )
+        self.q_i_from_area_divergence = stencil_factory.from_origin_domain(
+            q_i_from_area_divergence,
+            origin=(i_start - n_halo, j_start, k_start),
+            domain=(ni + 2 * n_halo, nj, nk),
+        )
+        self.x_piecewise_parabolic_outer = XPiecewiseParabolic(
+            stencil_factory=stencil_factory,
+            dxa=grid_data.dxa,
+            grid_type=grid_type,
+            iord=ord_outer,
+            origin=origin,
+            domain=(ni + 1, nj, nk),
+        )
+        self.x_piecewise_parabolic_inner = XPiecewiseParabolic(
+            stencil_factory=stencil_factory,
+            dxa=grid_data.dxa,
+            grid_type=grid_type,
+            iord=ord_inner,
+            origin=(i_start, j_start - n_halo, k_start),
+            domain=(ni + 1, nj + 2 * n_halo, nk),
+        )
+        self.q_j_from_area_divergence = stencil_factory.from_origin_domain(
+            q_j_from_area_divergence,
+            origin=(i_start, j_start - n_halo, k_start),
+            domain=(ni, nj + 2 * n_halo, nk),
+        )
+        self.y_piecewise_parabolic_outer = YPiecewiseParabolic(
+            stencil_factory=stencil_factory,
+            dya=grid_data.dya,
+            grid_type=grid_type,
+            jord=ord_outer,
+            origin=origin,
+            domain=(ni, nj + 1, nk),
+        )
+
+
+def split_compute_domain(
+    stencil_factory: StencilFactory,
+) -> Tuple[
+    Optional[Tuple[Tuple[int, int, int], Tuple[int, int, int]]],
+    List[Tuple[Tuple[int, int, int], Tuple[int, int, int]]],
+]:
+    """
+    Split the compute domain into an interior rectangle, whose cells are more
+    than n_halo cells away from the halo, and the edge strips around it.
+
+    Returns:
+        (origin, shape) of the interior, None if the compute domain is too
+        small to have one, and of each of the south, north, west and east
+        edge strips
+    """
+    idx = stencil_factory.grid_indexing
+    n_halo = idx.n_halo
+    i_start, j_start, k_start = idx.origin_compute()
+    nx, ny, nz = idx.domain
+    if nx <= 2 * n_halo or ny <= 2 * n_halo:
+        return None, [((i_start, j_start, k_start), (nx, ny, nz))]
+    interior = (
+        (i_start + n_halo, j_start + n_halo, k_start),
+        (nx - 2 * n_halo, ny - 2 * n_halo, nz),
+    )
+    edges = [
+        ((i_start, j_start, k_start), (nx, n_halo, nz)),
+        ((i_start, j_start + ny - n_halo, k_start), (nx, n_halo, nz)),
+        ((i_start, j_start + n_halo, k_start), (n_halo, ny - 2 * n_halo, nz)),
+        (
+            (i_start + nx - n_halo, j_start + n_halo, k_start),
+            (n_halo, ny - 2 * n_halo, nz),
+        ),
+    ]
+    return interior, edges
+
+
 class FiniteVolumeTransport:
     """
     Equivalent of Fortran FV3 subroutine fv_tp_2d, done in 3 dimensions.
@@ -136,7 +310,21 @@ class FiniteVolumeTransport:
         hord,
         nord=None,
         damp_c=None,
+        shared_area_flux: bool = False,
+        split_interior: bool = False,
     ):
+        """
+        Args:
+            shared_area_flux: if True and the transport is not damped, it can
+                transport many scalars with the same area fluxes through
+                prepare_shared_area_flux and advect_with_shared_area_flux,
+                which needs two more 3D fields
+            split_interior: if True and the transport has shared area fluxes,
+                it can also compute the advected means of the interior of the
+                compute domain before the halo of the scalar is exchanged,
+                through advect_interior_with_shared_area_flux and
+                advect_edges_with_shared_area_flux
+        """
         orchestrate(
             obj=self,
             config=stencil_factory.config.dace_config,
@@ -180,6 +368,7 @@ class FiniteVolumeTransport:
             # This triggers dace parsing error:
             # self.delnflux = None
             self._do_delnflux = False
+        self._shared_area_flux = shared_area_flux and not self._do_delnflux
 
         self._copy_corners_y: corners.CopyCorners = corners.CopyCorners(
             "y", stencil_factory
@@ -230,6 +419,50 @@ class FiniteVolumeTransport:
             origin=idx.origin_compute(),
             domain=idx.domain_compute(add=(1, 1, 1)),
         )
+        if self._shared_area_flux:
+            self._area_with_x_flux = make_quantity()
+            self._area_with_y_flux = make_quantity()
+            self._area_flux_divergence = stencil_factory.from_origin_domain(
+                area_flux_divergence,
+                origin=idx.origin_full(),
+                domain=idx.domain_full(add=(0, 0, 1)),
+            )
+            self._q_i_from_area_divergence = stencil_factory.from_origin_domain(
+                q_i_from_area_divergence,
+                origin=idx.origin_full(add=(0, 3, 0)),
+                domain=idx.domain_full(add=(0, -3, 1)),
+            )
+            self._q_j_from_area_divergence = stencil_factory.from_origin_domain(
+                q_j_from_area_divergence,
+                origin=idx.origin_full(add=(3, 0, 0)),
+                domain=idx.domain_full(add=(-3, 0, 1)),
+            )
+        self._interior_stencils: List[_RectangleStencils] = []
+        self._edge_stencils: List[_RectangleStencils] = []
+        if self._shared_area_flux and split_interior:
+            interior, edges = split_compute_domain(stencil_factory)
+            if interior is not None:
+                self._interior_stencils.append(
+                    _RectangleStencils(
+                        stencil_factory,
+                        grid_data,
+                        grid_type,
+                        ord_inner,
+                        ord_outer,
+                        *interior,
+                    )
+                )
+            for edge in edges:
+                self._edge_stencils.append(
+                    _RectangleStencils(
+                        stencil_factory,
+                        grid_data,
+                        grid_type,
+                        ord_inner,
+                        ord_outer,
+                        *edge,
+                    )
+                )
         self.stencil_transport_flux = stencil_factory.from_origin_domain(
             final_fluxes,
             origin=idx.origin_compute(),
@@ -248,6 +481,173 @@ class FiniteVolumeTransport:
             q_y_flux,
         )
 
+    @property
+    def is_damped(self) -> bool:
+        """True if damping fluxes are added to the transport fluxes"""
+        return self._do_delnflux
+
+    @property
+    def has_shared_area_flux(self) -> bool:
+        """
+        True if the transport was built for advect_with_shared_area_flux,
+        which requires it to be undamped
+        """
+        return self._shared_area_flux
+
+    @property
+    def has_interior_split(self) -> bool:
+        """
+        True if the transport was built for advect_interior_with_shared_area_flux
+        and advect_edges_with_shared_area_flux
+        """
+        return len(self._edge_stencils) > 0
+
+    @property
+    def advected_means(self):
+        """
+        Advected means computed by the last call to advect_with_shared_area_flux,
+        in the argument order of final_fluxes.
+        """
+        return (
+            self._q_advected_y_x_advected_mean,
+            self._q_x_advected_mean,
+            self._q_advected_x_y_advected_mean,
+            self._q_y_advected_mean,
+        )
+
+    def prepare_shared_area_flux(self, x_area_flux, y_area_flux):
+        """
+        Compute the scalar-independent terms used by advect_with_shared_area_flux.
+
+        Must be called again whenever the area fluxes change.
+
+        Args:
+            x_area_flux (in): flux of area in x-direction, in units of m^2
+            y_area_flux (in): flux of area in y-direction, in units of m^2
+        """
+        self._area_flux_divergence(
+            self._area,
+            x_area_flux,
+            y_area_flux,
+            self._area_with_x_flux,
+            self._area_with_y_flux,
+        )
+
+    def advect_with_shared_area_flux(self, q, crx, cry, x_area_flux, y_area_flux):
+        """
+        Compute the advected means of q (see advected_means) without forming the
+        fluxes, reusing the area terms from prepare_shared_area_flux.
+
+        Used to transport many scalars with the same winds, the caller combines
+        the advected means into fluxes itself. Damping is not applied.
+
+        Args:
+            q (in): scalar to be transported
+            crx (in): Courant number in x-direction
+            cry (in): Courant number in y-direction
+            x_area_flux (in): flux of area in x-direction, in units of m^2
+            y_area_flux (in): flux of area in y-direction, in units of m^2
+        """
+        self._copy_corners_y(q)
+        self.y_piecewise_parabolic_inner(q, cry, self._q_y_advected_mean)
+        self._q_i_from_area_divergence(
+            q,
+            self._area,
+            y_area_flux,
+            self._area_with_y_flux,
+            self._q_y_advected_mean,
+            self._q_advected_y,
+        )
+        self.x_piecewise_parabolic_outer(
+            self._q_advected_y, crx, self._q_advected_y_x_advected_mean
+        )
+
+        self._copy_corners_x(q)
+        self.x_piecewise_parabolic_inner(q, crx, self._q_x_advected_mean)
+        self._q_j_from_area_divergence(
+            q,
+            self._area,
+            x_area_flux,
+            self._area_with_x_flux,
+            self._q_x_advected_mean,
+            self._q_advected_x,
+        )
+        self.y_piecewise_parabolic_outer(
+            self._q_advected_x, cry, self._q_advected_x_y_advected_mean
+        )
+
+    def _advect_y_first(self, stencils: _RectangleStencils, q, crx, cry, y_area_flux):
+        stencils.y_piecewise_parabolic_inner(q, cry, self._q_y_advected_mean)
+        stencils.q_i_from_area_divergence(
+            q,
+            self._area,
+            y_area_flux,
+            self._area_with_y_flux,
+            self._q_y_advected_mean,
+            self._q_advected_y,
+        )
+        stencils.x_piecewise_parabolic_outer(
+            self._q_advected_y, crx, self._q_advected_y_x_advected_mean
+        )
+
+    def _advect_x_first(self, stencils: _RectangleStencils, q, crx, cry, x_area_flux):
+        stencils.x_piecewise_parabolic_inner(q, crx, self._q_x_advected_mean)
+        stencils.q_j_from_area_divergence(
+            q,
+            self._area,
+            x_area_flux,
+            self._area_with_x_flux,
+            self._q_x_advected_mean,
+            self._q_advected_x,
+        )
+        stencils.y_piecewise_parabolic_outer(
+            self._q_advected_x, cry, self._q_advected_x_y_advected_mean
+        )
+
+    def advect_interior_with_shared_area_flux(
+        self, q, crx, cry, x_area_flux, y_area_flux
+    ):
+        """
+        Compute the advected means of q (see advected_means) on the interfaces
+        of the interior of the compute domain, without reading the halo of q.
+
+        The halo exchange of q can be in flight, the means on the interfaces
+        of the edge strips are computed by advect_edges_with_shared_area_flux
+        once it completes.
+
+        Args:
+            q (in): scalar to be transported
+            crx (in): Courant number in x-direction
+            cry (in): Courant number in y-direction
+            x_area_flux (in): flux of area in x-direction, in units of m^2
+            y_area_flux (in): flux of area in y-direction, in units of m^2
+        """
+        for stencils in self._interior_stencils:
+            self._advect_y_first(stencils, q, crx, cry, y_area_flux)
+            self._advect_x_first(stencils, q, crx, cry, x_area_flux)
+
+    def advect_edges_with_shared_area_flux(self, q, crx, cry, x_area_flux, y_area_flux):
+        """
+        Compute the advected means of q (see advected_means) on the interfaces
+        of the edge strips around the interior of the compute domain.
+
+        The halo of q must be up to date and q unchanged since the call to
+        advect_interior_with_shared_area_flux.
+
+        Args:
+            q (in): scalar to be transported
+            crx (in): Courant number in x-direction
+            cry (in): Courant number in y-direction
+            x_area_flux (in): flux of area in x-direction, in units of m^2
+            y_area_flux (in): flux of area in y-direction, in units of m^2
+        """
+        self._copy_corners_y(q)
+        for stencils in self._edge_stencils:
+            self._advect_y_first(stencils, q, crx, cry, y_area_flux)
+        self._copy_corners_x(q)
+        for stencils in self._edge_stencils:
+            self._advect_x_first(stencils, q, crx, cry, x_area_flux)
+
     def __call__(
         self,
         q,
@@ -5,17 +5,56 @@ from gt4py.cartesian.gtscript import FORWARD, PARALLEL, computation, interval
 from ndsl.constants import X_DIM, Y_DIM, Z_DIM
 from ndsl.dsl.dace import orchestrate
 from ndsl.dsl.stencil import StencilFactory
-from ndsl.dsl.typing import Float, FloatField, FloatFieldIJ, IntFieldIJ  # noqa: F401
+from ndsl.dsl.typing import (  # noqa: F401
+    Float,
+    FloatField,
+    FloatFieldIJ,
+    IntField,
+    IntFieldIJ,
+)
 from ndsl.initialization.allocator import QuantityFactory
 from pyFV3.stencils.basic_operations import copy_defn
 from pyFV3.stencils.remap_profile import RemapProfile
 
 
-def set_dp(dp1: FloatField, pe1: FloatField, lev: IntFieldIJ):
+def compute_overlap(
+    pe1: FloatField,
+    pe2: FloatField,
+    dp1: FloatField,
+    lev: IntFieldIJ,
+    lev_top: IntField,
+    lev_bot: IntField,
+    pl: FloatField,
+    pr: FloatField,
+):
+    """
+    Locate, for every Eulerian layer, the Lagrangian layers containing its
+    top and bottom interfaces.
+
+    Args:
+        pe1 (in): Lagrangian pressure levels
+        pe2 (in): Eulerian pressure levels
+        dp1 (out): Lagrangian layer thickness
+        lev (inout): relative offset of the current Lagrangian layer
+        lev_top (out): relative offset of the layer containing pe2
+        lev_bot (out): relative offset of the layer containing pe2[0, 0, 1]
+        pl (out): fractional position of pe2 within the lev_top layer
+        pr (out): fractional position of pe2[0, 0, 1] within the lev_bot layer
+    """
     with computation(PARALLEL), interval(...):
         dp1 = pe1[0, 0, 1] - pe1
     with computation(FORWARD), interval(0, 1):
         lev = 0
+    with computation(FORWARD), interval(...):
+        lev_top = lev
+        pl = (pe2 - pe1[0, 0, lev]) / dp1[0, 0, lev]
+        if pe2[0, 0, 1] > pe1[0, 0, lev + 1]:
+            lev = lev + 1
+            while pe1[0, 0, lev + 1] < pe2[0, 0, 1]:
+                lev = lev + 1
+        lev_bot = lev
+        pr = (pe2[0, 0, 1] - pe1[0, 0, lev]) / dp1[0, 0, lev]
+        lev = lev - 1
 
 
 def lagrangian_contributions(
@@ -27,7 +66,10 @@ def lagrangian_contributions(
     q4_3: FloatField,
     q4_4: FloatField,
     dp1: FloatField,
-    lev: IntFieldIJ,
+    lev_top: IntField,
+    lev_bot: IntField,
+    pl: FloatField,
+    pr: FloatField,
 ):
     """
     Args:
@@ -39,46 +81,98 @@ def lagrangian_contributions(
         q4_3 (in):
         q4_4 (in):
         dp1 (in):
-        lev (inout):
+        lev_top (in):
+        lev_bot (in):
+        pl (in):
+        pr (in):
     """
-    # TODO: Can we make lev a 2D temporary?
-    with computation(FORWARD), interval(...):
-        pl = (pe2 - pe1[0, 0, lev]) / dp1[0, 0, lev]
-        if pe2[0, 0, 1] <= pe1[0, 0, lev + 1]:
-            pr = (pe2[0, 0, 1] - pe1[0, 0, lev]) / dp1[0, 0, lev]
+    with computation(PARALLEL), interval(...):
+        if lev_top == lev_bot:
             q = (
-                q4_2[0, 0, lev]
+                q4_2[0, 0, lev_top]
                 + 0.5
-                * (q4_4[0, 0, lev] + q4_3[0, 0, lev] - q4_2[0, 0, lev])
+                * (q4_4[0, 0, lev_top] + q4_3[0, 0, lev_top] - q4_2[0, 0, lev_top])
                 * (pr + pl)
-                - q4_4[0, 0, lev] * 1.0 / 3.0 * (pr * (pr + pl) + pl * pl)
+                - q4_4[0, 0, lev_top] * 1.0 / 3.0 * (pr * (pr + pl) + pl * pl)
             )
         else:
-            qsum = (pe1[0, 0, lev + 1] - pe2) * (
-                q4_2[0, 0, lev]
+            qsum = (pe1[0, 0, lev_top + 1] - pe2) * (
+                q4_2[0, 0, lev_top]
                 + 0.5
-                * (q4_4[0, 0, lev] + q4_3[0, 0, lev] - q4_2[0, 0, lev])
+                * (q4_4[0, 0, lev_top] + q4_3[0, 0, lev_top] - q4_2[0, 0, lev_top])
                 * (1.0 + pl)
-                - q4_4[0, 0, lev] * 1.0 / 3.0 * (1.0 + pl * (1.0 + pl))
+                - q4_4[0, 0, lev_top] * 1.0 / 3.0 * (1.0 + pl * (1.0 + pl))
             )
-            lev = lev + 1
-            while pe1[0, 0, lev + 1] < pe2[0, 0, 1]:
+            lev = lev_top + 1
+            while lev < lev_bot:
                 qsum += dp1[0, 0, lev] * q4_1[0, 0, lev]
                 lev = lev + 1
-            dp = pe2[0, 0, 1] - pe1[0, 0, lev]
-            esl = dp / dp1[0, 0, lev]
+            dp = pe2[0, 0, 1] - pe1[0, 0, lev_bot]
             qsum += dp * (
-                q4_2[0, 0, lev]
+                q4_2[0, 0, lev_bot]
                 + 0.5
-                * esl
+                * pr
                 * (
-                    q4_3[0, 0, lev]
-                    - q4_2[0, 0, lev]
-                    + q4_4[0, 0, lev] * (1.0 - (2.0 / 3.0) * esl)
+                    q4_3[0, 0, lev_bot]
+                    - q4_2[0, 0, lev_bot]
+                    + q4_4[0, 0, lev_bot] * (1.0 - (2.0 / 3.0) * pr)
                 )
             )
             q = qsum / (pe2[0, 0, 1] - pe2)
-        lev = lev - 1
+
+
+class LagrangianOverlap:
+    """
+    Overlap of the Lagrangian layers with the Eulerian layers, shared by
+    every field remapped between the same pair of pressure profiles.
+    """
+
+    def __init__(
+        self,
+        stencil_factory: StencilFactory,
+        quantity_factory: QuantityFactory,
+        dims: Sequence[str],
+    ):
+        orchestrate(
+            obj=self,
+            config=stencil_factory.config.dace_config,
+        )
+
+        def make_quantity(units: str, dtype):
+            return quantity_factory.zeros(
+                [X_DIM, Y_DIM, Z_DIM],
+                units=units,
+                dtype=dtype,
+            )
+
+        self.dp1 = make_quantity("Pa", Float)
+        self.lev_top = make_quantity("", int)
+        self.lev_bot = make_quantity("", int)
+        self.pl = make_quantity("", Float)
+        self.pr = make_quantity("", Float)
+        self._lev = quantity_factory.zeros([X_DIM, Y_DIM], units="", dtype=int)
+
+        self._compute_overlap = stencil_factory.from_dims_halo(
+            compute_overlap,
+            compute_dims=dims,
+        )
+
+    def __call__(self, pe1: FloatField, pe2: FloatField):
+        """
+        Args:
+            pe1 (in): Lagrangian pressure levels
+            pe2 (in): Eulerian pressure levels
+        """
+        self._compute_overlap(
+            pe1,
+            pe2,
+            self.dp1,
+            self._lev,
+            self.lev_top,
+            self.lev_bot,
+            self.pl,
+            self.pr,
+        )
 
 
 class MapSingle:
@@ -93,7 +187,13 @@ class MapSingle:
         kord: int,
         mode: int,
         dims: Sequence[str],
+        overlap: Optional[LagrangianOverlap] = None,
     ):
+        """
+        Args:
+            overlap: layer overlap computed by the caller before each call,
+                if None it is computed by this object from pe1 and pe2
+        """
         orchestrate(
             obj=self,
             config=stencil_factory.config.dace_config,
@@ -109,7 +209,6 @@ class MapSingle:
                 dtype=Float,
             )
 
-        self._dp1 = make_quantity()
         self._q4_1 = make_quantity()
         self._q4_2 = make_quantity()
         self._q4_3 = make_quantity()
@@ -119,17 +218,16 @@ class MapSingle:
             units="unknown",
             dtype=Float,
         )
-        self._lev = quantity_factory.zeros([X_DIM, Y_DIM], units="", dtype=int)
 
         self._copy_stencil = stencil_factory.from_dims_halo(
             copy_defn,
             compute_dims=dims,
         )
 
-        self._set_dp = stencil_factory.from_dims_halo(
-            set_dp,
-            compute_dims=dims,
-        )
+        self._owns_overlap = overlap is None
+        if self._owns_overlap:
+            overlap = LagrangianOverlap(stencil_factory, quantity_factory, dims=dims)
+        self._overlap = overlap
 
         self._remap_profile = RemapProfile(
             stencil_factory,
@@ -172,7 +270,8 @@ class MapSingle:
         """
 
         self._copy_stencil(q1, self._q4_1)
-        self._set_dp(self._dp1, pe1, self._lev)
+        if self._owns_overlap:
+            self._overlap(pe1, pe2)
 
         if qs is None:
             self._remap_profile(
@@ -181,7 +280,7 @@ class MapSingle:
                 self._q4_2,
                 self._q4_3,
                 self._q4_4,
-                self._dp1,
+                self._overlap.dp1,
                 qmin,
             )
         else:
@@ -191,7 +290,7 @@ class MapSingle:
                 self._q4_2,
                 self._q4_3,
                 self._q4_4,
-                self._dp1,
+                self._overlap.dp1,
                 qmin,
             )
         self._lagrangian_contributions(
@@ -202,7 +301,10 @@ class MapSingle:
             self._q4_2,
             self._q4_3,
             self._q4_4,
-            self._dp1,
-            self._lev,
+            self._overlap.dp1,
+            self._overlap.lev_top,
+            self._overlap.lev_bot,
+            self._overlap.pl,
+            self._overlap.pr,
         )
         return q1
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 import ndsl.dsl.gt4py_utils as utils
 from ndsl.constants import X_DIM, Y_DIM, Z_DIM
@@ -8,7 +8,7 @@ from ndsl.dsl.typing import Float, FloatField
 from ndsl.initialization.allocator import QuantityFactory
 from ndsl.quantity import Quantity
 from pyFV3.stencils.fillz import FillNegativeTracerValues
-from pyFV3.stencils.map_single import MapSingle
+from pyFV3.stencils.map_single import LagrangianOverlap, MapSingle
 
 
 class MapNTracer:
@@ -24,7 +24,13 @@ class MapNTracer:
         nq: int,
         fill: bool,
         tracers: Dict[str, Quantity],
+        overlap: Optional[LagrangianOverlap] = None,
     ):
+        """
+        Args:
+            overlap: layer overlap shared by every tracer, computed by the
+                caller before each call, if None each tracer computes its own
+        """
         orchestrate(
             obj=self,
             config=stencil_factory.config.dace_config,
@@ -40,15 +46,26 @@ class MapNTracer:
         kord_tracer = [kord] * self._nq
         kord_tracer[5] = 9  # qcld
 
-        self._list_of_remap_objects = [
-            MapSingle(
-                stencil_factory,
-                quantity_factory,
-                kord_tracer[i],
-                0,
-                dims=[X_DIM, Y_DIM, Z_DIM],
+        # tracers sharing a kord are remapped one after the other by the same
+        # object, so its profile temporaries and stencils are allocated once
+        names_by_kord: Dict[int, List[str]] = {}
+        for name, tracer_kord in zip(
+            utils.tracer_variables[0 : self._nq], kord_tracer
+        ):
+            names_by_kord.setdefault(tracer_kord, []).append(name)
+        self._tracer_groups: List[Tuple[MapSingle, List[str]]] = [
+            (
+                MapSingle(
+                    stencil_factory,
+                    quantity_factory,
+                    tracer_kord,
+                    0,
+                    dims=[X_DIM, Y_DIM, Z_DIM],
+                    overlap=overlap,
+                ),
+                names,
             )
-            for i in range(len(kord_tracer))
+            for tracer_kord, names in names_by_kord.items()
         ]
 
         if fill:
@@ -80,8 +97,9 @@ class MapNTracer:
             dp2 (in): Difference in pressure between Eulerian levels
             tracers (inout): tracers to be remapped
         """
-        for i, q in enumerate(utils.tracer_variables[0 : self._nq]):
-            self._list_of_remap_objects[i](tracers[q], pe1, pe2, self._qs)
+        for remap, names in self._tracer_groups:
+            for name in names:
+                remap(tracers[name], pe1, pe2, self._qs)
 
         if self._fill_negative_tracers is True:
             self._fillz(dp2, tracers)
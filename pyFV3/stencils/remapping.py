@@ -27,10 +27,11 @@ from ndsl.dsl.dace.orchestration import orchestrate
 from ndsl.dsl.stencil import StencilFactory
 from ndsl.dsl.typing import Float, FloatField, FloatFieldIJ, FloatFieldK
 from ndsl.initialization.allocator import QuantityFactory
+from ndsl.performance.timer import NullTimer, Timer
 from ndsl.quantity import Quantity
 from pyFV3._config import RemappingConfig
 from pyFV3.stencils.basic_operations import adjust_divide_stencil
-from pyFV3.stencils.map_single import MapSingle
+from pyFV3.stencils.map_single import LagrangianOverlap, MapSingle
 from pyFV3.stencils.mapn_tracer import MapNTracer
 from pyFV3.stencils.moist_cv import moist_pt_func, moist_pt_last_step
 from pyFV3.stencils.saturation_adjustment import SatAdjust3d
@@ -57,6 +58,34 @@ def init_pe(pe: FloatField, pe1: FloatField, pe2: FloatField, ptop: Float):
         pe1 = pe
 
 
+def lagrangian_surface_drift(
+    pe: FloatField,
+    ak: FloatFieldK,
+    bk: FloatFieldK,
+    drift: FloatFieldIJ,
+):
+    """
+    Maximum relative deviation in each column of the Lagrangian interface
+    pressures from the Eulerian reference pressures given by ak and bk.
+
+    Args:
+        pe (in): Pressure at layer edges
+        ak (in): Atmosphere hybrid a coordinate (Pa)
+        bk (in): Atmosphere hybrid b coordinate (dimensionless)
+        drift (out): Column maximum of abs(pe - pe_ref) / pe_ref
+    """
+    with computation(BACKWARD):
+        with interval(-1, None):
+            ps = pe
+        with interval(0, -1):
+            ps = ps[0, 0, 1]
+    with computation(FORWARD), interval(0, 1):
+        drift = 0.0
+    with computation(FORWARD), interval(...):
+        pe_ref = ak + bk * ps
+        drift = max(drift, abs(pe - pe_ref) / pe_ref)
+
+
 def undo_delz_adjust_and_copy_peln(
     delp: FloatField,
     delz: FloatField,
@@ -299,7 +328,15 @@ class LagrangianToEulerian:
         pfull,
         tracers: Dict[str, Quantity],
         checkpointer: Optional[Checkpointer] = None,
+        timer: Timer = NullTimer(),
+        scratch_factory: Optional[QuantityFactory] = None,
     ):
+        """
+        Args:
+            scratch_factory: creates the pressure and profile quantities
+                written before being read in each call, defaults to
+                quantity_factory
+        """
         orchestrate(
             obj=self,
             config=stencil_factory.config.dace_config,
@@ -309,6 +346,7 @@ class LagrangianToEulerian:
         # this is only computed in init because Dace does not yet support
         # this operation
         self._call_checkpointer = checkpointer is not None
+        self._timer = timer
         grid_indexing = stencil_factory.grid_indexing
         if config.kord_tm >= 0:
             raise NotImplementedError("map ppm, untested mode where kord_tm >= 0")
@@ -325,48 +363,46 @@ class LagrangianToEulerian:
             grid_indexing.domain[2] + 1,
         )
 
-        self._pe1 = quantity_factory.zeros(
-            [X_DIM, Y_DIM, Z_INTERFACE_DIM],
-            units="Pa",
-            dtype=Float,
-        )
-        self._pe2 = quantity_factory.zeros(
+        if scratch_factory is None:
+            scratch_factory = quantity_factory
+
+        self._pe1 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_INTERFACE_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._pe3 = quantity_factory.zeros(
+        self._pe2 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_INTERFACE_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._dp2 = quantity_factory.zeros(
+        self._dp2 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._pn2 = quantity_factory.zeros(
+        self._pn2 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._pe0 = quantity_factory.zeros(
+        self._pe0 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_INTERFACE_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._pe3 = quantity_factory.zeros(
+        self._pe3 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_INTERFACE_DIM],
             units="Pa",
             dtype=Float,
         )
 
-        self._gz = quantity_factory.zeros(
+        self._gz = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="m^2 s^-2",
             dtype=Float,
         )
-        self._cvm = quantity_factory.zeros(
+        self._cvm = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
@@ -401,6 +437,14 @@ class LagrangianToEulerian:
             domain=grid_indexing.domain_compute(),
         )
 
+        # tracers, w and delz are all remapped from pe1 to pe2, pt uses the
+        # log-pressure profiles and builds its own overlap
+        self._lagrangian_overlap = LagrangianOverlap(
+            stencil_factory,
+            quantity_factory,
+            dims=[X_DIM, Y_DIM, Z_DIM],
+        )
+
         self._map_single_pt = MapSingle(
             stencil_factory,
             quantity_factory,
@@ -416,6 +460,7 @@ class LagrangianToEulerian:
             nq,
             fill=config.fill,
             tracers=tracers,
+            overlap=self._lagrangian_overlap,
         )
 
         self._map_single_w = MapSingle(
@@ -424,6 +469,7 @@ class LagrangianToEulerian:
             self._kord_wz,
             -2,
             dims=[X_DIM, Y_DIM, Z_DIM],
+            overlap=self._lagrangian_overlap,
         )
 
         self._map_single_delz = MapSingle(
@@ -432,6 +478,7 @@ class LagrangianToEulerian:
             self._kord_wz,
             1,
             dims=[X_DIM, Y_DIM, Z_DIM],
+            overlap=self._lagrangian_overlap,
         )
 
         self._undo_delz_adjust_and_copy_peln = stencil_factory.from_origin_domain(
@@ -595,38 +642,45 @@ class LagrangianToEulerian:
         # pe1 is initial lagrangian edge pressures
         # pe2 is final Eulerian edge pressures
 
-        self._moist_cv_pt_pressure(
-            tracers["qvapor"],
-            tracers["qliquid"],
-            tracers["qrain"],
-            tracers["qsnow"],
-            tracers["qice"],
-            tracers["qgraupel"],
-            q_con,
-            pt,
-            cappa,
-            delp,
-            delz,
-            pe,
-            self._pe2,
-            ak,
-            bk,
-            self._dp2,
-            ps,
-            self._pn2,
-            peln,
-            zvir,
-        )
+        with self._timer.clock("moist_cv_pt_pressure"):
+            self._moist_cv_pt_pressure(
+                tracers["qvapor"],
+                tracers["qliquid"],
+                tracers["qrain"],
+                tracers["qsnow"],
+                tracers["qice"],
+                tracers["qgraupel"],
+                q_con,
+                pt,
+                cappa,
+                delp,
+                delz,
+                pe,
+                self._pe2,
+                ak,
+                bk,
+                self._dp2,
+                ps,
+                self._pn2,
+                peln,
+                zvir,
+            )
 
         self._pn2_pk_delp(self._dp2, delp, self._pe2, self._pn2, pk, akap)
 
         # now that we have the pressure profiles, we can start remapping
-        self._map_single_pt(pt, peln, self._pn2, qmin=self._t_min)
+        with self._timer.clock("map_pt"):
+            self._map_single_pt(pt, peln, self._pn2, qmin=self._t_min)
 
-        self._mapn_tracer(self._pe1, self._pe2, self._dp2, tracers)
+        with self._timer.clock("overlap"):
+            self._lagrangian_overlap(self._pe1, self._pe2)
+        with self._timer.clock("map_tracers"):
+            self._mapn_tracer(self._pe1, self._pe2, self._dp2, tracers)
 
-        self._map_single_w(w, self._pe1, self._pe2, qs=wsd)
-        self._map_single_delz(delz, self._pe1, self._pe2)
+        with self._timer.clock("map_w"):
+            self._map_single_w(w, self._pe1, self._pe2, qs=wsd)
+        with self._timer.clock("map_delz"):
+            self._map_single_delz(delz, self._pe1, self._pe2)
 
         self._undo_delz_adjust_and_copy_peln(delp, delz, peln, self._pe0, self._pn2)
         # if do_omega:  # NOTE untested
@@ -635,33 +689,36 @@ class LagrangianToEulerian:
         # TODO: can we move this to after the rest of the remapping calls, to make
         # it clear the outputs are not needed until then?
         # or, are its outputs actually used? can we delete this stencil call?
-        self._moist_cv_pkz(
-            tracers["qvapor"],
-            tracers["qliquid"],
-            tracers["qrain"],
-            tracers["qsnow"],
-            tracers["qice"],
-            tracers["qgraupel"],
-            q_con,
-            self._gz,
-            self._cvm,
-            pkz,
-            pt,
-            cappa,
-            delp,
-            delz,
-            zvir,
-        )
+        with self._timer.clock("moist_cv_pkz"):
+            self._moist_cv_pkz(
+                tracers["qvapor"],
+                tracers["qliquid"],
+                tracers["qrain"],
+                tracers["qsnow"],
+                tracers["qice"],
+                tracers["qgraupel"],
+                q_con,
+                self._gz,
+                self._cvm,
+                pkz,
+                pt,
+                cappa,
+                delp,
+                delz,
+                zvir,
+            )
 
         # if do_omega:
         # dp2 update, if larger than pe0 and smaller than one level up, update omega
         # and exit
 
         self._pressures_mapu(pe, self._pe1, ak, bk, self._pe0, self._pe3)
-        self._map_single_u(u, self._pe0, self._pe3)
+        with self._timer.clock("map_u"):
+            self._map_single_u(u, self._pe0, self._pe3)
 
         self._pressures_mapv(pe, ak, bk, self._pe0, self._pe3)
-        self._map_single_v(v, self._pe0, self._pe3)
+        with self._timer.clock("map_v"):
+            self._map_single_v(v, self._pe0, self._pe3)
 
         self._update_ua(self._pe2, self._pe3)
 
@@ -684,48 +741,50 @@ class LagrangianToEulerian:
 
         if self._do_sat_adjust:
             fast_mp_consv = consv_te > CONSV_MIN
-            self._saturation_adjustment(
-                dp1,
-                tracers["qvapor"],
-                tracers["qliquid"],
-                tracers["qice"],
-                tracers["qrain"],
-                tracers["qsnow"],
-                tracers["qgraupel"],
-                q_cld,
-                hs,
-                peln,
-                delp,
-                delz,
-                q_con,
-                pt,
-                pkz,
-                cappa,
-                zvir,
-                mdt,
-                fast_mp_consv,
-                last_step,
-                akap,
-                self.kmp,
-            )
+            with self._timer.clock("sat_adjust"):
+                self._saturation_adjustment(
+                    dp1,
+                    tracers["qvapor"],
+                    tracers["qliquid"],
+                    tracers["qice"],
+                    tracers["qrain"],
+                    tracers["qsnow"],
+                    tracers["qgraupel"],
+                    q_cld,
+                    hs,
+                    peln,
+                    delp,
+                    delz,
+                    q_con,
+                    pt,
+                    pkz,
+                    cappa,
+                    zvir,
+                    mdt,
+                    fast_mp_consv,
+                    last_step,
+                    akap,
+                    self.kmp,
+                )
 
         if last_step:
             # on the last step, we need the regular temperature to send
             # to the physics, but if we're staying in dynamics we need
             # to keep it as the virtual potential temperature
-            self._moist_cv_last_step_stencil(
-                tracers["qvapor"],
-                tracers["qliquid"],
-                tracers["qrain"],
-                tracers["qsnow"],
-                tracers["qice"],
-                tracers["qgraupel"],
-                self._gz,
-                pt,
-                pkz,
-                dtmp,
-                zvir,
-            )
+            with self._timer.clock("moist_cv_last_step"):
+                self._moist_cv_last_step_stencil(
+                    tracers["qvapor"],
+                    tracers["qliquid"],
+                    tracers["qrain"],
+                    tracers["qsnow"],
+                    tracers["qice"],
+                    tracers["qgraupel"],
+                    self._gz,
+                    pt,
+                    pkz,
+                    dtmp,
+                    zvir,
+                )
         else:
             # converts virtual temperature back to virtual potential temperature
             self._basic_adjust_divide_stencil(pkz, pt)
@@ -1,9 +1,10 @@
-import math
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import gt4py.cartesian.gtscript as gtscript
+import numpy as np
 from gt4py.cartesian.gtscript import PARALLEL, computation, horizontal, interval, region
 
+import ndsl.dsl.gt4py_utils as utils
 from ndsl.comm.communicator import Communicator
 from ndsl.constants import (
     N_HALO_DEFAULT,
@@ -13,13 +14,18 @@ from ndsl.constants import (
     Y_INTERFACE_DIM,
     Z_DIM,
 )
-from ndsl.dsl.dace.orchestration import orchestrate
+from ndsl.dsl.dace.orchestration import dace_inhibitor, orchestrate
 from ndsl.dsl.dace.wrapped_halo_exchange import WrappedHaloUpdater
 from ndsl.dsl.stencil import StencilFactory
-from ndsl.dsl.typing import Float, FloatField, FloatFieldIJ
+from ndsl.dsl.typing import Float, FloatField, FloatFieldIJ, FloatFieldK
 from ndsl.initialization.allocator import QuantityFactory
+from ndsl.logging import ndsl_log
 from ndsl.quantity import Quantity
-from pyFV3.stencils.fvtp2d import FiniteVolumeTransport
+from pyFV3._config import TracerAdvectionConfig
+from pyFV3.halo import ReducedPrecisionHaloUpdater, uses_reduced_precision_halo
+from pyFV3.stencils.basic_operations import copy_defn
+from pyFV3.stencils.fvtp2d import FiniteVolumeTransport, split_compute_domain
+from pyFV3.utils.reductions import global_max
 
 
 @gtscript.function
@@ -108,16 +114,52 @@ def divide_fluxes_by_n_substeps(
         mfyd = mfyd * frac
 
 
-def cmax_stencil1(cx: FloatField, cy: FloatField, cmax: FloatField):
+def rescale_fluxes(
+    cxd: FloatField,
+    mfxd: FloatField,
+    cyd: FloatField,
+    mfyd: FloatField,
+    factor: Float,
+):
+    """
+    Multiply the courant numbers and mass fluxes in-place by factor.
+
+    Args:
+        cxd (inout):
+        mfxd (inout):
+        cyd (inout):
+        mfyd (inout):
+    """
     with computation(PARALLEL), interval(...):
-        cmax = max(abs(cx), abs(cy))
+        cxd = cxd * factor
+        mfxd = mfxd * factor
+        cyd = cyd * factor
+        mfyd = mfyd * factor
 
 
-def cmax_stencil2(
-    cx: FloatField, cy: FloatField, sin_sg5: FloatField, cmax: FloatField
+def compute_cmax(
+    cx: FloatField,
+    cy: FloatField,
+    sin_sg5: FloatFieldIJ,
+    nonorthogonal_weight: FloatFieldK,
+    cmax: FloatField,
 ):
+    """
+    Courant number used to determine the number of tracer substeps.
+
+    Replaces the cmax_stencil1 (upper levels) and cmax_stencil2 (lower levels)
+    pair, the grid non-orthogonality correction is only added where
+    nonorthogonal_weight is 1.
+
+    Args:
+        cx (in): accumulated courant number in x-direction
+        cy (in): accumulated courant number in y-direction
+        sin_sg5 (in): sine of the angle between grid lines at cell center
+        nonorthogonal_weight (in): 0 on the upper npz/6 levels, 1 below
+        cmax (out): maximum courant number of the cell
+    """
     with computation(PARALLEL), interval(...):
-        cmax = max(abs(cx), abs(cy)) + 1.0 - sin_sg5
+        cmax = max(abs(cx), abs(cy)) + nonorthogonal_weight * (1.0 - sin_sg5)
 
 
 def apply_mass_flux(
@@ -164,6 +206,76 @@ def apply_tracer_flux(
         q = (q * dp1 + (fx - fx[1, 0, 0] + fy - fy[0, 1, 0]) * rarea) / dp2
 
 
+def apply_tracer_transport(
+    q: FloatField,
+    dp1: FloatField,
+    q_advected_y_x_advected_mean: FloatField,
+    q_x_advected_mean: FloatField,
+    q_advected_x_y_advected_mean: FloatField,
+    q_y_advected_mean: FloatField,
+    x_mass_flux: FloatField,
+    y_mass_flux: FloatField,
+    rarea: FloatFieldIJ,
+    dp2: FloatField,
+):
+    """
+    Fused fvtp2d.final_fluxes and apply_tracer_flux, the tracer fluxes
+    are only formed as stencil temporaries.
+
+    Args:
+        q (inout):
+        dp1 (in):
+        q_advected_y_x_advected_mean (in):
+        q_x_advected_mean (in):
+        q_advected_x_y_advected_mean (in):
+        q_y_advected_mean (in):
+        x_mass_flux (in):
+        y_mass_flux (in):
+        rarea (in):
+        dp2 (in):
+    """
+    with computation(PARALLEL), interval(...):
+        fx = 0.5 * (q_advected_y_x_advected_mean + q_x_advected_mean) * x_mass_flux
+        fy = 0.5 * (q_advected_x_y_advected_mean + q_y_advected_mean) * y_mass_flux
+        q = (q * dp1 + (fx - fx[1, 0, 0] + fy - fy[0, 1, 0]) * rarea) / dp2
+
+
+def apply_tracer_transport_into(
+    q: FloatField,
+    dp1: FloatField,
+    q_advected_y_x_advected_mean: FloatField,
+    q_x_advected_mean: FloatField,
+    q_advected_x_y_advected_mean: FloatField,
+    q_y_advected_mean: FloatField,
+    x_mass_flux: FloatField,
+    y_mass_flux: FloatField,
+    rarea: FloatFieldIJ,
+    dp2: FloatField,
+    q_out: FloatField,
+):
+    """
+    apply_tracer_transport writing the transported tracer to q_out, leaving q
+    unchanged for the transport of the neighbouring cells.
+
+    Args:
+        q (in):
+        dp1 (in):
+        q_advected_y_x_advected_mean (in):
+        q_x_advected_mean (in):
+        q_advected_x_y_advected_mean (in):
+        q_y_advected_mean (in):
+        x_mass_flux (in):
+        y_mass_flux (in):
+        rarea (in):
+        dp2 (in):
+        q_out (out):
+    """
+    with computation(PARALLEL), interval(...):
+        fx = 0.5 * (q_advected_y_x_advected_mean + q_x_advected_mean) * x_mass_flux
+        fy = 0.5 * (q_advected_x_y_advected_mean + q_y_advected_mean) * y_mass_flux
+        q_out = (q * dp1 + (fx - fx[1, 0, 0] + fy - fy[0, 1, 0]) * rarea) / dp2
+
+
 # Simple stencil replacing:
 #   self._tmp_dp2[:] = dp1
 #   dp1[:] = dp2
@@ -176,6 +288,335 @@ def swap_dp(dp1: FloatField, dp2: FloatField):
         dp2 = tmp
 
 
+def get_substep_bands(npz: int, n_bands: int) -> List[Tuple[int, int]]:
+    """
+    Split the vertical column into contiguous bands of levels that are
+    substepped independently.
+
+    Args:
+        npz: number of vertical levels
+        n_bands: requested number of bands, values below 1 give a single band
+
+    Returns:
+        (k_start, nk) of each band, from the top of the atmosphere down
+    """
+    n_bands = min(max(n_bands, 1), npz)
+    bounds = [round(i_band * npz / n_bands) for i_band in range(n_bands + 1)]
+    return [(bounds[i], bounds[i + 1] - bounds[i]) for i in range(n_bands)]
+
+
+class _TracerSubstepBand:
+    """
+    Stencils of the tracer substep restricted to a contiguous band of levels,
+    so that each band runs only the number of substeps it needs.
+    """
+
+    def __init__(
+        self,
+        stencil_factory: StencilFactory,
+        transport: FiniteVolumeTransport,
+        k_start: int,
+        nk: int,
+        externals: Dict[str, int],
+    ):
+        self.k_start = k_start
+        self.nk = nk
+        self.n_split = 1
+        self.finite_volume_transport = transport
+        # tracers share winds and area fluxes, without damping the transport
+        # can reuse the area terms and skip storing the tracer fluxes
+        self._shared_area_flux = transport.has_shared_area_flux
+        band_stencil_factory = stencil_factory.restrict_vertical(k_start=k_start, nk=nk)
+        grid_indexing = band_stencil_factory.grid_indexing
+        self._swap_dp = band_stencil_factory.from_origin_domain(
+            swap_dp,
+            origin=grid_indexing.origin_compute(),
+            domain=grid_indexing.domain_compute(),
+            externals=externals,
+        )
+        self._divide_fluxes_by_n_substeps = band_stencil_factory.from_origin_domain(
+            divide_fluxes_by_n_substeps,
+            origin=grid_indexing.origin_full(),
+            domain=grid_indexing.domain_full(add=(1, 1, 0)),
+            externals=externals,
+        )
+        self._rescale_fluxes = band_stencil_factory.from_origin_domain(
+            rescale_fluxes,
+            origin=grid_indexing.origin_full(),
+            domain=grid_indexing.domain_full(add=(1, 1, 0)),
+            externals=externals,
+        )
+        self._apply_mass_flux = band_stencil_factory.from_origin_domain(
+            apply_mass_flux,
+            origin=grid_indexing.origin_compute(),
+            domain=grid_indexing.domain_compute(),
+            externals=externals,
+        )
+        self._apply_tracer_flux = band_stencil_factory.from_origin_domain(
+            apply_tracer_flux,
+            origin=grid_indexing.origin_compute(),
+            domain=grid_indexing.domain_compute(),
+            externals=externals,
+        )
+        self._apply_tracer_transport = band_stencil_factory.from_origin_domain(
+            apply_tracer_transport,
+            origin=grid_indexing.origin_compute(),
+            domain=grid_indexing.domain_compute(),
+            externals=externals,
+        )
+        # the interior of the compute domain is transported while the tracer
+        # halos are in flight, the edge strips once they have arrived
+        self.has_interior_split = transport.has_interior_split
+        self._apply_interior_transport = []
+        self._apply_edge_transport = []
+        if self.has_interior_split:
+            interior, edges = split_compute_domain(band_stencil_factory)
+            if interior is not None:
+                self._apply_interior_transport.append(
+                    band_stencil_factory.from_origin_domain(
+                        apply_tracer_transport_into,
+                        origin=interior[0],
+                        domain=interior[1],
+                        externals=externals,
+                    )
+                )
+            for origin, domain in edges:
+                self._apply_edge_transport.append(
+                    band_stencil_factory.from_origin_domain(
+                        apply_tracer_transport_into,
+                        origin=origin,
+                        domain=domain,
+                        externals=externals,
+                    )
+                )
+            self._copy_compute_domain = band_stencil_factory.from_origin_domain(
+                copy_defn,
+                origin=grid_indexing.origin_compute(),
+                domain=grid_indexing.domain_compute(),
+                externals=externals,
+            )
+
+    def prepare_fluxes(
+        self,
+        x_courant,
+        x_area_flux,
+        x_mass_flux,
+        y_courant,
+        y_area_flux,
+        y_mass_flux,
+    ):
+        if self.n_split > 1:
+            self._divide_fluxes_by_n_substeps(
+                x_courant,
+                x_area_flux,
+                x_mass_flux,
+                y_courant,
+                y_area_flux,
+                y_mass_flux,
+                self.n_split,
+            )
+        if self._shared_area_flux:
+            self.finite_volume_transport.prepare_shared_area_flux(
+                x_area_flux, y_area_flux
+            )
+
+    def restore_fluxes(
+        self, x_courant, x_mass_flux, y_courant, y_mass_flux, max_n_split: int
+    ):
+        """
+        Scale the courant numbers and mass fluxes of the band to a division by
+        max_n_split, as when all levels take the same number of substeps.
+        """
+        if self.n_split != max_n_split:
+            self._rescale_fluxes(
+                x_courant,
+                x_mass_flux,
+                y_courant,
+                y_mass_flux,
+                self.n_split / max_n_split,
+            )
+
+    def apply_mass_flux(self, dp1, dp2, x_mass_flux, y_mass_flux, rarea):
+        """Pressure thickness dp2 at the end of the substep"""
+        self._apply_mass_flux(
+            dp1,
+            x_mass_flux,
+            y_mass_flux,
+            rarea,
+            dp2,
+        )
+
+    def transport(
+        self,
+        tracers: Dict[str, Quantity],
+        dp1,
+        dp2,
+        x_mass_flux,
+        y_mass_flux,
+        x_courant,
+        y_courant,
+        x_area_flux,
+        y_area_flux,
+        x_flux,
+        y_flux,
+        rarea,
+    ):
+        """Advect the tracers over the substep, dp2 must already be computed"""
+        if self._shared_area_flux:
+            for q in tracers.values():
+                self.finite_volume_transport.advect_with_shared_area_flux(
+                    q,
+                    x_courant,
+                    y_courant,
+                    x_area_flux,
+                    y_area_flux,
+                )
+                (
+                    q_advected_y_x_advected_mean,
+                    q_x_advected_mean,
+                    q_advected_x_y_advected_mean,
+                    q_y_advected_mean,
+                ) = self.finite_volume_transport.advected_means
+                self._apply_tracer_transport(
+                    q,
+                    dp1,
+                    q_advected_y_x_advected_mean,
+                    q_x_advected_mean,
+                    q_advected_x_y_advected_mean,
+                    q_y_advected_mean,
+                    x_mass_flux,
+                    y_mass_flux,
+                    rarea,
+                    dp2,
+                )
+        else:
+            for q in tracers.values():
+                self.finite_volume_transport(
+                    q,
+                    x_courant,
+                    y_courant,
+                    x_area_flux,
+                    y_area_flux,
+                    x_flux,
+                    y_flux,
+                    x_mass_flux=x_mass_flux,
+                    y_mass_flux=y_mass_flux,
+                )
+                self._apply_tracer_flux(
+                    q,
+                    dp1,
+                    x_flux,
+                    y_flux,
+                    rarea,
+                    dp2,
+                )
+
+    def _apply_transport_into(
+        self, apply_stencils, q, q_out, dp1, dp2, x_mass_flux, y_mass_flux, rarea
+    ):
+        (
+            q_advected_y_x_advected_mean,
+            q_x_advected_mean,
+            q_advected_x_y_advected_mean,
+            q_y_advected_mean,
+        ) = self.finite_volume_transport.advected_means
+        for apply_stencil in apply_stencils:
+            apply_stencil(
+                q,
+                dp1,
+                q_advected_y_x_advected_mean,
+                q_x_advected_mean,
+                q_advected_x_y_advected_mean,
+                q_y_advected_mean,
+                x_mass_flux,
+                y_mass_flux,
+                rarea,
+                dp2,
+                q_out,
+            )
+
+    def transport_interior(
+        self,
+        tracers: Dict[str, Quantity],
+        transported_tracers: Dict[str, Quantity],
+        dp1,
+        dp2,
+        x_mass_flux,
+        y_mass_flux,
+        x_courant,
+        y_courant,
+        x_area_flux,
+        y_area_flux,
+        rarea,
+    ):
+        """
+        Advect the interior of the tracers over the substep into
+        transported_tracers, without reading their halos.
+        """
+        for name, q in tracers.items():
+            self.finite_volume_transport.advect_interior_with_shared_area_flux(
+                q,
+                x_courant,
+                y_courant,
+                x_area_flux,
+                y_area_flux,
+            )
+            self._apply_transport_into(
+                self._apply_interior_transport,
+                q,
+                transported_tracers[name],
+                dp1,
+                dp2,
+                x_mass_flux,
+                y_mass_flux,
+                rarea,
+            )
+
+    def transport_edges(
+        self,
+        tracers: Dict[str, Quantity],
+        transported_tracers: Dict[str, Quantity],
+        dp1,
+        dp2,
+        x_mass_flux,
+        y_mass_flux,
+        x_courant,
+        y_courant,
+        x_area_flux,
+        y_area_flux,
+        rarea,
+    ):
+        """
+        Advect the edge strips of the tracers over the substep into
+        transported_tracers once their halos are up to date, then copy the
+        transported tracers back into the tracers.
+        """
+        for name, q in tracers.items():
+            self.finite_volume_transport.advect_edges_with_shared_area_flux(
+                q,
+                x_courant,
+                y_courant,
+                x_area_flux,
+                y_area_flux,
+            )
+            self._apply_transport_into(
+                self._apply_edge_transport,
+                q,
+                transported_tracers[name],
+                dp1,
+                dp2,
+                x_mass_flux,
+                y_mass_flux,
+                rarea,
+            )
+            self._copy_compute_domain(transported_tracers[name], q)
+
+    def swap_dp(self, dp1, dp2):
+        # we can't use variable assignment to avoid a data copy
+        # because of current dace limitations
+        self._swap_dp(dp1, dp2)
+
+
 class TracerAdvection:
     """
     Performs horizontal advection on tracers.
@@ -187,11 +628,31 @@ class TracerAdvection:
         self,
         stencil_factory: StencilFactory,
         quantity_factory: QuantityFactory,
-        transport: FiniteVolumeTransport,
+        transport: Union[FiniteVolumeTransport, Sequence[FiniteVolumeTransport]],
         grid_data,
         comm: Communicator,
         tracers: Dict[str, Quantity],
+        config: Optional[TracerAdvectionConfig] = None,
+        scratch_factory: Optional[QuantityFactory] = None,
     ):
+        """
+        Args:
+            stencil_factory: creates stencils
+            quantity_factory: creates quantities
+            transport: finite volume transport applied to each tracer, or one
+                transport per substep band built on
+                stencil_factory.restrict_vertical of that band, built with
+                shared_area_flux=True to share the area terms across tracers,
+                and split_interior=True to transport the interior of the
+                tracers while their halos are exchanged
+            grid_data: metric terms defining the grid
+            comm: object for tile or cubed-sphere inter-process communication
+            tracers: tracers to advect
+            config: configuration settings, defaults to computing the number
+                of substeps from the Courant number over a single band
+            scratch_factory: creates the quantities written before being read
+                in each call, defaults to quantity_factory
+        """
         orchestrate(
             obj=self,
             config=stencil_factory.config.dace_config,
@@ -201,38 +662,65 @@ class TracerAdvection:
         self.grid_indexing = grid_indexing  # needed for selective validation
         self._tracer_count = len(tracers)
         self.grid_data = grid_data
-
-        self._x_area_flux = quantity_factory.zeros(
+        if config is None:
+            config = TracerAdvectionConfig(q_split=0, n_substep_bands=1)
+        self._q_split = config.q_split
+        self._compute_n_split = self._q_split == 0
+        self._comm = comm
+        if scratch_factory is None:
+            scratch_factory = quantity_factory
+
+        self._x_area_flux = scratch_factory.empty(
             [X_INTERFACE_DIM, Y_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
         )
-        self._y_area_flux = quantity_factory.zeros(
+        self._y_area_flux = scratch_factory.empty(
             [X_DIM, Y_INTERFACE_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
         )
-        self._x_flux = quantity_factory.zeros(
+        self._x_flux = scratch_factory.empty(
             [X_INTERFACE_DIM, Y_INTERFACE_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
         )
-        self._y_flux = quantity_factory.zeros(
+        self._y_flux = scratch_factory.empty(
             [X_INTERFACE_DIM, Y_INTERFACE_DIM, Z_DIM],
             units="unknown",
             dtype=Float,
         )
-        self._tmp_dp = quantity_factory.zeros(
+        self._tmp_dp = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="Pa",
             dtype=Float,
         )
-        self._tmp_dp2 = quantity_factory.zeros(
+        self._tmp_dp2 = scratch_factory.empty(
             [X_DIM, Y_DIM, Z_DIM],
             units="Pa",
             dtype=Float,
         )
 
+        if self._compute_n_split:
+            self._cmax = scratch_factory.empty(
+                [X_DIM, Y_DIM, Z_DIM],
+                units="",
+                dtype=Float,
+            )
+            # Fortran uses the plain Courant number for k < npz/6 (1-based)
+            self._nonorthogonal_weight = quantity_factory.zeros(
+                [Z_DIM],
+                units="",
+                dtype=Float,
+            )
+            n_upper_levels = max(grid_indexing.domain[2] // 6 - 1, 0)
+            self._nonorthogonal_weight.view[n_upper_levels:] = 1.0
+            self._compute_cmax = stencil_factory.from_origin_domain(
+                compute_cmax,
+                origin=grid_indexing.origin_compute(),
+                domain=grid_indexing.domain_compute(),
+            )
+
         ax_offsets = grid_indexing.axis_offsets(
             grid_indexing.origin_full(), grid_indexing.domain_full()
         )
@@ -241,38 +729,51 @@ class TracerAdvection:
             if "local" in axis_offset_name:
                 local_axis_offsets[axis_offset_name] = axis_offset_value
 
-        self._swap_dp = stencil_factory.from_origin_domain(
-            swap_dp,
-            origin=grid_indexing.origin_compute(),
-            domain=grid_indexing.domain_compute(),
-            externals=local_axis_offsets,
-        )
-
         self._flux_compute = stencil_factory.from_origin_domain(
             flux_compute,
             origin=grid_indexing.origin_full(),
             domain=grid_indexing.domain_full(add=(1, 1, 0)),
             externals=local_axis_offsets,
         )
-        self._divide_fluxes_by_n_substeps = stencil_factory.from_origin_domain(
-            divide_fluxes_by_n_substeps,
-            origin=grid_indexing.origin_full(),
-            domain=grid_indexing.domain_full(add=(1, 1, 0)),
-            externals=local_axis_offsets,
-        )
-        self._apply_mass_flux = stencil_factory.from_origin_domain(
-            apply_mass_flux,
-            origin=grid_indexing.origin_compute(),
-            domain=grid_indexing.domain_compute(),
-            externals=local_axis_offsets,
-        )
-        self._apply_tracer_flux = stencil_factory.from_origin_domain(
-            apply_tracer_flux,
-            origin=grid_indexing.origin_compute(),
-            domain=grid_indexing.domain_compute(),
-            externals=local_axis_offsets,
-        )
-        self.finite_volume_transport: FiniteVolumeTransport = transport
+
+        band_bounds = get_substep_bands(grid_indexing.domain[2], config.n_substep_bands)
+        if isinstance(transport, FiniteVolumeTransport):
+            if len(band_bounds) > 1:
+                raise ValueError(
+                    "TracerAdvection: one transport per substep band is needed "
+                    f"for {len(band_bounds)} bands"
+                )
+            transports = [transport]
+        else:
+            transports = list(transport)
+            if len(transports) != len(band_bounds):
+                raise ValueError(
+                    f"TracerAdvection: {len(transports)} transports were given "
+                    f"for {len(band_bounds)} substep bands"
+                )
+        self._bands = [
+            _TracerSubstepBand(
+                stencil_factory,
+                band_transport,
+                k_start=k_start,
+                nk=nk,
+                externals=local_axis_offsets,
+            )
+            for band_transport, (k_start, nk) in zip(transports, band_bounds)
+        ]
+        if not self._compute_n_split:
+            for band in self._bands:
+                band.n_split = self._q_split
+        self._max_n_split = max(band.n_split for band in self._bands)
+        self._split_transport = all(band.has_interior_split for band in self._bands)
+        self._transported_tracers: Dict[str, Quantity] = {}
+        if self._split_transport:
+            for name in tracers:
+                self._transported_tracers[name] = scratch_factory.empty(
+                    [X_DIM, Y_DIM, Z_DIM],
+                    units="",
+                    dtype=Float,
+                )
 
         # Setup halo updater for tracers
         tracer_halo_spec = quantity_factory.get_quantity_halo_spec(
@@ -280,11 +781,51 @@ class TracerAdvection:
             n_halo=N_HALO_DEFAULT,
             dtype=Float,
         )
-        self._tracers_halo_updater = WrappedHaloUpdater(
-            comm.get_scalar_halo_updater([tracer_halo_spec] * self._tracer_count),
-            tracers,
-            [t for t in tracers.keys()],
+        if uses_reduced_precision_halo("tracers", config.reduced_precision_halo):
+            self._tracers_halo_updater = ReducedPrecisionHaloUpdater(
+                comm, quantity_factory, tracers, N_HALO_DEFAULT
+            )
+        else:
+            self._tracers_halo_updater = WrappedHaloUpdater(
+                comm.get_scalar_halo_updater([tracer_halo_spec] * self._tracer_count),
+                tracers,
+                [t for t in tracers.keys()],
+            )
+
+    @property
+    def finite_volume_transport(self) -> FiniteVolumeTransport:
+        return self._bands[0].finite_volume_transport
+
+    @dace_inhibitor
+    def _global_cmax_per_level(self) -> np.ndarray:
+        """Maximum Courant number of each level across all ranks"""
+        local_cmax = np.amax(
+            utils.asarray(self._cmax.view[:], to_type=np.ndarray), axis=(0, 1)
         )
+        return global_max(self._comm.comm, local_cmax)
+
+    @dace_inhibitor
+    def _update_n_split(self) -> int:
+        """
+        Set the number of substeps of each band so that the global maximum
+        Courant number of each substep stays below 1 in that band.
+
+        Returns:
+            the largest number of substeps over all bands
+        """
+        cmax_per_level = self._global_cmax_per_level()
+        for band in self._bands:
+            cmax_band = float(
+                np.max(cmax_per_level[band.k_start : band.k_start + band.nk])
+            )
+            band.n_split = int(1.0 + cmax_band)
+            if band.n_split > 4 and self._comm.rank == 0:
+                ndsl_log.info(
+                    f"Tracer_2d_split={band.n_split}, cmax={cmax_band}, "
+                    f"levels {band.k_start}-{band.k_start + band.nk - 1}"
+                )
+        self._max_n_split = max(band.n_split for band in self._bands)
+        return self._max_n_split
 
     def __call__(
         self,
@@ -299,7 +840,9 @@ class TracerAdvection:
         Apply advection to tracers based on the given courant numbers and mass fluxes.
 
         Note only output values for tracers are used, all other inouts are only such
-        because they are modified for intermediate computation.
+        because they are modified for intermediate computation. On return, the mass
+        fluxes and courant numbers of every level are divided by the largest number
+        of substeps over all bands, as they are with a single band.
 
         Args:
             tracers (inout): tracers to advect according to fluxes during
@@ -317,7 +860,10 @@ class TracerAdvection:
         #         f"specified on init but {len(tracers)} were passed"
         #     )
         # start HALO update on q (in dyn_core in fortran -- just has started when
-        # this function is called...)
+        # this function is called...), it completes while the fluxes, substep
+        # counts and pressure thickness of the first substep are computed, and
+        # the interior of the tracers when the transport is split
+        self._tracers_halo_updater.start()
         self._flux_compute(
             x_courant,
             y_courant,
@@ -334,84 +880,99 @@ class TracerAdvection:
             self._y_area_flux,
         )
 
-        # # TODO for if we end up using the Allreduce and compute cmax globally
-        # (or locally). For now, hardcoded.
-        # split = int(grid_indexing.domain[2] / 6)
-        # self._cmax_1(
-        #     cxd, cyd, self._tmp_cmax, origin=grid_indexing.origin_compute(),
-        #     domain=(grid_indexing.domain[0], self.grid_indexing.domain[1], split)
-        # )
-        # self._cmax_2(
-        #     cxd,
-        #     cyd,
-        #     self.grid.sin_sg5,
-        #     self._tmp_cmax,
-        #     origin=(grid_indexing.isc, self.grid_indexing.jsc, split),
-        #     domain=(
-        #         grid_indexing.domain[0],
-        #         self.grid_indexing.domain[1],
-        #         grid_indexing.domain[2] - split + 1
-        #     ),
-        # )
-        # cmax_flat = np.amax(self._tmp_cmax, axis=(0, 1))
-        # # cmax_flat is a gt4py storage still, but of dimension [npz+1]...
-
-        # cmax_max_all_ranks = cmax_flat.data
-        # # TODO mpi allreduce...
-        # # comm.Allreduce(cmax_flat, cmax_max_all_ranks, op=MPI.MAX)
-
-        cmax_max_all_ranks = 2.0
-        n_split = math.floor(1.0 + cmax_max_all_ranks)
-        # NOTE: cmax is not usually a single value, it varies with k, if return to
-        # that, make n_split a column as well
-
-        if n_split > 1.0:
-            self._divide_fluxes_by_n_substeps(
+        if self._compute_n_split:
+            self._compute_cmax(
+                x_courant,
+                y_courant,
+                self.grid_data.sin_sg5,
+                self._nonorthogonal_weight,
+                self._cmax,
+            )
+            n_split = self._update_n_split()
+        else:
+            n_split = self._max_n_split
+
+        # each band of levels is substepped as often as its own maximum
+        # courant number requires, fluxes are scaled accordingly
+        for band in self._bands:
+            band.prepare_fluxes(
                 x_courant,
                 self._x_area_flux,
                 x_mass_flux,
                 y_courant,
                 self._y_area_flux,
                 y_mass_flux,
-                n_split,
             )
 
-        self._tracers_halo_updater.update()
-
         dp2 = self._tmp_dp
+        for band in self._bands:
+            band.apply_mass_flux(
+                dp1, dp2, x_mass_flux, y_mass_flux, self.grid_data.rarea
+            )
 
         for it in range(n_split):
             last_call = it == n_split - 1
-            # tracer substep
-            self._apply_mass_flux(
-                dp1,
-                x_mass_flux,
-                y_mass_flux,
-                self.grid_data.rarea,
-                dp2,
-            )
-            for q in tracers.values():
-                self.finite_volume_transport(
-                    q,
-                    x_courant,
-                    y_courant,
-                    self._x_area_flux,
-                    self._y_area_flux,
-                    self._x_flux,
-                    self._y_flux,
-                    x_mass_flux=x_mass_flux,
-                    y_mass_flux=y_mass_flux,
-                )
-                self._apply_tracer_flux(
-                    q,
-                    dp1,
-                    self._x_flux,
-                    self._y_flux,
-                    self.grid_data.rarea,
-                    dp2,
-                )
+            # tracer substep, the halos of the tracers are in flight
+            if self._split_transport:
+                for band in self._bands:
+                    if it < band.n_split:
+                        band.transport_interior(
+                            tracers,
+                            self._transported_tracers,
+                            dp1,
+                            dp2,
+                            x_mass_flux,
+                            y_mass_flux,
+                            x_courant,
+                            y_courant,
+                            self._x_area_flux,
+                            self._y_area_flux,
+                            self.grid_data.rarea,
+                        )
+            self._tracers_halo_updater.wait()
+            for band in self._bands:
+                if it < band.n_split:
+                    if self._split_transport:
+                        band.transport_edges(
+                            tracers,
+                            self._transported_tracers,
+                            dp1,
+                            dp2,
+                            x_mass_flux,
+                            y_mass_flux,
+                            x_courant,
+                            y_courant,
+                            self._x_area_flux,
+                            self._y_area_flux,
+                            self.grid_data.rarea,
+                        )
+                    else:
+                        band.transport(
+                            tracers,
+                            dp1,
+                            dp2,
+                            x_mass_flux,
+                            y_mass_flux,
+                            x_courant,
+                            y_courant,
+                            self._x_area_flux,
+                            self._y_area_flux,
+                            self._x_flux,
+                            self._y_flux,
+                            self.grid_data.rarea,
+                        )
             if not last_call:
-                self._tracers_halo_updater.update()
-                # we can't use variable assignment to avoid a data copy
-                # because of current dace limitations
-                self._swap_dp(dp1, dp2)
+                # the pressure thickness of the next substep does not depend
+                # on the tracers, it is computed while their halos are in flight
+                self._tracers_halo_updater.start()
+                for band in self._bands:
+                    if it < band.n_split - 1:
+                        band.swap_dp(dp1, dp2)
+                        band.apply_mass_flux(
+                            dp1, dp2, x_mass_flux, y_mass_flux, self.grid_data.rarea
+                        )
+
+        # each band divided its fluxes by its own number of substeps, the
+        # exported fluxes are those of a single band substepped n_split times
+        for band in self._bands:
+            band.restore_fluxes(x_courant, x_mass_flux, y_courant, y_mass_flux, n_split)
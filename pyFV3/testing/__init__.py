@@ -2,7 +2,7 @@
 from .map_single import MapSingleFactory
 from .translate_dyncore import TranslateDynCore
 from .translate_fvdynamics import TranslateDycoreFortranData2Py, TranslateFVDynamics
-from .validation import enable_selective_validation
+from .validation import enable_reduced_precision_halos, enable_selective_validation
 
 
 """
@@ -11,4 +11,5 @@ TranslateDynCore: Translate test for dynamical core
 TranslateDycoreFortranData2Py: Infrastructure to format serialized fortran data for translate tests
 TranslateFVDynamics: Translate test of acoustic dynamics
 enable_selective_validation: Allows for selection of data for translate tests
+enable_reduced_precision_halos: Sends selected halo exchanges as float32 in tests
 """
@@ -1,8 +1,9 @@
 import inspect
-from typing import Callable, Mapping, Tuple
+from typing import Callable, Mapping, Sequence, Tuple
 
 import numpy as np
 
+import pyFV3.halo
 import pyFV3.stencils.divergence_damping
 import pyFV3.stencils.updatedzd
 from ndsl.constants import X_DIM, X_INTERFACE_DIM, Y_DIM, Y_INTERFACE_DIM, Z_DIM
@@ -194,3 +195,15 @@ def enable_selective_validation():
             "u": get_domain_func([X_DIM, Y_INTERFACE_DIM, Z_DIM]),
         },
     )
+
+
+def enable_reduced_precision_halos(names: Sequence[str]):
+    """
+    Send the given halo exchanges as float32 in every component built
+    afterwards, whatever its configuration, so that translate tests check
+    the reduced precision against their usual thresholds.
+
+    Args:
+        names: halo exchanges from pyFV3.halo.REDUCED_PRECISION_HALOS
+    """
+    pyFV3.halo.set_forced_reduced_precision_halos(names)
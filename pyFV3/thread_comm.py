@@ -0,0 +1,537 @@
+import abc
+import collections
+import copy
+import functools
+import threading
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ndsl.comm.mpi import MPI
+
+
+T = TypeVar("T")
+
+_POLL_INTERVAL = 1.0
+"""seconds between checks that no other rank has failed while waiting"""
+
+_MAX_COLORS = 16
+"""colors of a SubtileComm.Split distinguished in message tags"""
+_MAX_CONTEXTS = 1 + _MAX_COLORS + _MAX_COLORS ** 2
+"""SubtileComm message contexts, allowing two levels of splits"""
+_MAX_TAG = 32767
+"""largest tag of a SubtileComm message, the smallest bound MPI guarantees"""
+_COLLECTIVE_TAG = -1
+
+
+class _RankFailedError(RuntimeError):
+    """Raised on the ranks waiting for a rank which has failed"""
+
+    def __init__(self):
+        super().__init__("another rank of the ThreadComm has failed")
+
+
+class _SharedState:
+    """State shared by the ranks of one ThreadComm"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.condition = threading.Condition()
+        self.messages: Dict[Tuple[int, int, int], Deque["_Message"]] = {}
+        self.barrier = threading.Barrier(size)
+        self.contributions: List[Any] = [None] * size
+        self.result: Any = None
+        self.failed = False
+
+    def abort(self):
+        with self.condition:
+            self.failed = True
+            self.condition.notify_all()
+        self.barrier.abort()
+
+
+class _Message:
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+
+class _Request:
+    """Request of a non-blocking send or receive, completed by wait"""
+
+    def __init__(self, complete: Callable[[], None]):
+        self._complete = complete
+        self._done = False
+
+    def wait(self):
+        if not self._done:
+            self._complete()
+            self._done = True
+
+    Wait = wait
+
+
+def _reduce(values: List[Any], op) -> Any:
+    if MPI is not None:
+        ufuncs = (
+            (MPI.SUM, np.add),
+            (MPI.PROD, np.multiply),
+            (MPI.MAX, np.maximum),
+            (MPI.MIN, np.minimum),
+        )
+        for mpi_op, ufunc in ufuncs:
+            if op is mpi_op:
+                return functools.reduce(ufunc, values)
+    if op is None:
+        return functools.reduce(np.add, values)
+    return functools.reduce(op, values)
+
+
+class _Collectives(abc.ABC):
+    """Collective operations of a communicator built on its _collective"""
+
+    rank: int
+
+    @abc.abstractmethod
+    def _collective(self, contribution: Any, combine: Callable[[List[Any]], Any]):
+        """
+        Gather the contribution of every rank, combine them once and return
+        the combined result on every rank.
+        """
+
+    def barrier(self):
+        self._collective(None, lambda contributions: None)
+
+    Barrier = barrier
+
+    def bcast(self, value: Any, root: int = 0) -> Any:
+        return self._collective(value, lambda contributions: contributions[root])
+
+    def allgather(self, sendobj: Any) -> List[Any]:
+        return self._collective(sendobj, list)
+
+    def gather(self, sendobj: Any, root: int = 0) -> Optional[List[Any]]:
+        gathered = self._collective(sendobj, list)
+        return gathered if self.rank == root else None
+
+    def Gather(self, sendbuf, recvbuf, root: int = 0, **kwargs):
+        gathered = self._collective(sendbuf, list)
+        if self.rank == root:
+            for rank, buffer in enumerate(gathered):
+                recvbuf[rank, ...] = buffer
+
+    def Scatter(self, sendbuf, recvbuf, root: int = 0, **kwargs):
+        scattered = self._collective(sendbuf, lambda contributions: contributions[root])
+        recvbuf[...] = scattered[self.rank]
+
+    def allreduce(self, sendobj: Any, op=None) -> Any:
+        return self._collective(
+            sendobj, lambda contributions: _reduce(contributions, op)
+        )
+
+    def Allreduce(self, sendbuf, recvbuf, op=None, **kwargs):
+        recvbuf[...] = self._collective(
+            sendbuf, lambda contributions: _reduce(contributions, op)
+        )
+
+
+class ThreadComm(_Collectives):
+    """
+    In-process replacement for an mpi4py communicator, for running every
+    rank of a model as a thread of the same process, e.g. the 6 tiles of a
+    small cubed-sphere run on one node.
+
+    Point-to-point messages are not serialized: a send copies its buffer
+    into the message, which the receiving rank copies into its receive
+    buffer, so that sends complete without waiting for the receiver.
+    Collectives synchronize all ranks through a barrier.
+
+    Reduction operators are the ones of mpi4py when it is installed, which
+    does not require launching with MPI.
+
+    Create the communicators of all ranks with run_on_threads, or with
+    ThreadComm.create_ranks if the threads are managed by the caller.
+    """
+
+    def __init__(self, rank: int, shared: _SharedState):
+        self._rank = rank
+        self._shared = shared
+
+    @classmethod
+    def create_ranks(cls, size: int) -> List["ThreadComm"]:
+        """Communicators of each of the given number of ranks"""
+        shared = _SharedState(size)
+        return [cls(rank, shared) for rank in range(size)]
+
+    def _abort(self):
+        """Release the ranks waiting for this one after it has failed"""
+        self._shared.abort()
+
+    def Get_rank(self) -> int:
+        return self._rank
+
+    def Get_size(self) -> int:
+        return self._shared.size
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    @property
+    def size(self) -> int:
+        return self._shared.size
+
+    def _wait_until(self, predicate: Callable[[], bool]):
+        """Wait on the shared condition, which must be held, for predicate"""
+        while not predicate():
+            if self._shared.failed:
+                raise _RankFailedError()
+            self._shared.condition.wait(_POLL_INTERVAL)
+
+    def _post(self, buffer, dest: int, tag: int) -> _Message:
+        message = _Message(buffer)
+        with self._shared.condition:
+            key = (self._rank, dest, tag)
+            self._shared.messages.setdefault(key, collections.deque()).append(
+                message
+            )
+            self._shared.condition.notify_all()
+        return message
+
+    def _take(self, source: int, tag: int) -> _Message:
+        key = (source, self._rank, tag)
+        with self._shared.condition:
+            self._wait_until(lambda: len(self._shared.messages.get(key, ())) > 0)
+            return self._shared.messages[key].popleft()
+
+    def _receive(self, recvbuf, source: int, tag: int):
+        recvbuf[...] = self._take(source, tag).buffer
+
+    def Isend(self, sendbuf, dest: int, tag: int = 0, **kwargs) -> _Request:
+        self.Send(sendbuf, dest, tag)
+        return _Request(lambda: None)
+
+    def Send(self, sendbuf, dest: int, tag: int = 0, **kwargs):
+        # copied so that the send completes without waiting for the receiver
+        self._post(sendbuf.copy(), dest, tag)
+
+    def Irecv(self, recvbuf, source: int, tag: int = 0, **kwargs) -> _Request:
+        return _Request(lambda: self._receive(recvbuf, source, tag))
+
+    def Recv(self, recvbuf, source: int, tag: int = 0, **kwargs):
+        self._receive(recvbuf, source, tag)
+
+    def send(self, obj: Any, dest: int, tag: int = 0):
+        self._post(copy.deepcopy(obj), dest, tag)
+
+    def isend(self, obj: Any, dest: int, tag: int = 0) -> _Request:
+        self.send(obj, dest, tag)
+        return _Request(lambda: None)
+
+    def recv(self, source: int, tag: int = 0) -> Any:
+        return self._take(source, tag).buffer
+
+    def sendrecv(
+        self,
+        sendobj: Any,
+        dest: int,
+        sendtag: int = 0,
+        source: Optional[int] = None,
+        recvtag: int = 0,
+        **kwargs,
+    ) -> Any:
+        self.send(sendobj, dest, sendtag)
+        return self.recv(dest if source is None else source, recvtag)
+
+    def _collective(self, contribution: Any, combine: Callable[[List[Any]], Any]):
+        """
+        Gather the contribution of every rank, combine them once on rank 0
+        and return the combined result on every rank.
+        """
+        shared = self._shared
+        shared.contributions[self._rank] = contribution
+        try:
+            shared.barrier.wait()
+            if self._rank == 0:
+                shared.result = combine(list(shared.contributions))
+            shared.barrier.wait()
+            result = shared.result
+            shared.barrier.wait()
+        except threading.BrokenBarrierError:
+            raise _RankFailedError()
+        return result
+
+    def Split(self, color: int, key: int) -> "ThreadComm":
+        def create_groups(contributions: List[Tuple[int, int]]):
+            groups: Dict[int, List[Tuple[int, int]]] = {}
+            for rank, (rank_color, rank_key) in enumerate(contributions):
+                groups.setdefault(rank_color, []).append((rank_key, rank))
+            new_ranks = {}
+            for members in groups.values():
+                group_state = _SharedState(len(members))
+                for new_rank, (_, rank) in enumerate(sorted(members)):
+                    new_ranks[rank] = (new_rank, group_state)
+            return new_ranks
+
+        new_ranks = self._collective((color, key), create_groups)
+        new_rank, group_state = new_ranks[self._rank]
+        return ThreadComm(new_rank, group_state)
+
+
+def _check_mpi_support(comm, subtiles_per_rank: int):
+    """Raise if comm cannot carry the messages of the given subtiles"""
+    if MPI.Query_thread() < MPI.THREAD_MULTIPLE:
+        raise RuntimeError(
+            "SubtileComm: MPI must be initialized with MPI_THREAD_MULTIPLE "
+            "for subtiles to communicate from their own threads"
+        )
+    tag_upper_bound = comm.Get_attr(MPI.TAG_UB)
+    required_upper_bound = (_MAX_TAG + 2) * _MAX_CONTEXTS * subtiles_per_rank ** 2 - 1
+    if tag_upper_bound is None or tag_upper_bound < required_upper_bound:
+        raise RuntimeError(
+            f"SubtileComm: {subtiles_per_rank} subtiles per rank need an MPI "
+            f"tag upper bound of at least {required_upper_bound}, "
+            f"got {tag_upper_bound}"
+        )
+
+
+class SubtileComm(_Collectives):
+    """
+    Communicator of one of several subtiles owned by the same MPI rank, each
+    run on its own thread, e.g. to over-decompose the domain so that the
+    compute of a subtile overlaps with the communication of another.
+
+    Rank r of the communicator is the subtile members[r], given as the rank
+    of its process in the MPI communicator and its index among the subtiles
+    of that process. Messages between subtiles of the same process are
+    copied through a ThreadComm, other messages go through MPI with tags
+    identifying the sending and receiving subtiles, which requires MPI to
+    support MPI_THREAD_MULTIPLE and a tag upper bound large enough to encode
+    tags up to 32767 with them, as checked by create_subtiles.
+
+    Create the communicators of the subtiles of a process with run_subtiles,
+    or with SubtileComm.create_subtiles if the threads are managed by the
+    caller.
+    """
+
+    def __init__(
+        self,
+        comm,
+        local: ThreadComm,
+        members: Sequence[Tuple[int, int]],
+        rank: int,
+        context: int = 0,
+    ):
+        """
+        Args:
+            comm: MPI communicator of the processes owning the subtiles
+            local: communicator of this subtile among the subtiles of its
+                process, whose rank is the index of the subtile
+            members: MPI rank and subtile index of each rank
+            rank: rank of this subtile
+            context: identifies the messages of this communicator among the
+                ones of the communicators split from the same MPI communicator
+        """
+        if context >= _MAX_CONTEXTS:
+            raise ValueError("SubtileComm: too many nested splits")
+        self._comm = comm
+        self._local = local
+        self._members = list(members)
+        self._rank = rank
+        self._context = context
+
+    @classmethod
+    def create_subtiles(cls, comm, subtiles_per_rank: int) -> List["SubtileComm"]:
+        """
+        Communicators of the subtiles of this process, subtile i of MPI rank r
+        having rank r * subtiles_per_rank + i.
+
+        Raises:
+            RuntimeError: if comm is an MPI communicator which does not
+                support messages from several threads or whose tag upper
+                bound is too small for the number of subtiles
+        """
+        if MPI is not None and isinstance(comm, MPI.Comm):
+            _check_mpi_support(comm, subtiles_per_rank)
+        locals_ = ThreadComm.create_ranks(subtiles_per_rank)
+        members = [
+            (mpi_rank, index)
+            for mpi_rank in range(comm.Get_size())
+            for index in range(subtiles_per_rank)
+        ]
+        first_rank = comm.Get_rank() * subtiles_per_rank
+        return [
+            cls(comm, local, members, first_rank + index)
+            for index, local in enumerate(locals_)
+        ]
+
+    def _abort(self):
+        self._local._abort()
+
+    def Get_rank(self) -> int:
+        return self._rank
+
+    def Get_size(self) -> int:
+        return len(self._members)
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    @property
+    def size(self) -> int:
+        return len(self._members)
+
+    def _route(self, other_rank: int, tag: int, sending: bool):
+        """
+        Communicator, rank and tag reaching other_rank from this one, tags
+        below 0 are reserved for collectives.
+        """
+        if tag > _MAX_TAG:
+            raise ValueError(f"SubtileComm: tag {tag} is above {_MAX_TAG}")
+        mpi_rank, index = self._members[self._rank]
+        other_mpi_rank, other_index = self._members[other_rank]
+        source, dest = (index, other_index) if sending else (other_index, index)
+        n_subtiles = self._local.size
+        encoded_tag = (
+            ((tag + 1) * _MAX_CONTEXTS + self._context) * n_subtiles + source
+        ) * n_subtiles + dest
+        if other_mpi_rank == mpi_rank:
+            return self._local, other_index, encoded_tag
+        return self._comm, other_mpi_rank, encoded_tag
+
+    def Isend(self, sendbuf, dest: int, tag: int = 0, **kwargs):
+        comm, rank, tag = self._route(dest, tag, sending=True)
+        return comm.Isend(sendbuf, dest=rank, tag=tag)
+
+    def Send(self, sendbuf, dest: int, tag: int = 0, **kwargs):
+        comm, rank, tag = self._route(dest, tag, sending=True)
+        comm.Send(sendbuf, dest=rank, tag=tag)
+
+    def Irecv(self, recvbuf, source: int, tag: int = 0, **kwargs):
+        comm, rank, tag = self._route(source, tag, sending=False)
+        return comm.Irecv(recvbuf, source=rank, tag=tag)
+
+    def Recv(self, recvbuf, source: int, tag: int = 0, **kwargs):
+        comm, rank, tag = self._route(source, tag, sending=False)
+        comm.Recv(recvbuf, source=rank, tag=tag)
+
+    def send(self, obj: Any, dest: int, tag: int = 0):
+        comm, rank, tag = self._route(dest, tag, sending=True)
+        comm.send(obj, dest=rank, tag=tag)
+
+    def recv(self, source: int, tag: int = 0) -> Any:
+        comm, rank, tag = self._route(source, tag, sending=False)
+        return comm.recv(source=rank, tag=tag)
+
+    def sendrecv(
+        self,
+        sendobj: Any,
+        dest: int,
+        sendtag: int = 0,
+        source: Optional[int] = None,
+        recvtag: int = 0,
+        **kwargs,
+    ) -> Any:
+        comm, rank, tag = self._route(dest, sendtag, sending=True)
+        request = comm.isend(sendobj, dest=rank, tag=tag)
+        received = self.recv(dest if source is None else source, recvtag)
+        request.wait()
+        return received
+
+    def _collective(self, contribution: Any, combine: Callable[[List[Any]], Any]):
+        if self._rank == 0:
+            contributions = [contribution] + [
+                self.recv(rank, _COLLECTIVE_TAG) for rank in range(1, self.size)
+            ]
+            result = combine(contributions)
+            for rank in range(1, self.size):
+                self.send(result, rank, _COLLECTIVE_TAG)
+            return result
+        self.send(contribution, 0, _COLLECTIVE_TAG)
+        return self.recv(0, _COLLECTIVE_TAG)
+
+    def Split(self, color: int, key: int) -> "SubtileComm":
+        def create_groups(contributions: List[Tuple[int, int]]):
+            colors = sorted(set(rank_color for rank_color, _ in contributions))
+            if len(colors) > _MAX_COLORS:
+                raise ValueError(
+                    f"SubtileComm: cannot split into more than {_MAX_COLORS} "
+                    f"colors, got {len(colors)}"
+                )
+            groups: Dict[int, List[Tuple[int, int]]] = {}
+            for rank, (rank_color, rank_key) in enumerate(contributions):
+                groups.setdefault(rank_color, []).append((rank_key, rank))
+            new_ranks = {}
+            for rank_color, group in groups.items():
+                ranks = [rank for _, rank in sorted(group)]
+                members = [self._members[rank] for rank in ranks]
+                context = self._context * _MAX_COLORS + 1 + colors.index(rank_color)
+                for new_rank, rank in enumerate(ranks):
+                    new_ranks[rank] = (members, new_rank, context)
+            return new_ranks
+
+        new_ranks = self._collective((color, key), create_groups)
+        members, new_rank, context = new_ranks[self._rank]
+        return SubtileComm(self._comm, self._local, members, new_rank, context)
+
+
+def _run_threads(target: Callable[[Any], T], comms: Sequence[Any]) -> List[T]:
+    results: List[Any] = [None] * len(comms)
+    errors: List[Tuple[int, BaseException]] = []
+
+    def run(index: int, comm):
+        try:
+            results[index] = target(comm)
+        except BaseException as error:
+            errors.append((comm.rank, error))
+            comm._abort()
+
+    threads = [
+        threading.Thread(target=run, args=(index, comm), name=f"rank-{comm.rank}")
+        for index, comm in enumerate(comms)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if len(errors) > 0:
+        # ranks failing because another one did are not the cause
+        errors.sort(
+            key=lambda rank_error: isinstance(rank_error[1], _RankFailedError)
+        )
+        rank, error = errors[0]
+        raise RuntimeError(f"rank {rank} failed") from error
+    return results
+
+
+def run_on_threads(target: Callable[[ThreadComm], T], size: int) -> List[T]:
+    """
+    Run target once per rank, each on its own thread with the ThreadComm of
+    its rank, e.g. with a function building a CubedSphereCommunicator and a
+    DynamicalCore from the given communicator and stepping it.
+
+    Returns:
+        the value returned by target on each rank
+
+    Raises:
+        the first exception raised by target on any rank, after every
+        thread has stopped
+    """
+    return _run_threads(target, ThreadComm.create_ranks(size))
+
+
+def run_subtiles(
+    target: Callable[[SubtileComm], T], comm, subtiles_per_rank: int
+) -> List[T]:
+    """
+    Run target once per subtile of this process, each on its own thread with
+    the SubtileComm of its subtile. Every process of comm must call it.
+
+    Returns:
+        the value returned by target on each subtile of this process
+
+    Raises:
+        the first exception raised by target on any subtile of this process,
+        after every thread of this process has stopped
+    """
+    return _run_threads(target, SubtileComm.create_subtiles(comm, subtiles_per_rank))
@@ -0,0 +1,169 @@
+import contextlib
+import dataclasses
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from ndsl.constants import HORIZONTAL_DIMS
+from ndsl.dsl.dace.orchestration import dace_inhibitor
+from ndsl.performance.timer import Timer
+from ndsl.quantity import QuantityHaloSpec
+
+
+class HierarchicalTimer(Timer):
+    """
+    Timer whose clocks nest: a clock started while others are running is
+    recorded under the path of the running clocks, e.g.
+    "k_split/DynCore/acoustic_substep/c_sw".
+
+    times and hits keep the name-to-value layout of Timer, keyed by path,
+    so they can be reported alongside any other timer.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._running: List[str] = []
+
+    def start(self, name: str):
+        super().start("/".join(self._running + [name]))
+        self._running.append(name)
+
+    def stop(self, name: str):
+        if len(self._running) == 0 or self._running[-1] != name:
+            raise ValueError(f"clock {name} is not the innermost running clock")
+        super().stop("/".join(self._running))
+        self._running.pop()
+
+    @contextlib.contextmanager
+    def clock(self, name: str):
+        # stopped on exceptions too, so that later clocks nest correctly
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def self_times(self) -> Dict[str, float]:
+        """Time spent in each clock outside of its nested clocks"""
+        times = self.times
+        self_times = dict(times)
+        for path, seconds in times.items():
+            parent, _, _ = path.rpartition("/")
+            if parent in self_times:
+                self_times[parent] -= seconds
+        return self_times
+
+    def write_collapsed_stacks(self, filename: str):
+        """
+        Write the self time of each clock in microseconds, in the collapsed
+        stack format read by flame graph tools (e.g. flamegraph.pl, speedscope).
+        """
+        with open(filename, "w") as f:
+            for path, seconds in self.self_times().items():
+                f.write(f"{path.replace('/', ';')} {int(round(seconds * 1e6))}\n")
+
+
+@dataclasses.dataclass
+class HaloExchangeStatistics:
+    """Counters of the exchanges of one halo updater"""
+
+    exchanges: int = 0
+    bytes_sent: int = 0
+    """estimated from the halo points of the exchanged quantities"""
+    in_flight_time: float = 0.0
+    """time between the return of start and the call to wait, in seconds"""
+    wait_time: float = 0.0
+    """time blocked in wait, or in a blocking update, in seconds"""
+
+    @property
+    def overlap_efficiency(self) -> float:
+        """Fraction of the exchange time hidden behind other work"""
+        total_time = self.in_flight_time + self.wait_time
+        if total_time == 0.0:
+            return 0.0
+        return self.in_flight_time / total_time
+
+    def reset(self):
+        self.exchanges = 0
+        self.bytes_sent = 0
+        self.in_flight_time = 0.0
+        self.wait_time = 0.0
+
+
+def halo_exchange_bytes(specs: Sequence[QuantityHaloSpec]) -> int:
+    """
+    Bytes sent by a rank in one exchange of quantities with the given specs,
+    counting every halo point around the compute domain once.
+    """
+    n_bytes = 0
+    for spec in specs:
+        horizontal_extent = [
+            extent
+            for dim, extent in zip(spec.dims, spec.extent)
+            if dim in HORIZONTAL_DIMS
+        ]
+        other_extent = [
+            extent
+            for dim, extent in zip(spec.dims, spec.extent)
+            if dim not in HORIZONTAL_DIMS
+        ]
+        n_halo_points = int(
+            np.prod([extent + 2 * spec.n_points for extent in horizontal_extent])
+            - np.prod(horizontal_extent)
+        )
+        n_bytes += n_halo_points * int(np.prod(other_extent)) * spec.itemsize
+    return n_bytes
+
+
+class TimedHaloUpdater:
+    """
+    Halo updater clocking its start, wait and update calls as
+    halo_<name>_start, halo_<name>_wait and halo_<name>_update, and
+    accumulating its HaloExchangeStatistics.
+    """
+
+    def __init__(
+        self,
+        updater,
+        name: str,
+        timer: Timer,
+        statistics: HaloExchangeStatistics,
+        bytes_per_exchange: int,
+    ):
+        self._updater = updater
+        self._timer = timer
+        self._start_clock = f"halo_{name}_start"
+        self._wait_clock = f"halo_{name}_wait"
+        self._update_clock = f"halo_{name}_update"
+        self.statistics = statistics
+        self._bytes_per_exchange = bytes_per_exchange
+        self._start_return_time = 0.0
+
+    @dace_inhibitor
+    def start(self, *args, **kwargs):
+        with self._timer.clock(self._start_clock):
+            self._updater.start(*args, **kwargs)
+        self.statistics.exchanges += 1
+        self.statistics.bytes_sent += self._bytes_per_exchange
+        self._start_return_time = time.perf_counter()
+
+    @dace_inhibitor
+    def wait(self, *args, **kwargs):
+        wait_start_time = time.perf_counter()
+        self.statistics.in_flight_time += wait_start_time - self._start_return_time
+        with self._timer.clock(self._wait_clock):
+            self._updater.wait(*args, **kwargs)
+        self.statistics.wait_time += time.perf_counter() - wait_start_time
+
+    @dace_inhibitor
+    def update(self, *args, **kwargs):
+        update_start_time = time.perf_counter()
+        with self._timer.clock(self._update_clock):
+            self._updater.update(*args, **kwargs)
+        self.statistics.exchanges += 1
+        self.statistics.bytes_sent += self._bytes_per_exchange
+        self.statistics.wait_time += time.perf_counter() - update_start_time
+
+    def __getattr__(self, name):
+        return getattr(self._updater, name)
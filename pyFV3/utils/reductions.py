@@ -0,0 +1,28 @@
+import numpy as np
+
+from ndsl.comm.mpi import MPI
+from ndsl.comm.null_comm import NullComm
+
+
+def global_max(comm, local_max: np.ndarray) -> np.ndarray:
+    """
+    Element-wise maximum of local_max over the ranks of comm.
+
+    Args:
+        comm: mpi4py-like communicator, e.g. Communicator.comm
+        local_max: maximum on this rank
+
+    Returns:
+        the maximum over all ranks, or local_max itself when comm has a single
+        rank or is a NullComm, which stands in for ranks that are not run and
+        does no reduction
+    """
+    if isinstance(comm, NullComm) or comm.Get_size() == 1:
+        return local_max
+    if MPI is None:
+        # without mpi4py the communicator can still hold several ranks,
+        # e.g. a ThreadComm, whose reductions accept numpy ufuncs
+        return comm.allreduce(local_max, op=np.maximum)
+    reduced = np.empty_like(local_max)
+    comm.Allreduce(local_max, reduced, op=MPI.MAX)
+    return reduced
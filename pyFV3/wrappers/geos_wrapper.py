@@ -1,8 +1,9 @@
+import dataclasses
 import enum
 import logging
 import os
 from datetime import timedelta
-from typing import Dict, List, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
 import f90nml
 import numpy as np
@@ -20,16 +21,16 @@ from ndsl.dsl.dace.dace_config import DaceConfig, DaCeOrchestration
 from ndsl.dsl.gt4py_utils import is_gpu_backend
 from ndsl.dsl.stencil import GridIndexing, StencilFactory
 from ndsl.dsl.stencil_config import CompilationConfig, StencilConfig
-from ndsl.dsl.typing import floating_point_precision
-from ndsl.grid import GridData
+from ndsl.dsl.typing import Float, floating_point_precision
 from ndsl.grid.generation import MetricTerms
-from ndsl.grid.helper import DampingCoefficients
 from ndsl.initialization.allocator import QuantityFactory
 from ndsl.initialization.sizer import SubtileGridSizer
 from ndsl.logging import ndsl_log
 from ndsl.optional_imports import cupy as cp
 from ndsl.performance.collector import PerformanceCollector
 from ndsl.utils import safe_assign_array
+from pyFV3.grid_cache import GridCache, load_or_compute_grid
+from pyFV3.memory import RecordingQuantityFactory, component_scope
 
 
 class StencilBackendCompilerOverride:
@@ -88,6 +89,53 @@ class MemorySpace(enum.Enum):
     DEVICE = 1
 
 
+INPUT_NAMES = (
+    "u",
+    "v",
+    "w",
+    "delz",
+    "pt",
+    "delp",
+    "q",
+    "ps",
+    "pe",
+    "pk",
+    "peln",
+    "pkz",
+    "phis",
+    "q_con",
+    "omga",
+    "ua",
+    "va",
+    "uc",
+    "vc",
+    "mfxd",
+    "mfyd",
+    "cxd",
+    "cyd",
+    "diss_estd",
+)
+"""arrays given to GeosDycoreWrapper.__call__, in argument order"""
+
+SINGLE_STEP_OUTPUTS = ("mfxd", "mfyd", "cxd", "cyd", "diss_estd")
+"""outputs accumulated during a dycore step and reset at the start of the next"""
+
+
+def _check_n_steps(n_steps: int, requested_outputs: Optional[Sequence[str]]):
+    """Raise a ValueError if the outputs cannot be requested after n_steps"""
+    if n_steps < 1:
+        raise ValueError(f"n_steps must be at least 1, got {n_steps}")
+    if n_steps > 1:
+        single_step_outputs = set(SINGLE_STEP_OUTPUTS)
+        if requested_outputs is not None:
+            single_step_outputs.intersection_update(requested_outputs)
+        if len(single_step_outputs) > 0:
+            raise ValueError(
+                f"outputs {sorted(single_step_outputs)} are reset every "
+                f"step and cannot be requested with n_steps={n_steps}"
+            )
+
+
 class GeosDycoreWrapper:
     """
     Provides an interface for the Geos model to access the Pace dycore.
@@ -101,7 +149,27 @@ class GeosDycoreWrapper:
         comm: Comm,
         backend: str,
         fortran_mem_space: MemorySpace = MemorySpace.HOST,
+        contiguous_tracers: bool = False,
+        fortran_buffers: Optional[Dict[str, np.ndarray]] = None,
     ):
+        """
+        Args:
+            namelist: Fortran namelist of the dycore
+            bdt: dynamics timestep in seconds
+            comm: communicator of all ranks running the dycore
+            backend: stencil backend
+            fortran_mem_space: memory space of the arrays given by the caller
+            contiguous_tracers: keep the tracers in a single [x, y, z, tracer]
+                buffer so they are exchanged with GEOS in one bulk copy
+            fortran_buffers: caller-owned arrays, named as the arguments of
+                __call__, which the dycore adopts as the storage of its state
+                instead of copying them in and out at every call. They must
+                have the halos, strides and dtype of the dycore storages,
+                "q" requires contiguous_tracers, and the same arrays must be
+                given to every call. Only possible if fortran_mem_space is
+                the memory space of the backend. state_buffers gives arrays
+                with the required layout.
+        """
         # Look for an override to run on a single node
         gtfv3_single_rank_override = int(os.getenv("GTFV3_SINGLE_RANK_OVERRIDE", -1))
         if gtfv3_single_rank_override >= 0:
@@ -128,14 +196,37 @@ class GeosDycoreWrapper:
             self.namelist, partitioner.tile, self.communicator.tile.rank
         )
         quantity_factory = QuantityFactory.from_backend(sizer=sizer, backend=backend)
+        # Record the memory allocated by each component of the dycore
+        memory_report_file = os.getenv("GTFV3_MEMORY_REPORT", None)
+        if memory_report_file is not None:
+            quantity_factory = RecordingQuantityFactory(quantity_factory)
 
         # set up the metric terms and grid data
-        metric_terms = MetricTerms(
-            quantity_factory=quantity_factory,
-            communicator=self.communicator,
-            eta_file=namelist["grid_config"]["config"]["eta_file"],
-        )
-        grid_data = GridData.new_from_metric_terms(metric_terms)
+        eta_file = namelist["grid_config"]["config"]["eta_file"]
+        # Reuse the grid of a previous run with the same configuration
+        grid_cache_directory = os.getenv("GTFV3_GRID_CACHE", None)
+        grid_cache = None
+        if grid_cache_directory is not None:
+            grid_cache = GridCache(
+                grid_cache_directory,
+                npx=self.dycore_config.npx,
+                npy=self.dycore_config.npy,
+                npz=self.dycore_config.npz,
+                layout=self.layout,
+                rank=self.communicator.rank,
+                backend=backend,
+                eta_file=eta_file,
+            )
+        with component_scope(quantity_factory, "MetricTerms"):
+            grid_data, damping_coefficients = load_or_compute_grid(
+                grid_cache,
+                lambda: MetricTerms(
+                    quantity_factory=quantity_factory,
+                    communicator=self.communicator,
+                    eta_file=eta_file,
+                ),
+                self.communicator,
+            )
 
         stencil_config = StencilConfig(
             compilation_config=CompilationConfig(
@@ -168,14 +259,34 @@ class GeosDycoreWrapper:
             config=stencil_config, grid_indexing=self._grid_indexing
         )
 
-        self.dycore_state = pyFV3.DycoreState.init_zeros(
-            quantity_factory=quantity_factory
+        self._fortran_mem_space = fortran_mem_space
+        self._pace_mem_space = (
+            MemorySpace.DEVICE if is_gpu_backend(backend) else MemorySpace.HOST
         )
-        self.dycore_state.bdt = self.dycore_config.dt_atmos
 
-        damping_coefficients = DampingCoefficients.new_from_metric_terms(metric_terms)
+        if fortran_buffers is None:
+            fortran_buffers = {}
+        if len(fortran_buffers) > 0 and self._fortran_mem_space != self._pace_mem_space:
+            raise ValueError(
+                f"cannot adopt buffers in {self._fortran_mem_space} "
+                f"with a backend in {self._pace_mem_space}"
+            )
+        self._adopted_buffers = fortran_buffers
+        adopted_storages = {
+            ("tracer_block" if name == "q" else name): buffer
+            for name, buffer in fortran_buffers.items()
+        }
+        with component_scope(quantity_factory, "DycoreState"):
+            self.dycore_state = pyFV3.DycoreState.init_zeros(
+                quantity_factory=quantity_factory,
+                contiguous_tracers=contiguous_tracers,
+                storages=adopted_storages,
+            )
+        self.dycore_state.bdt = self.dycore_config.dt_atmos
 
-        with StencilBackendCompilerOverride(MPI.COMM_WORLD, stencil_config.dace_config):
+        with StencilBackendCompilerOverride(
+            MPI.COMM_WORLD, stencil_config.dace_config
+        ), component_scope(quantity_factory, "DynamicalCore"):
             self.dynamical_core = pyFV3.DynamicalCore(
                 comm=self.communicator,
                 grid_data=grid_data,
@@ -188,14 +299,25 @@ class GeosDycoreWrapper:
                 state=self.dycore_state,
             )
 
-        self._fortran_mem_space = fortran_mem_space
-        self._pace_mem_space = (
-            MemorySpace.DEVICE if is_gpu_backend(backend) else MemorySpace.HOST
-        )
-
         self.output_dict: Dict[str, np.ndarray] = {}
         self._allocate_output_dir()
 
+        # inputs copied into the dycore state by the current call, and at
+        # least once since initialization
+        self._inputs_to_copy: FrozenSet[str] = frozenset(INPUT_NAMES)
+        self._copied_inputs: Set[str] = set()
+        self._ever_copied_inputs: Set[str] = set()
+        # outputs the dycore reads but never modifies
+        self._unmodified_outputs = frozenset(
+            _field.name
+            for _field in dataclasses.fields(pyFV3.DycoreState)
+            if _field.metadata.get("intent", None) == "in"
+        )
+
+        if memory_report_file is not None and self.communicator.rank == 0:
+            ndsl_log.info(f"Dycore memory allocations:\n{quantity_factory.table()}")
+            quantity_factory.to_json(memory_report_file)
+
         # Feedback information
         device_ordinal_info = (
             f"  Device PCI bus id: {cp.cuda.Device(0).pci_bus_id}\n"
@@ -217,10 +339,35 @@ class GeosDycoreWrapper:
             f"  orchestration : {self._is_orchestrated}\n"
             f"          sizer : {sizer.nx}x{sizer.ny}x{sizer.nz}"
             f"(halo: {sizer.n_halo})\n"
+            f"adopted buffers : {sorted(fortran_buffers.keys())}\n"
             f"     Device ord : {device_ordinal_info}\n"
             f"     Nvidia MPS : {MPS_is_on}"
         )
 
+    def state_buffers(self) -> Dict[str, Any]:
+        """
+        Storages of the dycore state, named as the arguments of __call__,
+        for callers that cannot allocate arrays with the layout required by
+        fortran_buffers. The caller fills and passes these arrays to every
+        call in place of its own, they are adopted and never copied.
+        "q" is only available with contiguous_tracers.
+        """
+        if self._fortran_mem_space != self._pace_mem_space:
+            raise ValueError(
+                f"cannot share buffers in {self._pace_mem_space} "
+                f"with a caller in {self._fortran_mem_space}"
+            )
+        state = self.dycore_state
+        buffers = {}
+        for name in INPUT_NAMES:
+            if name == "q":
+                if state.tracer_block is not None:
+                    buffers[name] = state.tracer_block
+            else:
+                buffers[name] = getattr(state, name).data
+        self._adopted_buffers = dict(buffers)
+        return buffers
+
     def _critical_path(self):
         """Top-level orchestration function"""
         with self.perf_collector.timestep_timer.clock("step_dynamics"):
@@ -256,7 +403,31 @@ class GeosDycoreWrapper:
         cxd: np.ndarray,
         cyd: np.ndarray,
         diss_estd: np.ndarray,
+        changed_inputs: Optional[Sequence[str]] = None,
+        requested_outputs: Optional[Sequence[str]] = None,
+        n_steps: int = 1,
     ) -> Tuple[Dict[str, np.ndarray], Dict[str, List[float]]]:
+        """
+        Args:
+            changed_inputs: names in INPUT_NAMES of the inputs modified by the
+                caller since the previous call, the others are not copied
+                into the dycore. All inputs are copied if None, and each input
+                is copied on its first call.
+            requested_outputs: names of the outputs the caller reads, only
+                those are refreshed. All outputs if None. Outputs the dycore
+                does not modify (intent "in" on DycoreState) are refreshed
+                only when their input is copied.
+            n_steps: number of dycore steps to run between the import of
+                the inputs and the export of the outputs, for runs without
+                physics coupling in between. Timings are those of the whole
+                call, summed over the steps. The outputs in
+                SINGLE_STEP_OUTPUTS would only cover the last step, so they
+                cannot be requested with more than one step, which requires
+                giving requested_outputs.
+        """
+        _check_n_steps(n_steps, requested_outputs)
+        self._inputs_to_copy = self._select_inputs(changed_inputs)
+        self._copied_inputs.clear()
         with self.perf_collector.timestep_timer.clock("numpy-to-dycore"):
             self.dycore_state = self._put_fortran_data_in_dycore(
                 u,
@@ -285,15 +456,28 @@ class GeosDycoreWrapper:
                 diss_estd,
             )
 
-        # Enter orchestrated code - if applicable
-        self._critical_path()
+        for _ in range(n_steps):
+            # Enter orchestrated code - if applicable
+            self._critical_path()
 
         with self.perf_collector.timestep_timer.clock("dycore-to-numpy"):
-            self.output_dict = self._prep_outputs_for_geos()
+            self.output_dict = self._prep_outputs_for_geos(requested_outputs)
 
         # Collect performance of the timestep and write a json file for rank 0
         self.perf_collector.collect_performance()
-        for k, v in self.perf_collector.times_per_step[0].items():
+        step_times = dict(self.perf_collector.times_per_step[0])
+        # sub-component timings, only recorded if detailed_timing is set
+        detailed_timer = self.dynamical_core.detailed_timer
+        for k, v in detailed_timer.times.items():
+            step_times[f"step_dynamics/{k}"] = v
+        detailed_timer.reset()
+        # halo exchange counters, only recorded if halo_statistics is set
+        for name, statistics in self.dynamical_core.halo_statistics.items():
+            step_times[f"halo/{name}/in_flight"] = statistics.in_flight_time
+            step_times[f"halo/{name}/wait"] = statistics.wait_time
+            step_times[f"halo/{name}/bytes"] = float(statistics.bytes_sent)
+            statistics.reset()
+        for k, v in step_times.items():
             if k not in timings.keys():
                 timings[k] = [v]
             else:
@@ -302,6 +486,41 @@ class GeosDycoreWrapper:
 
         return self.output_dict, timings
 
+    def _select_inputs(self, changed_inputs: Optional[Sequence[str]]) -> FrozenSet[str]:
+        """Names of the inputs to copy into the dycore state"""
+        if changed_inputs is None:
+            return frozenset(INPUT_NAMES)
+        unknown = set(changed_inputs).difference(INPUT_NAMES)
+        if len(unknown) > 0:
+            raise ValueError(
+                f"unknown inputs {sorted(unknown)}, valid names are {INPUT_NAMES}"
+            )
+        return frozenset(changed_inputs).union(
+            set(INPUT_NAMES).difference(self._ever_copied_inputs)
+        )
+
+    def _assign_input(self, name: str, to_array, from_array):
+        """
+        Copy from_array, a part of the argument name of __call__, into
+        to_array unless that argument is unchanged, or adopted and already
+        holds the data.
+        """
+        if name not in self._inputs_to_copy:
+            return
+        self._copied_inputs.add(name)
+        self._ever_copied_inputs.add(name)
+        adopted = self._adopted_buffers.get(name, None)
+        if adopted is None:
+            safe_assign_array(to_array, from_array)
+            return
+        adopted_start, adopted_end = np.byte_bounds(adopted)
+        start, end = np.byte_bounds(from_array)
+        if start < adopted_start or end > adopted_end:
+            raise ValueError(
+                f"{name} is not the buffer adopted at initialization, "
+                "the same buffer must be given to every call"
+            )
+
     def _put_fortran_data_in_dycore(
         self,
         u: np.ndarray,
@@ -337,266 +556,186 @@ class GeosDycoreWrapper:
         state = self.dycore_state
 
         # Assign compute domain:
-        safe_assign_array(state.u.view[:], u[isc:iec, jsc : jec + 1, :])
-        safe_assign_array(state.v.view[:], v[isc : iec + 1, jsc:jec, :])
-        safe_assign_array(state.w.view[:], w[isc:iec, jsc:jec, :])
-        safe_assign_array(state.ua.view[:], ua[isc:iec, jsc:jec, :])
-        safe_assign_array(state.va.view[:], va[isc:iec, jsc:jec, :])
-        safe_assign_array(state.uc.view[:], uc[isc : iec + 1, jsc:jec, :])
-        safe_assign_array(state.vc.view[:], vc[isc:iec, jsc : jec + 1, :])
-
-        safe_assign_array(state.delz.view[:], delz[isc:iec, jsc:jec, :])
-        safe_assign_array(state.pt.view[:], pt[isc:iec, jsc:jec, :])
-        safe_assign_array(state.delp.view[:], delp[isc:iec, jsc:jec, :])
-
-        safe_assign_array(state.mfxd.view[:], mfxd)
-        safe_assign_array(state.mfyd.view[:], mfyd)
-        safe_assign_array(state.cxd.view[:], cxd[:, jsc:jec, :])
-        safe_assign_array(state.cyd.view[:], cyd[isc:iec, :, :])
-
-        safe_assign_array(state.ps.view[:], ps[isc:iec, jsc:jec])
-        safe_assign_array(state.pe.data[isc - 1 : iec + 1, jsc - 1 : jec + 1, :], pe)
-        safe_assign_array(state.pk.view[:], pk)
-        safe_assign_array(state.peln.view[:], peln)
-        safe_assign_array(state.pkz.view[:], pkz)
-        safe_assign_array(state.phis.view[:], phis[isc:iec, jsc:jec])
-        safe_assign_array(state.q_con.view[:], q_con[isc:iec, jsc:jec, :])
-        safe_assign_array(state.omga.view[:], omga[isc:iec, jsc:jec, :])
-        safe_assign_array(state.diss_estd.view[:], diss_estd[isc:iec, jsc:jec, :])
+        self._assign_input("u", state.u.view[:], u[isc:iec, jsc : jec + 1, :])
+        self._assign_input("v", state.v.view[:], v[isc : iec + 1, jsc:jec, :])
+        self._assign_input("w", state.w.view[:], w[isc:iec, jsc:jec, :])
+        self._assign_input("ua", state.ua.view[:], ua[isc:iec, jsc:jec, :])
+        self._assign_input("va", state.va.view[:], va[isc:iec, jsc:jec, :])
+        self._assign_input("uc", state.uc.view[:], uc[isc : iec + 1, jsc:jec, :])
+        self._assign_input("vc", state.vc.view[:], vc[isc:iec, jsc : jec + 1, :])
+
+        self._assign_input("delz", state.delz.view[:], delz[isc:iec, jsc:jec, :])
+        self._assign_input("pt", state.pt.view[:], pt[isc:iec, jsc:jec, :])
+        self._assign_input("delp", state.delp.view[:], delp[isc:iec, jsc:jec, :])
+
+        self._assign_input("mfxd", state.mfxd.view[:], mfxd)
+        self._assign_input("mfyd", state.mfyd.view[:], mfyd)
+        self._assign_input("cxd", state.cxd.view[:], cxd[:, jsc:jec, :])
+        self._assign_input("cyd", state.cyd.view[:], cyd[isc:iec, :, :])
+
+        self._assign_input("ps", state.ps.view[:], ps[isc:iec, jsc:jec])
+        self._assign_input(
+            "pe", state.pe.data[isc - 1 : iec + 1, jsc - 1 : jec + 1, :], pe
+        )
+        self._assign_input("pk", state.pk.view[:], pk)
+        self._assign_input("peln", state.peln.view[:], peln)
+        self._assign_input("pkz", state.pkz.view[:], pkz)
+        self._assign_input("phis", state.phis.view[:], phis[isc:iec, jsc:jec])
+        self._assign_input("q_con", state.q_con.view[:], q_con[isc:iec, jsc:jec, :])
+        self._assign_input("omga", state.omga.view[:], omga[isc:iec, jsc:jec, :])
+        self._assign_input(
+            "diss_estd", state.diss_estd.view[:], diss_estd[isc:iec, jsc:jec, :]
+        )
 
         # tracer quantities should be a 4d array in order:
         # vapor, liquid, ice, rain, snow, graupel, cloud
-        safe_assign_array(state.qvapor.view[:], q[isc:iec, jsc:jec, :, 0])
-        safe_assign_array(state.qliquid.view[:], q[isc:iec, jsc:jec, :, 1])
-        safe_assign_array(state.qice.view[:], q[isc:iec, jsc:jec, :, 2])
-        safe_assign_array(state.qrain.view[:], q[isc:iec, jsc:jec, :, 3])
-        safe_assign_array(state.qsnow.view[:], q[isc:iec, jsc:jec, :, 4])
-        safe_assign_array(state.qgraupel.view[:], q[isc:iec, jsc:jec, :, 5])
-        safe_assign_array(state.qcld.view[:], q[isc:iec, jsc:jec, :, 6])
+        if state.tracer_block is not None:
+            # GEOS order is the leading part of TRACER_NAMES
+            self._assign_input(
+                "q",
+                state.tracer_block[isc:iec, jsc:jec, : q.shape[2], :7],
+                q[isc:iec, jsc:jec, :, :7],
+            )
+            return state
+
+        self._assign_input("q", state.qvapor.view[:], q[isc:iec, jsc:jec, :, 0])
+        self._assign_input("q", state.qliquid.view[:], q[isc:iec, jsc:jec, :, 1])
+        self._assign_input("q", state.qice.view[:], q[isc:iec, jsc:jec, :, 2])
+        self._assign_input("q", state.qrain.view[:], q[isc:iec, jsc:jec, :, 3])
+        self._assign_input("q", state.qsnow.view[:], q[isc:iec, jsc:jec, :, 4])
+        self._assign_input("q", state.qgraupel.view[:], q[isc:iec, jsc:jec, :, 5])
+        self._assign_input("q", state.qcld.view[:], q[isc:iec, jsc:jec, :, 6])
 
         return state
 
-    def _prep_outputs_for_geos(self) -> Dict[str, np.ndarray]:
-        output_dict = self.output_dict
+    def _output_sources(self) -> Dict[str, Any]:
+        """Parts of the dycore state returned to GEOS, by output name"""
+        state = self.dycore_state
         isc = self._grid_indexing.isc
         jsc = self._grid_indexing.jsc
         iec = self._grid_indexing.iec + 1
         jec = self._grid_indexing.jec + 1
 
-        if self._fortran_mem_space != self._pace_mem_space:
-            safe_assign_array(output_dict["u"], self.dycore_state.u.data[:-1, :, :-1])
-            safe_assign_array(output_dict["v"], self.dycore_state.v.data[:, :-1, :-1])
-            safe_assign_array(output_dict["w"], self.dycore_state.w.data[:-1, :-1, :-1])
-            safe_assign_array(
-                output_dict["ua"], self.dycore_state.ua.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["va"], self.dycore_state.va.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(output_dict["uc"], self.dycore_state.uc.data[:, :-1, :-1])
-            safe_assign_array(output_dict["vc"], self.dycore_state.vc.data[:-1, :, :-1])
-
-            safe_assign_array(
-                output_dict["delz"], self.dycore_state.delz.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["pt"], self.dycore_state.pt.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["delp"], self.dycore_state.delp.data[:-1, :-1, :-1]
-            )
-
-            safe_assign_array(
-                output_dict["mfxd"],
-                self.dycore_state.mfxd.data[isc : iec + 1, jsc:jec, :-1],
-            )
-            safe_assign_array(
-                output_dict["mfyd"],
-                self.dycore_state.mfyd.data[isc:iec, jsc : jec + 1, :-1],
-            )
-            safe_assign_array(
-                output_dict["cxd"], self.dycore_state.cxd.data[isc : iec + 1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["cyd"], self.dycore_state.cyd.data[:-1, jsc : jec + 1, :-1]
-            )
-
-            safe_assign_array(output_dict["ps"], self.dycore_state.ps.data[:-1, :-1])
-            safe_assign_array(
-                output_dict["pe"],
-                self.dycore_state.pe.data[isc - 1 : iec + 1, jsc - 1 : jec + 1, :],
-            )
-            safe_assign_array(
-                output_dict["pk"], self.dycore_state.pk.data[isc:iec, jsc:jec, :]
-            )
-            safe_assign_array(
-                output_dict["peln"], self.dycore_state.peln.data[isc:iec, jsc:jec, :]
-            )
-            safe_assign_array(
-                output_dict["pkz"], self.dycore_state.pkz.data[isc:iec, jsc:jec, :-1]
-            )
-            safe_assign_array(
-                output_dict["phis"], self.dycore_state.phis.data[:-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["q_con"], self.dycore_state.q_con.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["omga"], self.dycore_state.omga.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["diss_estd"],
-                self.dycore_state.diss_estd.data[:-1, :-1, :-1],
-            )
-
-            safe_assign_array(
-                output_dict["qvapor"], self.dycore_state.qvapor.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qliquid"], self.dycore_state.qliquid.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qice"], self.dycore_state.qice.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qrain"], self.dycore_state.qrain.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qsnow"], self.dycore_state.qsnow.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qgraupel"], self.dycore_state.qgraupel.data[:-1, :-1, :-1]
-            )
-            safe_assign_array(
-                output_dict["qcld"], self.dycore_state.qcld.data[:-1, :-1, :-1]
-            )
+        return {
+            "u": state.u.data[:-1, :, :-1],
+            "v": state.v.data[:, :-1, :-1],
+            "w": state.w.data[:-1, :-1, :-1],
+            "ua": state.ua.data[:-1, :-1, :-1],
+            "va": state.va.data[:-1, :-1, :-1],
+            "uc": state.uc.data[:, :-1, :-1],
+            "vc": state.vc.data[:-1, :, :-1],
+            "delz": state.delz.data[:-1, :-1, :-1],
+            "pt": state.pt.data[:-1, :-1, :-1],
+            "delp": state.delp.data[:-1, :-1, :-1],
+            "mfxd": state.mfxd.data[isc : iec + 1, jsc:jec, :-1],
+            "mfyd": state.mfyd.data[isc:iec, jsc : jec + 1, :-1],
+            "cxd": state.cxd.data[isc : iec + 1, :-1, :-1],
+            "cyd": state.cyd.data[:-1, jsc : jec + 1, :-1],
+            "ps": state.ps.data[:-1, :-1],
+            "pe": state.pe.data[isc - 1 : iec + 1, jsc - 1 : jec + 1, :],
+            "pk": state.pk.data[isc:iec, jsc:jec, :],
+            "peln": state.peln.data[isc:iec, jsc:jec, :],
+            "pkz": state.pkz.data[isc:iec, jsc:jec, :-1],
+            "phis": state.phis.data[:-1, :-1],
+            "q_con": state.q_con.data[:-1, :-1, :-1],
+            "omga": state.omga.data[:-1, :-1, :-1],
+            "diss_estd": state.diss_estd.data[:-1, :-1, :-1],
+            "qvapor": state.qvapor.data[:-1, :-1, :-1],
+            "qliquid": state.qliquid.data[:-1, :-1, :-1],
+            "qice": state.qice.data[:-1, :-1, :-1],
+            "qrain": state.qrain.data[:-1, :-1, :-1],
+            "qsnow": state.qsnow.data[:-1, :-1, :-1],
+            "qgraupel": state.qgraupel.data[:-1, :-1, :-1],
+            "qcld": state.qcld.data[:-1, :-1, :-1],
+        }
+
+    def _exported_outputs(
+        self, requested_outputs: Optional[Sequence[str]]
+    ) -> FrozenSet[str]:
+        """Names of the outputs to refresh from the dycore state"""
+        if requested_outputs is None:
+            exported = set(self.output_dict.keys())
         else:
-            output_dict["u"] = self.dycore_state.u.data[:-1, :, :-1]
-            output_dict["v"] = self.dycore_state.v.data[:, :-1, :-1]
-            output_dict["w"] = self.dycore_state.w.data[:-1, :-1, :-1]
-            output_dict["ua"] = self.dycore_state.ua.data[:-1, :-1, :-1]
-            output_dict["va"] = self.dycore_state.va.data[:-1, :-1, :-1]
-            output_dict["uc"] = self.dycore_state.uc.data[:, :-1, :-1]
-            output_dict["vc"] = self.dycore_state.vc.data[:-1, :, :-1]
-            output_dict["delz"] = self.dycore_state.delz.data[:-1, :-1, :-1]
-            output_dict["pt"] = self.dycore_state.pt.data[:-1, :-1, :-1]
-            output_dict["delp"] = self.dycore_state.delp.data[:-1, :-1, :-1]
-            output_dict["mfxd"] = self.dycore_state.mfxd.data[
-                isc : iec + 1, jsc:jec, :-1
-            ]
-            output_dict["mfyd"] = self.dycore_state.mfyd.data[
-                isc:iec, jsc : jec + 1, :-1
-            ]
-            output_dict["cxd"] = self.dycore_state.cxd.data[isc : iec + 1, :-1, :-1]
-            output_dict["cyd"] = self.dycore_state.cyd.data[:-1, jsc : jec + 1, :-1]
-            output_dict["ps"] = self.dycore_state.ps.data[:-1, :-1]
-            output_dict["pe"] = self.dycore_state.pe.data[
-                isc - 1 : iec + 1, jsc - 1 : jec + 1, :
-            ]
-            output_dict["pk"] = self.dycore_state.pk.data[isc:iec, jsc:jec, :]
-            output_dict["peln"] = self.dycore_state.peln.data[isc:iec, jsc:jec, :]
-            output_dict["pkz"] = self.dycore_state.pkz.data[isc:iec, jsc:jec, :-1]
-            output_dict["phis"] = self.dycore_state.phis.data[:-1, :-1]
-            output_dict["q_con"] = self.dycore_state.q_con.data[:-1, :-1, :-1]
-            output_dict["omga"] = self.dycore_state.omga.data[:-1, :-1, :-1]
-            output_dict["diss_estd"] = self.dycore_state.diss_estd.data[:-1, :-1, :-1]
-            output_dict["qvapor"] = self.dycore_state.qvapor.data[:-1, :-1, :-1]
-            output_dict["qliquid"] = self.dycore_state.qliquid.data[:-1, :-1, :-1]
-            output_dict["qice"] = self.dycore_state.qice.data[:-1, :-1, :-1]
-            output_dict["qrain"] = self.dycore_state.qrain.data[:-1, :-1, :-1]
-            output_dict["qsnow"] = self.dycore_state.qsnow.data[:-1, :-1, :-1]
-            output_dict["qgraupel"] = self.dycore_state.qgraupel.data[:-1, :-1, :-1]
-            output_dict["qcld"] = self.dycore_state.qcld.data[:-1, :-1, :-1]
-
-        return output_dict
+            unknown = set(requested_outputs).difference(self.output_dict.keys())
+            if len(unknown) > 0:
+                raise ValueError(
+                    f"unknown outputs {sorted(unknown)}, "
+                    f"valid names are {list(self.output_dict.keys())}"
+                )
+            exported = set(requested_outputs)
+        # unmodified outputs still hold the last value copied from them
+        exported.difference_update(
+            self._unmodified_outputs.difference(self._copied_inputs)
+        )
+        return frozenset(exported)
+
+    def _prep_outputs_for_geos(
+        self, requested_outputs: Optional[Sequence[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        if self._fortran_mem_space == self._pace_mem_space:
+            return self.output_dict
+
+        exported = self._exported_outputs(requested_outputs)
+        for name in exported:
+            source, packed = self._output_packing[name]
+            packed[...] = source
+        if self._device_output_staging is not None:
+            # one transfer to the host per range, a single one for all outputs
+            for start, end in self._transfer_ranges(exported):
+                self._device_output_staging[start:end].get(
+                    out=self._output_staging[start:end]
+                )
+        return self.output_dict
+
+    def _transfer_ranges(self, exported: FrozenSet[str]) -> List[Tuple[int, int]]:
+        """
+        Contiguous [start, end) ranges of the staging buffer holding the
+        exported outputs, outputs adjacent in the buffer sharing a range
+        """
+        ranges: List[List[int]] = []
+        for name, (offset, shape) in self._output_offsets.items():
+            if name not in exported:
+                continue
+            end = offset + int(np.prod(shape))
+            if len(ranges) > 0 and ranges[-1][1] == offset:
+                ranges[-1][1] = end
+            else:
+                ranges.append([offset, end])
+        return [(start, end) for start, end in ranges]
 
     def _allocate_output_dir(self):
-        if self._fortran_mem_space != self._pace_mem_space:
-            nhalo = self._grid_indexing.n_halo
-            shape_centered = self._grid_indexing.domain_full(add=(0, 0, 0))
-            shape_x_interface = self._grid_indexing.domain_full(add=(1, 0, 0))
-            shape_y_interface = self._grid_indexing.domain_full(add=(0, 1, 0))
-            shape_z_interface = self._grid_indexing.domain_full(add=(0, 0, 1))
-            shape_2d = shape_centered[:-1]
-
-            self.output_dict["u"] = np.empty((shape_y_interface))
-            self.output_dict["v"] = np.empty((shape_x_interface))
-            self.output_dict["w"] = np.empty((shape_centered))
-            self.output_dict["ua"] = np.empty((shape_centered))
-            self.output_dict["va"] = np.empty((shape_centered))
-            self.output_dict["uc"] = np.empty((shape_x_interface))
-            self.output_dict["vc"] = np.empty((shape_y_interface))
-
-            self.output_dict["delz"] = np.empty((shape_centered))
-            self.output_dict["pt"] = np.empty((shape_centered))
-            self.output_dict["delp"] = np.empty((shape_centered))
-
-            self.output_dict["mfxd"] = np.empty(
-                (self._grid_indexing.domain_full(add=(1 - 2 * nhalo, -2 * nhalo, 0)))
-            )
-            self.output_dict["mfyd"] = np.empty(
-                (self._grid_indexing.domain_full(add=(-2 * nhalo, 1 - 2 * nhalo, 0)))
-            )
-            self.output_dict["cxd"] = np.empty(
-                (self._grid_indexing.domain_full(add=(1 - 2 * nhalo, 0, 0)))
-            )
-            self.output_dict["cyd"] = np.empty(
-                (self._grid_indexing.domain_full(add=(0, 1 - 2 * nhalo, 0)))
-            )
+        """
+        Build the outputs returned to GEOS.
+
+        When GEOS and the dycore share a memory space, the outputs are views of
+        the dycore state. Otherwise all outputs are views into one contiguous
+        host staging buffer, each at a fixed offset. With a device backend the
+        outputs are first packed into a device buffer of the same layout, which
+        is transferred to the host in one copy.
+        """
+        sources = self._output_sources()
+        if self._fortran_mem_space == self._pace_mem_space:
+            self.output_dict = dict(sources)
+            return
 
-            self.output_dict["ps"] = np.empty((shape_2d))
-            self.output_dict["pe"] = np.empty(
-                (self._grid_indexing.domain_full(add=(2 - 2 * nhalo, 2 - 2 * nhalo, 1)))
-            )
-            self.output_dict["pk"] = np.empty(
-                (self._grid_indexing.domain_full(add=(-2 * nhalo, -2 * nhalo, 1)))
-            )
-            self.output_dict["peln"] = np.empty(
-                (self._grid_indexing.domain_full(add=(-2 * nhalo, -2 * nhalo, 1)))
-            )
-            self.output_dict["pkz"] = np.empty(
-                (self._grid_indexing.domain_full(add=(-2 * nhalo, -2 * nhalo, 0)))
-            )
-            self.output_dict["phis"] = np.empty((shape_2d))
-            self.output_dict["q_con"] = np.empty((shape_centered))
-            self.output_dict["omga"] = np.empty((shape_centered))
-            self.output_dict["diss_estd"] = np.empty((shape_centered))
-
-            self.output_dict["qvapor"] = np.empty((shape_centered))
-            self.output_dict["qliquid"] = np.empty((shape_centered))
-            self.output_dict["qice"] = np.empty((shape_centered))
-            self.output_dict["qrain"] = np.empty((shape_centered))
-            self.output_dict["qsnow"] = np.empty((shape_centered))
-            self.output_dict["qgraupel"] = np.empty((shape_centered))
-            self.output_dict["qcld"] = np.empty((shape_centered))
+        self._output_offsets: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+        size = 0
+        for name, source in sources.items():
+            self._output_offsets[name] = (size, tuple(source.shape))
+            size += int(np.prod(source.shape))
+        self._output_staging = np.empty(size, dtype=Float)
+        if self._pace_mem_space == MemorySpace.DEVICE:
+            self._device_output_staging = cp.empty(size, dtype=Float)
+            pack_buffer = self._device_output_staging
         else:
-            self.output_dict["u"] = None
-            self.output_dict["v"] = None
-            self.output_dict["w"] = None
-            self.output_dict["ua"] = None
-            self.output_dict["va"] = None
-            self.output_dict["uc"] = None
-            self.output_dict["vc"] = None
-            self.output_dict["delz"] = None
-            self.output_dict["pt"] = None
-            self.output_dict["delp"] = None
-            self.output_dict["mfxd"] = None
-            self.output_dict["mfyd"] = None
-            self.output_dict["cxd"] = None
-            self.output_dict["cyd"] = None
-            self.output_dict["ps"] = None
-            self.output_dict["pe"] = None
-            self.output_dict["pk"] = None
-            self.output_dict["peln"] = None
-            self.output_dict["pkz"] = None
-            self.output_dict["phis"] = None
-            self.output_dict["q_con"] = None
-            self.output_dict["omga"] = None
-            self.output_dict["diss_estd"] = None
-            self.output_dict["qvapor"] = None
-            self.output_dict["qliquid"] = None
-            self.output_dict["qice"] = None
-            self.output_dict["qrain"] = None
-            self.output_dict["qsnow"] = None
-            self.output_dict["qgraupel"] = None
-            self.output_dict["qcld"] = None
+            self._device_output_staging = None
+            pack_buffer = self._output_staging
+
+        self._output_packing: Dict[str, Tuple[Any, Any]] = {}
+        for name, (offset, shape) in self._output_offsets.items():
+            end = offset + int(np.prod(shape))
+            self._output_packing[name] = (
+                sources[name],
+                pack_buffer[offset:end].reshape(shape),
+            )
+            self.output_dict[name] = self._output_staging[offset:end].reshape(shape)
@@ -18,9 +18,20 @@ def pytest_addoption(parser):
     parser.addoption("--threshold_overrides_file", action="store", default=None)
     parser.addoption("--compute_grid", action="store_true")
     parser.addoption("--dperiodic", action="store_true")
+    parser.addoption(
+        "--reduced_precision_halos",
+        action="store",
+        default=None,
+        help="comma-separated halo exchanges to send as float32, e.g. divgd,tracers",
+    )
 
 
 def pytest_configure(config):
+    reduced_precision_halos = config.getoption("reduced_precision_halos")
+    if reduced_precision_halos is not None:
+        import pyFV3.testing
+
+        pyFV3.testing.enable_reduced_precision_halos(reduced_precision_halos.split(","))
     # register an additional marker
     config.addinivalue_line(
         "markers", "sequential(name): mark test as running sequentially on ranks"
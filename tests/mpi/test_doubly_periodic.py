@@ -1,20 +1,27 @@
+import dataclasses
 from datetime import timedelta
-from typing import Any, List, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
+
+import numpy as np
+import pytest
 
 import ndsl.dsl.stencil
 import ndsl.stencils.testing
 import pyFV3.initialization.test_cases.initialize_baroclinic as baroclinic_init
 from ndsl.comm.communicator import CubedSphereCommunicator, TileCommunicator
-from ndsl.comm.mpi import MPIComm
+from ndsl.comm.mpi import MPI, MPIComm
 from ndsl.comm.partitioner import TilePartitioner
 from ndsl.dsl.stencil import GridIndexing
 from ndsl.grid import DampingCoefficients, GridData, MetricTerms
 from ndsl.initialization.allocator import QuantityFactory
 from ndsl.initialization.sizer import SubtileGridSizer
 from pyFV3 import DynamicalCore, DynamicalCoreConfig
+from pyFV3.thread_comm import run_on_threads
 
 
-def setup_dycore() -> Tuple[DynamicalCore, List[Any]]:
+def setup_dycore(
+    mpi_comm: Optional[Any] = None, config_overrides: Optional[Dict[str, Any]] = None
+) -> Tuple[DynamicalCore, List[Any]]:
     backend = "numpy"
     layout = (3, 3)
     config = DynamicalCoreConfig(
@@ -61,7 +68,10 @@ def setup_dycore() -> Tuple[DynamicalCore, List[Any]]:
         z_tracer=True,
         do_qa=True,
     )
-    mpi_comm = MPIComm()
+    if config_overrides is not None:
+        config = dataclasses.replace(config, **config_overrides)
+    if mpi_comm is None:
+        mpi_comm = MPIComm()
     partitioner = TilePartitioner(config.layout)
     # TODO: cleanup typing of tile vs cubed sphere communicators,
     # currently both have a .tile attribute that reference a TileCommunicator
@@ -142,3 +152,106 @@ def setup_dycore() -> Tuple[DynamicalCore, List[Any]]:
 def test_dycore_runs_one_step():
     dycore, args = setup_dycore()
     dycore.step_dynamics(*args)
+
+
+@pytest.mark.skipif(
+    MPI is not None and MPI.COMM_WORLD.Get_size() > 1,
+    reason="runs every rank on a thread of a single process",
+)
+def test_dycore_runs_one_step_on_threads():
+    def run_rank(comm):
+        dycore, args = setup_dycore(comm)
+        dycore.step_dynamics(*args)
+
+    run_on_threads(run_rank, size=9)
+
+
+def run_on_all_ranks(target: Callable[[Any], Any]) -> List[Any]:
+    """
+    Run target with the communicator of each rank of the 3x3 layout, on
+    threads of this process unless it was launched on several MPI ranks.
+
+    Returns:
+        the value returned by target on each rank run by this process
+    """
+    if MPI is not None and MPI.COMM_WORLD.Get_size() > 1:
+        return [target(MPIComm())]
+    return run_on_threads(target, size=9)
+
+
+def step_and_copy_state(config_overrides: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """State of each rank after one step with the given configuration"""
+
+    def run_rank(comm):
+        dycore, args = setup_dycore(comm, config_overrides=config_overrides)
+        dycore.step_dynamics(*args)
+        state = args[0]
+        return {
+            name: np.array(quantity.data) for name, quantity in state.as_dict().items()
+        }
+
+    return run_on_all_ranks(run_rank)
+
+
+def assert_states_identical(
+    reference: List[Dict[str, Any]], states: List[Dict[str, Any]]
+):
+    for reference_state, state in zip(reference, states):
+        assert reference_state.keys() == state.keys()
+        for name, data in state.items():
+            np.testing.assert_array_equal(data, reference_state[name], err_msg=name)
+
+
+def test_coalesced_halo_exchanges_do_not_change_state():
+    reference = step_and_copy_state({"coalesce_halo_exchanges": False})
+    coalesced = step_and_copy_state({"coalesce_halo_exchanges": True})
+    assert_states_identical(reference, coalesced)
+
+
+def test_tracer_substep_bands_export_the_fluxes_of_a_single_band():
+    # each band divides the fluxes by its own number of substeps, they are
+    # returned divided by the largest one as with a single band, the tracers
+    # differ where a band takes fewer substeps
+    reference = step_and_copy_state({"tracer_substep_bands": 1})
+    banded = step_and_copy_state({"tracer_substep_bands": 4})
+    for reference_state, state in zip(reference, banded):
+        for name in ("mfxd", "mfyd", "cxd", "cyd"):
+            np.testing.assert_allclose(
+                state[name], reference_state[name], rtol=1e-12, err_msg=name
+            )
+
+
+def test_split_tracer_transport_does_not_change_state():
+    # 8x8 cells per rank, the interior transported before the tracer halos
+    # arrive is 2x2
+    overrides = {"npx": 25, "npy": 25}
+    reference = step_and_copy_state(
+        {**overrides, "overlap_tracer_halo_exchange": False}
+    )
+    split = step_and_copy_state({**overrides, "overlap_tracer_halo_exchange": True})
+    assert_states_identical(reference, split)
+
+
+def test_scratch_arena_does_not_change_state():
+    # with several remapping steps, each phase reads its scratch buffers after
+    # the other phases wrote them
+    reference = step_and_copy_state({"scratch_arena": False, "k_split": 2})
+    with_arena = step_and_copy_state({"scratch_arena": True, "k_split": 2})
+    assert_states_identical(reference, with_arena)
+
+
+def test_scratch_arena_shares_buffers_across_phases():
+    def run_rank(comm):
+        dycore, _ = setup_dycore(comm, config_overrides={"scratch_arena": True})
+        acoustic = dycore.acoustic_dynamics
+        tracer_advection = dycore.tracer_advection
+        remapping = dycore._lagrangian_to_eulerian_obj
+        assert np.shares_memory(acoustic._crx.data, tracer_advection._x_area_flux.data)
+        assert np.shares_memory(acoustic._cry.data, tracer_advection._y_area_flux.data)
+        assert np.shares_memory(tracer_advection._tmp_dp.data, remapping._dp2.data)
+        assert np.shares_memory(dycore._cvm.data, remapping._dp2.data)
+        assert not np.shares_memory(acoustic._crx.data, acoustic._xfx.data)
+        return dycore._scratch_arena.peak_bytes, dycore._scratch_arena.summed_bytes
+
+    for peak_bytes, summed_bytes in run_on_all_ranks(run_rank):
+        assert peak_bytes < summed_bytes
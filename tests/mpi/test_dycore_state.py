@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from pyFV3.dycore_state import TRACER_NAMES, DycoreState
+
+
+def make_quantity_factory():
+    sizer = SubtileGridSizer(nx=6, ny=5, nz=4, n_halo=3, extra_dim_lengths={})
+    return QuantityFactory.from_backend(sizer=sizer, backend="numpy")
+
+
+def test_tracers_are_views_into_the_tracer_block():
+    quantity_factory = make_quantity_factory()
+    state = DycoreState.init_zeros(quantity_factory, contiguous_tracers=True)
+    block = state.tracer_block
+    assert block.shape == state.pt.data.shape + (len(TRACER_NAMES),)
+    for i_tracer, name in enumerate(TRACER_NAMES):
+        tracer = getattr(state, name).data
+        assert np.shares_memory(tracer, block)
+        # each tracer is a contiguous slab with the memory order of pt
+        assert tracer.strides == state.pt.data.strides
+        tracer[:] = i_tracer + 1.0
+    for i_tracer, name in enumerate(TRACER_NAMES):
+        np.testing.assert_array_equal(block[..., i_tracer], i_tracer + 1.0)
+
+
+def test_tracers_are_allocated_separately_by_default():
+    state = DycoreState.init_zeros(make_quantity_factory())
+    assert state.tracer_block is None
+    for name in TRACER_NAMES[1:]:
+        assert not np.shares_memory(getattr(state, name).data, state.qvapor.data)
+
+
+def test_adopted_storages_are_used_without_copy():
+    quantity_factory = make_quantity_factory()
+    reference = DycoreState.init_zeros(quantity_factory, contiguous_tracers=True)
+    pt = np.empty_like(reference.pt.data)
+    pt[:] = 300.0
+    tracer_block = np.empty_like(reference.tracer_block)
+    tracer_block[:] = 1.0
+    state = DycoreState.init_zeros(
+        quantity_factory,
+        contiguous_tracers=True,
+        storages={"pt": pt, "tracer_block": tracer_block},
+    )
+    assert state.pt.data is pt
+    assert state.tracer_block is tracer_block
+    assert np.shares_memory(state.qvapor.data, tracer_block)
+    # the caller's values are kept
+    np.testing.assert_array_equal(state.pt.data, 300.0)
+    np.testing.assert_array_equal(state.qcld.data, 1.0)
+    pt[:] = 250.0
+    np.testing.assert_array_equal(state.pt.view[:], 250.0)
+
+
+def test_adopted_storage_with_other_layout_is_rejected():
+    quantity_factory = make_quantity_factory()
+    reference = DycoreState.init_zeros(quantity_factory)
+    pt = np.zeros_like(reference.pt.data, order="F")
+    if pt.strides == reference.pt.data.strides:
+        pt = np.zeros_like(reference.pt.data, order="C")
+    with pytest.raises(ValueError, match="strides"):
+        DycoreState.init_zeros(quantity_factory, storages={"pt": pt})
@@ -0,0 +1,209 @@
+import types
+
+import numpy as np
+import pytest
+
+import pyFV3.wrappers.geos_wrapper
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from pyFV3.dycore_state import TRACER_NAMES, DycoreState
+from pyFV3.wrappers.geos_wrapper import (
+    INPUT_NAMES,
+    SINGLE_STEP_OUTPUTS,
+    GeosDycoreWrapper,
+    MemorySpace,
+    _check_n_steps,
+)
+
+
+NX = 6
+NY = 5
+NZ = 4
+N_HALO = 3
+N_GEOS_TRACERS = 7
+
+
+def make_state(contiguous_tracers: bool = False) -> DycoreState:
+    sizer = SubtileGridSizer(nx=NX, ny=NY, nz=NZ, n_halo=N_HALO, extra_dim_lengths={})
+    quantity_factory = QuantityFactory.from_backend(sizer=sizer, backend="numpy")
+    return DycoreState.init_zeros(
+        quantity_factory, contiguous_tracers=contiguous_tracers
+    )
+
+
+def make_wrapper(state: DycoreState) -> GeosDycoreWrapper:
+    """GEOS wrapper bridging the given state, without a dycore to run"""
+    wrapper = GeosDycoreWrapper.__new__(GeosDycoreWrapper)
+    wrapper.dycore_state = state
+    wrapper._grid_indexing = types.SimpleNamespace(
+        isc=N_HALO,
+        jsc=N_HALO,
+        iec=N_HALO + NX - 1,
+        jec=N_HALO + NY - 1,
+    )
+    wrapper._fortran_mem_space = MemorySpace.HOST
+    wrapper._pace_mem_space = MemorySpace.HOST
+    wrapper._adopted_buffers = {}
+    wrapper._inputs_to_copy = frozenset(INPUT_NAMES)
+    wrapper._copied_inputs = set()
+    wrapper._ever_copied_inputs = set()
+    wrapper._unmodified_outputs = frozenset(["phis"])
+    wrapper.output_dict = {}
+    return wrapper
+
+
+def geos_tracers() -> np.ndarray:
+    shape = (NX + 2 * N_HALO, NY + 2 * N_HALO, NZ, N_GEOS_TRACERS)
+    return np.random.default_rng(0).random(shape)
+
+
+def test_geos_tracers_are_copied_into_their_slabs():
+    q = geos_tracers()
+    for contiguous_tracers in (True, False):
+        state = make_state(contiguous_tracers)
+        wrapper = make_wrapper(state)
+        wrapper._inputs_to_copy = frozenset(["q"])
+        inputs = {name: None for name in INPUT_NAMES}
+        inputs["q"] = q
+        wrapper._put_fortran_data_in_dycore(**inputs)
+        compute_domain = (
+            slice(N_HALO, N_HALO + NX),
+            slice(N_HALO, N_HALO + NY),
+            slice(0, NZ),
+        )
+        for i_tracer, name in enumerate(TRACER_NAMES):
+            expected = np.zeros_like(getattr(state, name).data)
+            # GEOS tracers are the leading part of TRACER_NAMES
+            if i_tracer < N_GEOS_TRACERS:
+                expected[compute_domain] = q[
+                    N_HALO:-N_HALO, N_HALO:-N_HALO, :, i_tracer
+                ]
+            np.testing.assert_array_equal(
+                getattr(state, name).data, expected, err_msg=name
+            )
+
+
+@pytest.fixture
+def copies(monkeypatch):
+    """Storages of the dycore state the wrapper copies inputs into"""
+    copied = []
+
+    def safe_assign_array(to_array, from_array):
+        copied.append(to_array)
+        to_array[:] = from_array
+
+    monkeypatch.setattr(
+        pyFV3.wrappers.geos_wrapper, "safe_assign_array", safe_assign_array
+    )
+    return copied
+
+
+def test_state_buffers_are_adopted_without_copy(copies):
+    state = make_state(contiguous_tracers=True)
+    wrapper = make_wrapper(state)
+    buffers = wrapper.state_buffers()
+    assert sorted(buffers.keys()) == sorted(INPUT_NAMES)
+    assert buffers["pt"] is state.pt.data
+    assert buffers["q"] is state.tracer_block
+    buffers["pt"][:] = 300.0
+    buffers["q"][..., 0] = 1.0
+    wrapper._put_fortran_data_in_dycore(**buffers)
+    assert len(copies) == 0
+    np.testing.assert_array_equal(state.pt.data, 300.0)
+    np.testing.assert_array_equal(state.qvapor.data, 1.0)
+    # the same buffers must be given to every call
+    inputs = dict(buffers)
+    inputs["pt"] = buffers["pt"].copy()
+    with pytest.raises(ValueError, match="pt"):
+        wrapper._put_fortran_data_in_dycore(**inputs)
+
+
+def test_inputs_are_copied_unless_adopted(copies):
+    state = make_state()
+    wrapper = make_wrapper(state)
+    buffers = wrapper.state_buffers()
+    assert "q" not in buffers
+    inputs = dict(buffers)
+    inputs["q"] = geos_tracers()
+    wrapper._put_fortran_data_in_dycore(**inputs)
+    # only the separately allocated tracers are copied
+    assert len(copies) == N_GEOS_TRACERS
+
+
+def test_select_inputs_copies_each_input_on_its_first_call():
+    wrapper = make_wrapper(make_state(contiguous_tracers=True))
+    inputs = wrapper.state_buffers()
+    assert wrapper._select_inputs(["pt"]) == frozenset(INPUT_NAMES)
+    wrapper._inputs_to_copy = wrapper._select_inputs(["pt"])
+    wrapper._put_fortran_data_in_dycore(**inputs)
+    assert wrapper._select_inputs(["pt"]) == frozenset(["pt"])
+    assert wrapper._select_inputs([]) == frozenset()
+    assert wrapper._select_inputs(None) == frozenset(INPUT_NAMES)
+    with pytest.raises(ValueError, match="unknown inputs"):
+        wrapper._select_inputs(["temperature"])
+
+
+def test_unchanged_inputs_are_not_copied(copies):
+    state = make_state()
+    wrapper = make_wrapper(state)
+    wrapper._ever_copied_inputs = set(INPUT_NAMES)
+    wrapper._inputs_to_copy = wrapper._select_inputs(["q"])
+    # unchanged inputs are not read
+    inputs = {name: None for name in INPUT_NAMES}
+    inputs["q"] = geos_tracers()
+    wrapper._put_fortran_data_in_dycore(**inputs)
+    assert len(copies) == N_GEOS_TRACERS
+    assert wrapper._copied_inputs == {"q"}
+
+
+def test_exported_outputs_skip_unmodified_outputs():
+    wrapper = make_wrapper(make_state())
+    wrapper._allocate_output_dir()
+    all_outputs = set(wrapper.output_dict.keys())
+    assert wrapper._exported_outputs(None) == all_outputs - {"phis"}
+    assert wrapper._exported_outputs(["u", "phis"]) == {"u"}
+    # an unmodified output is refreshed when its input was copied
+    wrapper._copied_inputs = {"phis"}
+    assert wrapper._exported_outputs(None) == all_outputs
+    assert wrapper._exported_outputs(["u", "phis"]) == {"u", "phis"}
+    with pytest.raises(ValueError, match="unknown outputs"):
+        wrapper._exported_outputs(["temperature"])
+
+
+def test_transfer_ranges_merge_adjacent_outputs():
+    state = make_state()
+    wrapper = make_wrapper(state)
+    wrapper._fortran_mem_space = MemorySpace.DEVICE
+    wrapper._allocate_output_dir()
+    offsets = wrapper._output_offsets
+    names = list(offsets.keys())
+    size = wrapper._output_staging.size
+
+    def end(name):
+        offset, shape = offsets[name]
+        return offset + int(np.prod(shape))
+
+    assert wrapper._transfer_ranges(frozenset(names)) == [(0, size)]
+    assert wrapper._transfer_ranges(frozenset()) == []
+    assert wrapper._transfer_ranges(frozenset(names[:2] + names[3:4])) == [
+        (0, end(names[1])),
+        (offsets[names[3]][0], end(names[3])),
+    ]
+    # requested outputs are packed into the staging buffer, the others not
+    state.pt.data[:] = np.random.default_rng(0).random(state.pt.data.shape)
+    outputs = wrapper._prep_outputs_for_geos(["pt"])
+    np.testing.assert_array_equal(outputs["pt"], state.pt.data[:-1, :-1, :-1])
+    assert np.shares_memory(outputs["pt"], wrapper._output_staging)
+
+
+def test_check_n_steps():
+    _check_n_steps(1, None)
+    _check_n_steps(2, ["u", "pt"])
+    with pytest.raises(ValueError, match="at least 1"):
+        _check_n_steps(0, None)
+    # single step outputs are requested by default
+    with pytest.raises(ValueError, match="mfxd"):
+        _check_n_steps(2, None)
+    for name in SINGLE_STEP_OUTPUTS:
+        with pytest.raises(ValueError, match=name):
+            _check_n_steps(3, ["u", name])
@@ -0,0 +1,135 @@
+import dataclasses
+import json
+import os
+
+import numpy as np
+import pytest
+
+from ndsl.comm.communicator import TileCommunicator
+from ndsl.comm.mpi import MPI
+from ndsl.comm.partitioner import TilePartitioner
+from ndsl.grid import MetricTerms
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from ndsl.quantity import Quantity
+from pyFV3.grid_cache import GridCache, load_or_compute_grid
+from pyFV3.thread_comm import run_on_threads
+
+
+LAYOUT = (3, 3)
+NPX = 13
+NPZ = 79
+ETA_FILE = "/pyFV3/test_data/eta79.nc"
+GRID_DATA_COMPONENTS = (
+    "horizontal_data",
+    "vertical_data",
+    "contravariant_data",
+    "angle_data",
+)
+
+pytestmark = pytest.mark.skipif(
+    MPI is not None and MPI.COMM_WORLD.Get_size() > 1,
+    reason="runs every rank on a thread of a single process",
+)
+
+
+def setup_grid(comm, directory: str):
+    """Communicator, cache and metric terms factory of the rank of comm"""
+    partitioner = TilePartitioner(LAYOUT)
+    communicator = TileCommunicator(comm, partitioner)
+    sizer = SubtileGridSizer.from_tile_params(
+        nx_tile=NPX - 1,
+        ny_tile=NPX - 1,
+        nz=NPZ,
+        n_halo=3,
+        extra_dim_lengths={},
+        layout=LAYOUT,
+        tile_partitioner=partitioner,
+        tile_rank=communicator.rank,
+    )
+    quantity_factory = QuantityFactory.from_backend(sizer=sizer, backend="numpy")
+    cache = GridCache(
+        directory,
+        npx=NPX,
+        npy=NPX,
+        npz=NPZ,
+        layout=LAYOUT,
+        rank=communicator.rank,
+        backend="numpy",
+        eta_file=ETA_FILE,
+    )
+    calls = []
+
+    def metric_terms():
+        calls.append(None)
+        return MetricTerms(
+            quantity_factory=quantity_factory,
+            communicator=communicator,
+            eta_file=ETA_FILE,
+        )
+
+    return communicator, cache, metric_terms, calls
+
+
+def assert_dataclasses_equal(expected, actual):
+    for _field in dataclasses.fields(expected):
+        if not _field.init:
+            continue
+        expected_value = getattr(expected, _field.name)
+        actual_value = getattr(actual, _field.name)
+        if isinstance(expected_value, Quantity):
+            assert actual_value.dims == expected_value.dims
+            np.testing.assert_array_equal(
+                np.asarray(actual_value.data),
+                np.asarray(expected_value.data),
+                err_msg=_field.name,
+            )
+        else:
+            assert actual_value == expected_value, _field.name
+
+
+def assert_grids_equal(expected, actual):
+    expected_grid_data, expected_damping_coefficients = expected
+    grid_data, damping_coefficients = actual
+    for name in GRID_DATA_COMPONENTS:
+        assert_dataclasses_equal(
+            getattr(expected_grid_data, f"_{name}"), getattr(grid_data, f"_{name}")
+        )
+    assert_dataclasses_equal(expected_damping_coefficients, damping_coefficients)
+
+
+def test_grid_cache_round_trip(tmp_path):
+    def run_rank(comm):
+        communicator, cache, metric_terms, calls = setup_grid(comm, str(tmp_path))
+        computed = load_or_compute_grid(cache, metric_terms, communicator)
+        assert len(calls) == 1
+        loaded = load_or_compute_grid(cache, metric_terms, communicator)
+        assert len(calls) == 1
+        assert_grids_equal(computed, loaded)
+
+    run_on_threads(run_rank, size=LAYOUT[0] * LAYOUT[1])
+
+
+def test_grid_cache_with_other_key_is_recomputed_on_every_rank(tmp_path):
+    def run_rank(comm):
+        communicator, cache, metric_terms, calls = setup_grid(comm, str(tmp_path))
+        computed = load_or_compute_grid(cache, metric_terms, communicator)
+        comm.Barrier()
+        if communicator.rank == 0:
+            index_path = os.path.join(cache.path, "index.json")
+            with open(index_path) as f:
+                index = json.load(f)
+            index["key"]["npz"] = NPZ + 1
+            with open(index_path, "w") as f:
+                json.dump(index, f)
+            assert cache.load() is None
+        comm.Barrier()
+        # a single rank missing its cache makes every rank compute the grid,
+        # as computing the metric terms exchanges halos between ranks
+        recomputed = load_or_compute_grid(cache, metric_terms, communicator)
+        assert len(calls) == 2
+        assert_grids_equal(computed, recomputed)
+        # the cache of rank 0 was rewritten with the right key
+        assert cache.load() is not None
+
+    run_on_threads(run_rank, size=LAYOUT[0] * LAYOUT[1])
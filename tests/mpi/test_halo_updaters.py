@@ -0,0 +1,137 @@
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from ndsl.comm.communicator import CubedSphereCommunicator
+from ndsl.comm.mpi import MPI
+from ndsl.comm.partitioner import CubedSpherePartitioner, TilePartitioner
+from ndsl.constants import X_DIM, X_INTERFACE_DIM, Y_DIM, Y_INTERFACE_DIM, Z_DIM
+from ndsl.dsl.dace.wrapped_halo_exchange import WrappedHaloUpdater
+from ndsl.dsl.typing import Float
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from ndsl.quantity import Quantity, QuantityHaloSpec
+from pyFV3.halo import (
+    PersistentHaloUpdater,
+    ReducedPrecisionHaloUpdater,
+    supports_persistent_halo_exchange,
+)
+
+
+N_HALO = 3
+
+DIMS = {
+    "cell": [X_DIM, Y_DIM, Z_DIM],
+    "x_interface": [X_INTERFACE_DIM, Y_DIM, Z_DIM],
+    "y_interface": [X_DIM, Y_INTERFACE_DIM, Z_DIM],
+    "corner": [X_INTERFACE_DIM, Y_INTERFACE_DIM, Z_DIM],
+}
+
+
+def cubed_sphere_layout():
+    """Layout of each tile for the MPI ranks, or None if they do not form one"""
+    if MPI is None or MPI.COMM_WORLD.Get_size() % 6 != 0:
+        return None
+    ranks_per_tile = MPI.COMM_WORLD.Get_size() // 6
+    n = math.isqrt(ranks_per_tile)
+    return (n, n) if n * n == ranks_per_tile else None
+
+
+requires_cubed_sphere = pytest.mark.skipif(
+    cubed_sphere_layout() is None,
+    reason="needs 6 * n**2 MPI ranks to cover a cubed sphere",
+)
+
+
+def setup_exchange() -> Tuple[
+    CubedSphereCommunicator,
+    QuantityFactory,
+    Dict[str, Quantity],
+    Dict[str, Quantity],
+    List[QuantityHaloSpec],
+]:
+    """
+    Communicator and factory of this rank, with quantities of every
+    staggering exchanged by the ndsl scalar halo updater, identical copies
+    of them before the exchange and their halo specifications.
+
+    Values are representable as float32, so that exchanging them as float32
+    does not round them.
+    """
+    layout = cubed_sphere_layout()
+    partitioner = CubedSpherePartitioner(TilePartitioner(layout))
+    communicator = CubedSphereCommunicator(MPI.COMM_WORLD, partitioner)
+    sizer = SubtileGridSizer.from_tile_params(
+        nx_tile=12,
+        ny_tile=12,
+        nz=5,
+        n_halo=N_HALO,
+        extra_dim_lengths={},
+        layout=layout,
+        tile_partitioner=partitioner.tile,
+        tile_rank=communicator.tile.rank,
+    )
+    quantity_factory = QuantityFactory.from_backend(sizer=sizer, backend="numpy")
+    random = np.random.default_rng(communicator.rank)
+    reference = {}
+    exchanged = {}
+    specs = []
+    for name, dims in DIMS.items():
+        reference[name] = quantity_factory.zeros(dims, units="", dtype=Float)
+        shape = reference[name].data.shape
+        reference[name].data[:] = random.random(shape, dtype=np.float32)
+        exchanged[name] = quantity_factory.zeros(dims, units="", dtype=Float)
+        exchanged[name].data[:] = reference[name].data
+        specs.append(
+            quantity_factory.get_quantity_halo_spec(
+                dims=dims, n_halo=N_HALO, dtype=Float
+            )
+        )
+    WrappedHaloUpdater(
+        communicator.get_scalar_halo_updater(specs),
+        reference,
+        list(reference.keys()),
+    ).update()
+    return communicator, quantity_factory, reference, exchanged, specs
+
+
+def assert_quantities_equal(
+    reference: Dict[str, Quantity], exchanged: Dict[str, Quantity]
+):
+    for name in DIMS:
+        np.testing.assert_array_equal(
+            exchanged[name].data, reference[name].data, err_msg=name
+        )
+
+
+@requires_cubed_sphere
+def test_persistent_halo_updater_matches_scalar_halo_updater():
+    communicator, _, reference, persistent, specs = setup_exchange()
+    assert supports_persistent_halo_exchange(communicator, list(persistent.values()))
+    persistent_mpi_comm = MPI.COMM_WORLD.Dup()
+    updater = PersistentHaloUpdater(
+        communicator,
+        persistent_mpi_comm,
+        tag=0,
+        quantities=list(zip(persistent.values(), specs)),
+    )
+    # exchanged twice to check that the persistent requests can be restarted
+    updater.update()
+    updater.update()
+    updater.free()
+    persistent_mpi_comm.Free()
+    assert_quantities_equal(reference, persistent)
+
+
+@requires_cubed_sphere
+def test_reduced_precision_halo_updater_matches_scalar_halo_updater():
+    communicator, quantity_factory, reference, reduced, _ = setup_exchange()
+    # points no boundary receives, e.g. the halo corners at the corners of a
+    # tile, keep their values as with the ndsl updater
+    updater = ReducedPrecisionHaloUpdater(
+        communicator, quantity_factory, reduced, N_HALO
+    )
+    updater.update()
+    assert_quantities_equal(reference, reduced)
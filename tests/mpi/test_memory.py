@@ -0,0 +1,69 @@
+import json
+
+from ndsl.constants import X_DIM, Y_DIM, Z_DIM
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from pyFV3.memory import RecordingQuantityFactory, component_scope
+
+
+NX, NY, NZ, N_HALO = 6, 5, 4, 3
+
+
+def make_quantity_factory() -> QuantityFactory:
+    sizer = SubtileGridSizer(nx=NX, ny=NY, nz=NZ, n_halo=N_HALO, extra_dim_lengths={})
+    return QuantityFactory.from_backend(sizer=sizer, backend="numpy")
+
+
+def test_allocations_are_attributed_to_the_open_scopes(tmp_path):
+    factory = RecordingQuantityFactory(make_quantity_factory())
+    unscoped = factory.zeros([X_DIM, Y_DIM], units="")
+    with component_scope(factory, "DynamicalCore"):
+        outer = factory.empty([X_DIM, Y_DIM, Z_DIM], units="")
+        with component_scope(factory, "AcousticDynamics"):
+            inner = factory.ones([X_DIM, Y_DIM, Z_DIM], units="")
+            factory.zeros([X_DIM, Y_DIM], units="")
+    # scopes are closed once the context exits
+    factory.zeros([X_DIM, Y_DIM], units="")
+    nbytes_2d = unscoped.data.nbytes
+    nbytes_3d = outer.data.nbytes
+
+    assert [record.component for record in factory.records] == [
+        (),
+        ("DynamicalCore",),
+        ("DynamicalCore", "AcousticDynamics"),
+        ("DynamicalCore", "AcousticDynamics"),
+        (),
+    ]
+    assert factory.by_component() == {
+        "<unattributed>": 2 * nbytes_2d,
+        "DynamicalCore": nbytes_3d,
+        "DynamicalCore/AcousticDynamics": inner.data.nbytes + nbytes_2d,
+    }
+    assert factory.by_component(depth=1) == {
+        "<unattributed>": 2 * nbytes_2d,
+        "DynamicalCore": 2 * nbytes_3d + nbytes_2d,
+    }
+    assert factory.total_bytes == 2 * nbytes_3d + 3 * nbytes_2d
+
+    filename = str(tmp_path / "memory.json")
+    factory.to_json(filename)
+    with open(filename) as f:
+        report = json.load(f)
+    assert report["total_bytes"] == factory.total_bytes
+    assert report["by_component"] == factory.by_component()
+    assert {
+        (row["component"], tuple(row["dims"]), row["count"])
+        for row in report["breakdown"]
+    } == {
+        ("<unattributed>", (X_DIM, Y_DIM), 2),
+        ("DynamicalCore", (X_DIM, Y_DIM, Z_DIM), 1),
+        ("DynamicalCore/AcousticDynamics", (X_DIM, Y_DIM, Z_DIM), 1),
+        ("DynamicalCore/AcousticDynamics", (X_DIM, Y_DIM), 1),
+    }
+
+
+def test_scope_of_a_plain_factory_does_nothing():
+    factory = make_quantity_factory()
+    with component_scope(factory, "DynamicalCore"):
+        quantity = factory.zeros([X_DIM, Y_DIM], units="")
+    assert quantity.dims == (X_DIM, Y_DIM)
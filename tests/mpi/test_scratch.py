@@ -0,0 +1,56 @@
+import numpy as np
+
+from ndsl.constants import X_DIM, X_INTERFACE_DIM, Y_DIM, Z_DIM
+from ndsl.initialization.allocator import QuantityFactory
+from ndsl.initialization.sizer import SubtileGridSizer
+from pyFV3.scratch import ScratchArena
+
+
+def make_arena() -> ScratchArena:
+    sizer = SubtileGridSizer(nx=6, ny=5, nz=4, n_halo=3, extra_dim_lengths={})
+    return ScratchArena(QuantityFactory.from_backend(sizer=sizer, backend="numpy"))
+
+
+def test_phases_share_buffers():
+    arena = make_arena()
+    first = arena.phase("first")
+    second = arena.phase("second")
+    first_0 = first.empty([X_DIM, Y_DIM, Z_DIM], units="Pa")
+    first_1 = first.empty([X_DIM, Y_DIM, Z_DIM], units="Pa")
+    second_0 = second.empty([X_DIM, Y_DIM, Z_DIM], units="K")
+    second_x = second.empty([X_INTERFACE_DIM, Y_DIM, Z_DIM], units="")
+    # the n-th request of each phase gets the same buffer
+    assert np.shares_memory(first_0.data, second_0.data)
+    assert not np.shares_memory(first_1.data, second_0.data)
+    assert not np.shares_memory(first_0.data, first_1.data)
+    for quantity in (first_0, first_1):
+        assert not np.shares_memory(quantity.data, second_x.data)
+    assert second_0.units == "K"
+    assert second_0.dims == (X_DIM, Y_DIM, Z_DIM)
+    # values are those left by the last phase writing the buffer
+    second_0.data[:] = 1.0
+    np.testing.assert_array_equal(first_0.data, 1.0)
+    first_0.view[:] = 2.0
+    np.testing.assert_array_equal(second_0.view[:], 2.0)
+
+
+def test_peak_and_summed_bytes():
+    arena = make_arena()
+    first = arena.phase("first")
+    second = arena.phase("second")
+    first_0 = first.empty([X_DIM, Y_DIM, Z_DIM], units="")
+    first_1 = first.empty([X_DIM, Y_DIM, Z_DIM], units="")
+    second_0 = second.empty([X_DIM, Y_DIM, Z_DIM], units="")
+    nbytes = first_0.data.nbytes
+    assert second_0.data.nbytes == nbytes
+    assert first.requested_bytes == 2 * nbytes
+    assert second.requested_bytes == nbytes
+    assert arena.peak_bytes == 2 * nbytes
+    assert arena.summed_bytes == 3 * nbytes
+    assert "first" in arena.report()
+    assert not np.shares_memory(first_1.data, second_0.data)
+
+
+def test_phase_is_created_once():
+    arena = make_arena()
+    assert arena.phase("first") is arena.phase("first")
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from pyFV3.thread_comm import ThreadComm, _RankFailedError, run_on_threads, run_subtiles
+
+
+def test_sends_complete_before_receives_are_posted():
+    def run_rank(comm):
+        other = 1 - comm.rank
+        send_requests = [
+            comm.Isend(np.full(4, comm.rank * 10 + tag, dtype=float), other, tag=tag)
+            for tag in range(3)
+        ]
+        # neighbouring ranks both waiting on their sends first must not hang
+        for request in send_requests:
+            request.wait()
+        received = [np.zeros(4) for _ in range(3)]
+        receive_requests = [
+            comm.Irecv(buffer, other, tag=tag) for tag, buffer in enumerate(received)
+        ]
+        for request in receive_requests:
+            request.wait()
+        return received
+
+    results = run_on_threads(run_rank, size=2)
+    for rank, received in enumerate(results):
+        other = 1 - rank
+        for tag, buffer in enumerate(received):
+            np.testing.assert_array_equal(buffer, other * 10 + tag)
+
+
+def test_isend_copies_the_send_buffer():
+    def run_rank(comm):
+        if comm.rank == 0:
+            buffer = np.arange(5, dtype=float)
+            request = comm.Isend(buffer, 1)
+            buffer[:] = -1.0
+            request.wait()
+            comm.Barrier()
+            return None
+        comm.Barrier()
+        received = np.zeros(5)
+        comm.Irecv(received, 0).wait()
+        return received
+
+    results = run_on_threads(run_rank, size=2)
+    np.testing.assert_array_equal(results[1], np.arange(5, dtype=float))
+
+
+def test_isend_irecv_ring():
+    size = 4
+
+    def run_rank(comm):
+        received = np.zeros(3)
+        receive = comm.Irecv(received, (comm.rank - 1) % size, tag=7)
+        send = comm.Isend(np.full(3, comm.rank, dtype=float), (comm.rank + 1) % size, 7)
+        receive.wait()
+        send.wait()
+        return received
+
+    results = run_on_threads(run_rank, size=size)
+    for rank, received in enumerate(results):
+        np.testing.assert_array_equal(received, (rank - 1) % size)
+
+
+def test_allreduce():
+    size = 3
+
+    def run_rank(comm):
+        local = np.array([comm.rank, -comm.rank], dtype=float)
+        total = np.empty_like(local)
+        comm.Allreduce(local, total)
+        maximum = comm.allreduce(local, op=np.maximum)
+        return total, maximum
+
+    for total, maximum in run_on_threads(run_rank, size=size):
+        np.testing.assert_array_equal(total, [3.0, -3.0])
+        np.testing.assert_array_equal(maximum, [2.0, 0.0])
+
+
+def test_split():
+    size = 6
+
+    def run_rank(comm):
+        # reverse the order of the ranks within each color
+        sub_comm = comm.Split(color=comm.rank % 2, key=-comm.rank)
+        return sub_comm.Get_rank(), sub_comm.Get_size(), sub_comm.allgather(comm.rank)
+
+    results = run_on_threads(run_rank, size=size)
+    assert results == [
+        (2, 3, [4, 2, 0]),
+        (2, 3, [5, 3, 1]),
+        (1, 3, [4, 2, 0]),
+        (1, 3, [5, 3, 1]),
+        (0, 3, [4, 2, 0]),
+        (0, 3, [5, 3, 1]),
+    ]
+
+
+def test_failed_rank_releases_the_other_ranks():
+    def run_rank(comm):
+        if comm.rank == 0:
+            raise ValueError("failure of rank 0")
+        elif comm.rank == 1:
+            # waits for a message rank 0 never sends
+            comm.Recv(np.zeros(1), 0)
+        else:
+            comm.Barrier()
+
+    with pytest.raises(RuntimeError, match="rank 0 failed") as error_info:
+        run_on_threads(run_rank, size=3)
+    assert isinstance(error_info.value.__cause__, ValueError)
+
+
+def test_ranks_waiting_on_a_failed_rank_raise():
+    errors = []
+
+    def run_rank(comm):
+        if comm.rank == 0:
+            raise ValueError("failure of rank 0")
+        try:
+            comm.Recv(np.zeros(1), 0)
+        except _RankFailedError as error:
+            errors.append(error)
+            raise
+
+    with pytest.raises(RuntimeError):
+        run_on_threads(run_rank, size=3)
+    assert len(errors) == 2
+
+
+def test_subtiles_of_one_process_exchange_messages():
+    (process_comm,) = ThreadComm.create_ranks(1)
+
+    def run_subtile(comm):
+        other = 1 - comm.rank
+        comm.Isend(np.full(2, comm.rank, dtype=float), other, tag=5).wait()
+        received = np.zeros(2)
+        comm.Irecv(received, other, tag=5).wait()
+        return received, comm.allreduce(comm.rank)
+
+    results = run_subtiles(run_subtile, process_comm, subtiles_per_rank=2)
+    for rank, (received, rank_sum) in enumerate(results):
+        np.testing.assert_array_equal(received, 1 - rank)
+        assert rank_sum == 1
+
+
+def test_subtile_tags_are_bounded():
+    (process_comm,) = ThreadComm.create_ranks(1)
+
+    def run_subtile(comm):
+        comm.send(None, 1 - comm.rank, tag=32768)
+
+    with pytest.raises(RuntimeError) as error_info:
+        run_subtiles(run_subtile, process_comm, subtiles_per_rank=2)
+    assert isinstance(error_info.value.__cause__, ValueError)
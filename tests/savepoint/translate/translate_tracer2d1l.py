@@ -5,6 +5,7 @@ from ndsl.constants import X_DIM, Y_DIM, Z_DIM
 from ndsl.dsl.stencil import StencilFactory
 from ndsl.namelist import Namelist
 from ndsl.stencils.testing import ParallelTranslate
+from pyFV3 import DynamicalCoreConfig
 from pyFV3.stencils import FiniteVolumeTransport, TracerAdvection
 from pyFV3.utils.functional_validation import get_subset_func
 
@@ -59,6 +60,7 @@ class TranslateTracer2D1L(ParallelTranslate):
             damping_coefficients=self.grid.damping_coefficients,
             grid_type=self.grid.grid_type,
             hord=self.namelist.hord_tr,
+            shared_area_flux=True,
         )
 
         self.tracer_advection = TracerAdvection(
@@ -68,6 +70,7 @@ class TranslateTracer2D1L(ParallelTranslate):
             self.grid.grid_data,
             communicator,
             inputs["tracers"],
+            config=DynamicalCoreConfig.from_namelist(self.namelist).tracer_advection,
         )
         inputs["x_mass_flux"] = inputs.pop("mfxd")
         inputs["y_mass_flux"] = inputs.pop("mfyd")